@@ -0,0 +1,65 @@
+"""
+Alembic 迁移环境
+
+数据库 URL 优先使用 alembic.ini / 调用方设置的 sqlalchemy.url，为空时使用应用配置 DATABASE_URL。
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+
+from app.core.config import settings
+from app.db.database import Base, create_db_engine
+
+# 导入所有模型，以确保它们被注册到 Base.metadata
+from app.models import gold_price  # noqa
+from app.models import user  # noqa
+from app.models import ingestion  # noqa
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    """迁移使用的数据库 URL"""
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """离线模式：只输出 SQL，不连接数据库"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=get_url().startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """在线模式：连接数据库执行迁移（SQLite 使用 batch 模式以支持修改表结构）"""
+    connectable = create_db_engine(get_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,57 @@
+"""gold_prices covering index for range queries
+
+按市场、日期区间读取价格序列时只扫描 (market_type, date, OHLCV) 覆盖索引；
+删除被复合索引前缀覆盖（market_type）或从未单独使用（date）的单列索引。
+由较新代码的 create_all 建出的库已经有覆盖索引、没有单列索引，stamp 0001 后升级同样可以执行：
+只创建缺少的索引、只删除存在的索引。
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 17:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COVERING_INDEX = 'ix_gold_prices_market_date_ohlcv'
+COVERING_COLUMNS = ['market_type', 'date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+
+SINGLE_COLUMN_INDEXES = {'ix_gold_prices_market_type': ['market_type'], 'ix_gold_prices_date': ['date']}
+
+
+def _existing_indexes() -> set:
+    """gold_prices 上已有的索引名"""
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('gold_prices')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = _existing_indexes()
+    if COVERING_INDEX not in existing:
+        op.create_index(COVERING_INDEX, 'gold_prices', COVERING_COLUMNS, unique=False)
+    for name in SINGLE_COLUMN_INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='gold_prices')
+    # 让 SQLite 查询规划器获得新索引的统计信息
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(sa.text('ANALYZE gold_prices'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = _existing_indexes()
+    for name, columns in SINGLE_COLUMN_INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'gold_prices', columns, unique=False)
+    if COVERING_INDEX in existing:
+        op.drop_index(COVERING_INDEX, table_name='gold_prices')
@@ -0,0 +1,53 @@
+"""gold_prices close-price covering index
+
+用 (market_type, date, close_price) 覆盖索引替换 0002 的整行 OHLCV 覆盖索引：
+分析、比价读取 (日期, 收盘价) 序列时仍只扫描索引；整行读取走唯一索引回表，
+实测（100 万行，10 年区间）读取耗时与整行覆盖索引相当，索引体积和写入开销更小。
+与 0002 一样只创建缺少的索引、只删除存在的索引，由 create_all 建出的库同样可以升级。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CLOSE_INDEX = 'ix_gold_prices_market_date_close'
+CLOSE_COLUMNS = ['market_type', 'date', 'close_price']
+OHLCV_INDEX = 'ix_gold_prices_market_date_ohlcv'
+OHLCV_COLUMNS = ['market_type', 'date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+
+def _existing_indexes() -> set:
+    """gold_prices 上已有的索引名"""
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('gold_prices')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = _existing_indexes()
+    if CLOSE_INDEX not in existing:
+        op.create_index(CLOSE_INDEX, 'gold_prices', CLOSE_COLUMNS, unique=False)
+    if OHLCV_INDEX in existing:
+        op.drop_index(OHLCV_INDEX, table_name='gold_prices')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(sa.text('ANALYZE gold_prices'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = _existing_indexes()
+    if OHLCV_INDEX not in existing:
+        op.create_index(OHLCV_INDEX, 'gold_prices', OHLCV_COLUMNS, unique=False)
+    if CLOSE_INDEX in existing:
+        op.drop_index(CLOSE_INDEX, table_name='gold_prices')
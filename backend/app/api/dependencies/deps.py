@@ -1,15 +1,32 @@
 """
 API 依赖注入
 """
-from typing import Generator
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.database import AsyncSessionLocal, SessionLocal
 
 
 def get_db() -> Generator:
-    """获取数据库会话"""
+    """获取数据库会话（同步，供脚本和线程池中的任务使用）"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """获取异步数据库会话（API 路由使用，查询不阻塞事件循环）"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_session_factory() -> sessionmaker:
+    """获取会话工厂（供在线程中各自创建会话的后台任务使用）"""
+    return SessionLocal
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """获取异步会话工厂（供生命周期长于请求处理函数的流式响应使用）"""
+    return AsyncSessionLocal
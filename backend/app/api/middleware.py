@@ -0,0 +1,68 @@
+"""
+请求计时中间件
+
+为每个 HTTP 请求开启 RequestTiming（见 app.core.metrics），在响应头发出时写入 Server-Timing，
+请求结束后把总耗时、SQL 语句数与耗时、读取行数汇总到 /metrics 的直方图。
+使用纯 ASGI 实现：流式响应不会被缓冲，路由中的代码与中间件共享同一个上下文。
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    REQUEST_DURATION,
+    REQUEST_ROWS,
+    REQUEST_SQL_DURATION,
+    REQUEST_SQL_STATEMENTS,
+    request_timing,
+)
+
+# 未匹配到路由的请求统一使用的标签（避免任意路径产生大量时间序列）
+UNMATCHED_ROUTE = 'unmatched'
+
+
+def route_template(scope: Scope) -> str:
+    """
+    请求匹配到的路由模板，例如 /api/v1/gold/data/{market_type}
+    把请求路径中的路径参数值换回参数名（路由对象的 path 不含 include_router 的前缀，且各版本记录方式不同）
+    """
+    if scope.get('endpoint') is None:
+        return UNMATCHED_ROUTE
+    segments = scope['path'].split('/')
+    # 路径参数通常在末尾，从右往左替换，避免误换同名的固定路径段
+    for name, value in (scope.get('path_params') or {}).items():
+        for index in range(len(segments) - 1, -1, -1):
+            if segments[index] == str(value):
+                segments[index] = f"{{{name}}}"
+                break
+    return '/'.join(segments)
+
+
+class TimingMiddleware:
+    """请求计时、Server-Timing 响应头和请求指标"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        with request_timing() as timing:
+            async def send_with_timing(message: Message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', timing.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = route_template(scope)
+                REQUEST_DURATION.observe(timing.elapsed(), method=scope['method'], route=route, status=status)
+                REQUEST_SQL_STATEMENTS.observe(timing.sql_count, route=route)
+                REQUEST_SQL_DURATION.observe(timing.sql_seconds, route=route)
+                REQUEST_ROWS.observe(timing.rows, route=route)
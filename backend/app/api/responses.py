@@ -0,0 +1,91 @@
+"""
+带缓存和 ETag 的响应工具
+"""
+import hashlib
+import inspect
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.cache import TTLCache, response_cache
+from app.core.metrics import timed_span
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """已序列化的响应体"""
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+    # 随响应体一起缓存的响应头（取决于生成时的数据状态，例如新鲜度）
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class WithHeaders:
+    """build 的返回值：响应数据 + 需要一起缓存的响应头"""
+    payload: Any
+    headers: Dict[str, str]
+
+
+def make_cached_body(payload: Any, media_type: str = "application/json") -> CachedBody:
+    """序列化响应并计算 ETag"""
+    headers = ()
+    if isinstance(payload, WithHeaders):
+        payload, headers = payload.payload, tuple(payload.headers.items())
+    if isinstance(payload, bytes):
+        body = payload
+    elif isinstance(payload, BaseModel):
+        body = payload.model_dump_json().encode("utf-8")
+    else:
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+    return CachedBody(body=body, etag=etag, media_type=media_type, headers=headers)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否匹配当前 ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def cached_response(request: Request, key: Hashable, tags: Iterable[str],
+                          build: Callable[[], Union[Any, Awaitable[Any]]], media_type: str = "application/json",
+                          headers: Optional[Dict[str, str]] = None,
+                          cache: TTLCache = response_cache) -> Response:
+    """
+    读取或生成缓存的响应
+    :param key: 缓存键（接口 + 规范化后的参数）
+    :param tags: 失效标签（通常为涉及的市场类型）
+    :param build: 未命中时生成响应数据的函数或协程函数（抛出的 HTTPException 不会被缓存），
+                  返回 WithHeaders 时其中的响应头随响应体一起缓存
+    :param headers: 额外的响应头
+    :return: 带 ETag 的响应；客户端 If-None-Match 匹配时返回 304
+    """
+    cached = cache.get(key)
+    status = "HIT"
+    if cached is None:
+        # 生成期间如果有标签被失效（写入了新数据），生成的响应可能基于旧数据，只返回不缓存
+        tags = tuple(tags)
+        generations = cache.generations(tags)
+        # build：查询、ORM 对象构造和计算；serialize：Pydantic / JSON 序列化（计入 Server-Timing）
+        with timed_span('build'):
+            payload = build()
+            if inspect.isawaitable(payload):
+                payload = await payload
+        with timed_span('serialize'):
+            cached = make_cached_body(payload, media_type)
+        cache.set(key, cached, tags, generations)
+        status = "MISS"
+
+    response_headers = {"ETag": cached.etag, "X-Cache": status, **dict(cached.headers), **(headers or {})}
+    if etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=response_headers)
+    return Response(content=cached.body, media_type=cached.media_type, headers=response_headers)
@@ -1,234 +1,540 @@
 """
 黄金价格路由
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List, Dict
-from datetime import datetime, timedelta
-
-from app.api.dependencies.deps import get_db
-from app.services.gold_price_service import GoldPriceService
-from app.schemas.gold_price import GoldPrice, GoldPriceResponse, DateRangeQuery, MarketSummary
-from app.models.gold_price import GoldPrice as GoldPriceModel
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from typing import Optional, List, Dict, Union
+from datetime import date, datetime, timedelta
+
+from app.api.dependencies.deps import get_async_db, get_async_session_factory, get_session_factory
+from app.api.responses import WithHeaders, cached_response
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.services.analytics_service import AnalyticsService
+from app.services.comparison_service import ComparisonService, aligned_cache
+from app.services.data_sync_service import sync_markets
+from app.services.price_stream_service import format_sse, price_hub
+from app.services.refresh_service import FRESH, STALE, read_refresher
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    EXPORT_MAX_DATE,
+    EXPORT_MIN_DATE,
+    export_prices,
+    gzip_stream,
+)
+from app.services.gold_price_service import AsyncGoldPriceService, decode_price_cursor, register_write_listener
+from app.schemas.gold_price import GoldPrice, GoldPriceColumnar, GoldPriceResponse, DateRangeQuery, MarketSummary, MarketComparison, PriceAnalytics
+from app.models.gold_price import GoldPriceMetadata
+from app.services.coverage_service import CoverageService
+from app.services.rollup_service import ROLLUP_PERIODS, choose_period
+from app.utils.comparison import FILL_POLICIES
+from app.utils.cursor import InvalidCursorError
+from app.utils.downsampling import INTERVALS, downsample, resample_ohlcv
+from app.utils.series_codec import BINARY_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, encode_binary, frame_to_columnar
 
 router = APIRouter()
 
+# 价格序列响应格式
+SERIES_FORMATS = ('json', 'columnar', 'binary')
+
+# max_points 参数上限
+MAX_POINTS_LIMIT = 20000
+
+# 分页：只传 cursor 时的每页条数、limit 上限
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# 统计指标：窗口上限、最多几个移动平均窗口
+MAX_ANALYTICS_WINDOW = 500
+MAX_ANALYTICS_WINDOWS = 8
+
+
+@register_write_listener
+def _invalidate_response_cache(market_type: str, start_date: datetime, end_date: datetime):
+    """市场数据写入后失效该市场的响应缓存（每个 worker 进程各自维护缓存）"""
+    response_cache.invalidate(market_type)
+
 
 @router.post("/sync")
 async def sync_gold_price_data(
     query: DateRangeQuery,
-    db: Session = Depends(get_db)
+    session_factory: sessionmaker = Depends(get_session_factory)
 ):
     """
     同步黄金价格数据（从 API 获取并保存到数据库）
+    国内和国际数据在线程池中并发同步，各自使用独立的数据库会话和超时
     """
-    service = GoldPriceService(db)
-
-    # 同步国内数据
-    domestic_result = service.sync_gold_price_data(
-        market_type='domestic',
-        start_date=query.start_date,
-        end_date=query.end_date
-    )
-
-    # 同步国际数据
-    international_result = service.sync_gold_price_data(
-        market_type='international',
-        start_date=query.start_date,
-        end_date=query.end_date
-    )
+    results = await sync_markets(query.start_date, query.end_date, session_factory=session_factory)
+    all_success = all(result['status'] == 'success' for result in results.values())
 
     return {
-        "status": "success",
-        "message": "数据同步完成",
-        "domestic": domestic_result,
-        "international": international_result
+        "status": "success" if all_success else "partial",
+        "message": "数据同步完成" if all_success else "部分市场同步失败",
+        "domestic": results['domestic'],
+        "international": results['international']
     }
 
 
-@router.get("/data/{market_type}", response_model=GoldPriceResponse)
+def _resolve_date_range(start_date: Optional[str], end_date: Optional[str], default_days: int):
+    """
+    解析日期参数，未提供开始日期时默认取最近 default_days 天
+    """
+    if not start_date:
+        start = datetime.now() - timedelta(days=default_days)
+    else:
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+
+    if not end_date:
+        end = datetime.now()
+    else:
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+
+    return start, end
+
+
+def _validate_market_type(market_type: str):
+    """验证市场类型"""
+    if market_type not in ['domestic', 'international']:
+        raise HTTPException(status_code=400, detail="市场类型必须是 'domestic' 或 'international'")
+
+
+def _resolve_series_format(request: Request, format: Optional[str]) -> str:
+    """
+    确定价格序列的响应格式：优先使用 format 参数，其次根据 Accept 头
+    """
+    if format:
+        if format not in SERIES_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format 必须是 {', '.join(SERIES_FORMATS)} 之一")
+        return format
+
+    accept = request.headers.get("accept", "")
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return 'columnar'
+    if BINARY_MEDIA_TYPE in accept:
+        return 'binary'
+    return 'json'
+
+
+def _series_media_type(series_format: str) -> str:
+    """响应格式对应的媒体类型"""
+    return BINARY_MEDIA_TYPE if series_format == 'binary' else "application/json"
+
+
+@router.get("/data/{market_type}", response_model=Union[GoldPriceResponse, GoldPriceColumnar])
 async def get_gold_price_data(
+    request: Request,
     market_type: str,
     start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    format: Optional[str] = Query(None, description="响应格式：json（默认）/ columnar（并列数组）/ binary（packed-f64-v1）"),
+    interval: Optional[str] = Query(None, description="聚合周期：day / week / month / year"),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_POINTS_LIMIT, description="最多返回的点数（对收盘价做 LTTB 降采样）"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="分页：每页条数"),
+    cursor: Optional[str] = Query(None, description="分页：上一页返回的 next_cursor"),
+    wait: bool = Query(False, description="数据不完整时等待后台补数完成后再返回（共享进行中的补数）"),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: sessionmaker = Depends(get_session_factory)
 ):
     """
     获取黄金价格数据
     :param market_type: 市场类型 (domestic/international)
+    指定 interval 或 max_points 时返回降采样后的序列（周/月/年粒度直接读取汇总表）；
+    json 格式下自动改用列式响应。
+    指定 limit 或 cursor 时按日期 keyset 分页，响应中的 next_cursor 用于获取下一页（最后一页为空）
+    直接返回库中已有的数据，freshness 字段和 X-Data-Freshness 头标明区间内数据是否完整；
+    不完整时在后台补数（同一区间并发读取只补一次），wait=true 时等待补数完成后再返回
     """
     # 验证市场类型
-    if market_type not in ['domestic', 'international']:
-        raise HTTPException(status_code=400, detail="市场类型必须是 'domestic' 或 'international'")
+    _validate_market_type(market_type)
+    series_format = _resolve_series_format(request, format)
+    if interval and interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval 必须是 {', '.join(INTERVALS)} 之一")
+    downsampled = bool(interval or max_points)
+    if downsampled and series_format == 'json':
+        # 聚合后的数据没有 id / created_at，只能以列式返回
+        series_format = 'columnar'
+
+    paginated = limit is not None or cursor is not None
+    after_date = None
+    if paginated:
+        if downsampled or series_format == 'binary':
+            raise HTTPException(status_code=400, detail="分页只支持 json / columnar 格式的日线数据")
+        try:
+            after_date = decode_price_cursor(market_type, cursor) if cursor else None
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
     # 如果没有提供日期，默认获取最近30天
-    if not start_date:
-        start_date = datetime.now() - timedelta(days=30)
-    else:
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-
-    if not end_date:
-        end_date = datetime.now()
-    else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d')
-
-    # 从数据库获取数据
-    service = GoldPriceService(db)
-    data = service.get_data_from_db(market_type, start_date, end_date)
-
-    if not data:
-        # 如果数据库中没有数据，尝试同步
-        sync_result = service.sync_gold_price_data(market_type, start_date, end_date)
-        data = service.get_data_from_db(market_type, start_date, end_date)
-
-        if not data:
-            raise HTTPException(
-                status_code=404,
-                detail="未找到数据，请先同步数据"
-            )
-
-    return GoldPriceResponse(
-        market_type=market_type,
-        data=data,
-        start_date=start_date,
-        end_date=end_date,
-        total_count=len(data)
-    )
+    start, end = _resolve_date_range(start_date, end_date, default_days=30)
+
+    async def check_freshness() -> str:
+        """按覆盖区间判断数据是否完整，不完整时安排后台补数"""
+        missing = await read_refresher.missing_ranges(session_factory, market_type, start, end)
+        if missing and settings.READ_REFRESH_ENABLED:
+            read_refresher.ensure(market_type, missing, session_factory)
+        return STALE if missing else FRESH
+
+    if wait and settings.READ_REFRESH_ENABLED:
+        missing = await read_refresher.missing_ranges(session_factory, market_type, start, end)
+        if missing:
+            # 补数完成后会失效该市场的响应缓存，下面重新生成的响应即包含补到的数据
+            await read_refresher.wait(market_type, missing, session_factory)
+
+    async def build_page():
+        freshness = await check_freshness()
+        data, next_cursor = await AsyncGoldPriceService(db).get_page(
+            market_type, start, end, limit or DEFAULT_PAGE_SIZE, after_date,
+            columns=series_format == 'columnar'
+        )
+        if series_format == 'columnar':
+            payload = GoldPriceColumnar(market_type=market_type, start_date=start, end_date=end,
+                                        total_count=len(data), next_cursor=next_cursor, freshness=freshness,
+                                        **frame_to_columnar(data))
+        else:
+            payload = GoldPriceResponse(market_type=market_type, data=data, start_date=start, end_date=end,
+                                        total_count=len(data), next_cursor=next_cursor, freshness=freshness)
+        return WithHeaders(payload, {"X-Data-Freshness": freshness})
+
+    async def build():
+        freshness = await check_freshness()
+        service = AsyncGoldPriceService(db)
+        # 周/月/年粒度（或按 max_points 选出的粒度）优先读取汇总表
+        period = interval or (choose_period(start, end, max_points) if max_points else None)
+        data = None
+        if period in ROLLUP_PERIODS:
+            source_count = await service.count_data_in_db(market_type, start, end)
+            # 升级前写入的日线没有汇总行：汇总不完整时改为从日线重采样，而不是返回截断的序列
+            if await service.rollup_is_complete(market_type, period, start, end):
+                data = await service.get_rollup_frame(market_type, period, start, end)
+
+        if data is None or len(data) == 0:
+            # 从数据库获取数据；列式和二进制格式只查询所需列，不构造 ORM 对象
+            load = service.get_data_from_db if series_format == 'json' else service.get_frame_from_db
+            data = await load(market_type, start, end)
+
+            if len(data) == 0 and freshness == FRESH:
+                # 区间已完整同步过但没有数据（例如全是休市日）；不完整时先返回空数据，后台补数
+                raise HTTPException(
+                    status_code=404,
+                    detail="未找到数据，请先同步数据"
+                )
+
+            source_count = len(data)
+            if period:
+                data = resample_ohlcv(data, period)
+
+        if max_points:
+            data = downsample(data, max_points=max_points)
+
+        headers = {"X-Data-Freshness": freshness}
+        if series_format == 'binary':
+            return WithHeaders(encode_binary([(market_type, data)]), headers)
+        if series_format == 'columnar':
+            return WithHeaders(GoldPriceColumnar(
+                market_type=market_type,
+                start_date=start,
+                end_date=end,
+                total_count=len(data),
+                interval=period,
+                source_count=source_count if downsampled else None,
+                freshness=freshness,
+                **frame_to_columnar(data)
+            ), headers)
+        return WithHeaders(GoldPriceResponse(
+            market_type=market_type,
+            data=data,
+            start_date=start,
+            end_date=end,
+            total_count=len(data),
+            freshness=freshness
+        ), headers)
+
+    key = ("data", market_type, start.date(), end.date(), series_format, interval, max_points, limit, cursor)
+    return await cached_response(request, key, [market_type], build_page if paginated else build,
+                                 media_type=_series_media_type(series_format), headers={"Vary": "Accept"})
+
+
+@router.get("/export/{market_type}")
+async def export_gold_price_data(
+    market_type: str,
+    start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)，为空时从最早的数据开始"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)，为空时到最新的数据"),
+    format: str = Query('ndjson', description="导出格式：ndjson / csv"),
+    gzip: bool = Query(False, description="是否以 gzip 压缩传输（Content-Encoding: gzip）"),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """
+    流式导出价格历史（服务端游标分批读取，内存占用与区间长度无关）
+    """
+    _validate_market_type(market_type)
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format 必须是 {', '.join(EXPORT_FORMATS)} 之一")
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else EXPORT_MIN_DATE
+        end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else EXPORT_MAX_DATE
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式必须是 YYYY-MM-DD")
+
+    body = export_prices(session_factory, market_type, start, end, format)
+    headers = {"Content-Disposition": f'attachment; filename="gold_{market_type}.{format}"'}
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format], headers=headers)
 
 
 @router.get("/summary/{market_type}", response_model=MarketSummary)
 async def get_market_summary(
+    request: Request,
     market_type: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取市场汇总信息（最新价格和变化）
     """
-    if market_type not in ['domestic', 'international']:
-        raise HTTPException(status_code=400, detail="市场类型必须是 'domestic' 或 'international'")
-
-    # 获取最近两天的数据
-    service = GoldPriceService(db)
-    today = datetime.now()
-    yesterday = today - timedelta(days=3)  # 往前多取一点以确保有数据
-
-    data = service.get_data_from_db(market_type, yesterday, today)
-
-    if len(data) < 1:
-        raise HTTPException(status_code=404, detail="未找到足够的数据")
+    _validate_market_type(market_type)
+
+    async def build():
+        # 读取最新价格快照（与节假日空档无关）
+        snapshot = await AsyncGoldPriceService(db).get_snapshot(market_type)
+
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="未找到足够的数据")
+
+        return MarketSummary(
+            market_type=market_type,
+            latest_price=snapshot['latest_price'],
+            previous_price=snapshot['previous_price'],
+            change=snapshot['change'],
+            change_percent=snapshot['change_percent'],
+            volume=snapshot['volume']
+        )
+
+    key = ("summary", market_type, date.today())
+    return await cached_response(request, key, [market_type], build)
+
+
+def _parse_windows(windows: str) -> List[int]:
+    """解析逗号分隔的移动平均窗口（去重并升序）"""
+    try:
+        values = sorted({int(part) for part in windows.split(',') if part.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows 必须是逗号分隔的整数")
+    if not values or len(values) > MAX_ANALYTICS_WINDOWS \
+            or values[0] < 2 or values[-1] > MAX_ANALYTICS_WINDOW:
+        raise HTTPException(
+            status_code=400,
+            detail=f"windows 需要 1 到 {MAX_ANALYTICS_WINDOWS} 个 2 到 {MAX_ANALYTICS_WINDOW} 之间的整数"
+        )
+    return values
+
+
+@router.get("/analytics/{market_type}", response_model=PriceAnalytics)
+async def get_price_analytics(
+    request: Request,
+    market_type: str,
+    start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    windows: str = Query("5,20,60", description="移动平均窗口（逗号分隔）"),
+    volatility_window: int = Query(20, ge=2, le=MAX_ANALYTICS_WINDOW, description="滚动波动率窗口"),
+    rsi_period: int = Query(14, ge=2, le=MAX_ANALYTICS_WINDOW, description="RSI 周期"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取收盘价统计指标：日收益率、对数收益率、移动平均、滚动波动率、回撤和 RSI
+    结果按 (市场, 区间, 参数) 缓存，有新数据写入时失效
+    """
+    _validate_market_type(market_type)
+    window_list = _parse_windows(windows)
 
-    latest = data[-1]
-    previous = data[-2] if len(data) > 1 else None
+    # 如果没有提供日期，默认获取最近一年
+    start, end = _resolve_date_range(start_date, end_date, default_days=365)
 
-    change = None
-    change_percent = None
-    if previous:
-        change = latest.close_price - previous.close_price
-        change_percent = (change / previous.close_price) * 100
+    async def build():
+        result = await AnalyticsService(db).get_analytics(market_type, start, end, window_list,
+                                                          volatility_window, rsi_period)
+        if result is None:
+            raise HTTPException(status_code=404, detail="未找到数据")
+        return PriceAnalytics(**result)
 
-    return MarketSummary(
-        market_type=market_type,
-        latest_price=latest.close_price,
-        previous_price=previous.close_price if previous else None,
-        change=change,
-        change_percent=change_percent,
-        volume=latest.volume
-    )
+    key = ("analytics", market_type, start.date(), end.date(), tuple(window_list), volatility_window, rsi_period)
+    return await cached_response(request, key, [market_type], build)
 
 
 @router.get("/comparison")
 async def compare_markets(
+    request: Request,
     start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    format: Optional[str] = Query(None, description="响应格式：json（默认）/ columnar（并列数组）/ binary（packed-f64-v1）"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     比较国内和国际市场数据
     """
+    series_format = _resolve_series_format(request, format)
+
     # 如果没有提供日期，默认获取最近7天
-    if not start_date:
-        start_date = datetime.now() - timedelta(days=7)
-    else:
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    start, end = _resolve_date_range(start_date, end_date, default_days=7)
+
+    async def build():
+        service = AsyncGoldPriceService(db)
+
+        if series_format != 'json':
+            frames = [(market, await service.get_frame_from_db(market, start, end))
+                      for market in ('domestic', 'international')]
+            if series_format == 'binary':
+                return encode_binary(frames)
+            result = {"status": "success", "start_date": start, "end_date": end}
+            for market, frame in frames:
+                result[market] = {
+                    "market_type": market,
+                    "data_count": len(frame),
+                    **frame_to_columnar(frame)
+                }
+            return result
+
+        domestic_data = await service.get_data_from_db('domestic', start, end)
+        international_data = await service.get_data_from_db('international', start, end)
+
+        return {
+            "status": "success",
+            "start_date": start,
+            "end_date": end,
+            "domestic": {
+                "market_type": "domestic",
+                "data_count": len(domestic_data),
+                "data": [GoldPrice.model_validate(row) for row in domestic_data]
+            },
+            "international": {
+                "market_type": "international",
+                "data_count": len(international_data),
+                "data": [GoldPrice.model_validate(row) for row in international_data]
+            }
+        }
 
-    if not end_date:
-        end_date = datetime.now()
-    else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+    key = ("comparison", start.date(), end.date(), series_format)
+    return await cached_response(request, key, ['domestic', 'international'], build,
+                                 media_type=_series_media_type(series_format), headers={"Vary": "Accept"})
 
-    service = GoldPriceService(db)
 
-    domestic_data = service.get_data_from_db('domestic', start_date, end_date)
-    international_data = service.get_data_from_db('international', start_date, end_date)
+@router.get("/comparison/aligned", response_model=MarketComparison)
+async def compare_markets_aligned(
+    request: Request,
+    start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    fill: str = Query("ffill", description="对齐策略：inner（两市场都有数据的日期）/ ffill（休市日沿用前值）/ outer（保留空值）"),
+    correlation_window: int = Query(20, ge=2, le=MAX_ANALYTICS_WINDOW, description="滚动相关系数窗口"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    按共同日期对齐国内和国际收盘价，返回价差、比值和滚动相关系数（列式）
+    """
+    if fill not in FILL_POLICIES:
+        raise HTTPException(status_code=400, detail=f"fill 必须是 {', '.join(FILL_POLICIES)} 之一")
 
-    return {
-        "status": "success",
-        "start_date": start_date,
-        "end_date": end_date,
-        "domestic": {
-            "market_type": "domestic",
-            "data_count": len(domestic_data),
-            "data": domestic_data
-        },
-        "international": {
-            "market_type": "international",
-            "data_count": len(international_data),
-            "data": international_data
-        }
-    }
+    # 如果没有提供日期，默认获取最近一年
+    start, end = _resolve_date_range(start_date, end_date, default_days=365)
+
+    async def build():
+        return MarketComparison(**await ComparisonService(db).compare(start, end, fill, correlation_window))
+
+    key = ("comparison_aligned", start.date(), end.date(), fill, correlation_window)
+    return await cached_response(request, key, ['domestic', 'international'], build)
 
 
 @router.get("/latest")
-async def get_latest_prices(db: Session = Depends(get_db)):
+async def get_latest_prices(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     获取最新的国内外黄金价格
     """
-    service = GoldPriceService(db)
-    today = datetime.now()
-    week_ago = today - timedelta(days=10)
-
-    domestic_data = service.get_data_from_db('domestic', week_ago, today)
-    international_data = service.get_data_from_db('international', week_ago, today)
-
-    result = {}
-
-    if domestic_data:
-        latest = domestic_data[-1]
-        result['domestic'] = {
-            'market_type': 'domestic',
-            'price': latest.close_price,
-            'date': latest.date
+    async def build():
+        service = AsyncGoldPriceService(db)
+        result = {}
+
+        for market in ('domestic', 'international'):
+            snapshot = await service.get_snapshot(market)
+            if snapshot is not None:
+                result[market] = {
+                    'market_type': market,
+                    'price': snapshot['latest_price'],
+                    'date': snapshot['latest_date']
+                }
+
+        return {
+            "status": "success",
+            "data": result,
+            "timestamp": datetime.now()
         }
 
-    if international_data:
-        latest = international_data[-1]
-        result['international'] = {
-            'market_type': 'international',
-            'price': latest.close_price,
-            'date': latest.date
-        }
+    key = ("latest", date.today())
+    return await cached_response(request, key, ['domestic', 'international'], build)
+
 
+@router.get("/stream")
+async def stream_prices(session_factory: async_sessionmaker = Depends(get_async_session_factory)):
+    """
+    实时价格推送（text/event-stream）
+    连接后先发送各市场的最新价格，之后每次有新数据写入时推送 price 事件，空闲时定期发送心跳注释
+    """
+    async def events():
+        subscription = price_hub.subscribe(session_factory)
+        try:
+            for message in await price_hub.current():
+                yield format_sse(message)
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(),
+                                                     timeout=settings.PRICE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield format_sse(message, event_id=message['sequence'])
+        finally:
+            price_hub.unsubscribe(subscription)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    获取读接口响应缓存的命中/未命中/淘汰计数，以及读路径后台补数的计数
+    """
     return {
         "status": "success",
-        "data": result,
-        "timestamp": datetime.now()
+        "cache": response_cache.stats(),
+        "comparison": aligned_cache.stats(),
+        "stream": price_hub.stats(),
+        "refresh": read_refresher.stats()
     }
 
 
 @router.get("/metadata")
-async def get_metadata(db: Session = Depends(get_db)):
+async def get_metadata(db: AsyncSession = Depends(get_async_db)):
     """
     获取数据库元数据
     """
-    from app.models.gold_price import GoldPriceMetadata
-
-    metadata = db.query(GoldPriceMetadata).all()
+    metadata = (await db.execute(select(GoldPriceMetadata))).scalars().all()
 
     result = []
     for meta in metadata:
+        # 覆盖区间首次读取时需要从行情数据重建，复用同步实现
+        intervals = await db.run_sync(
+            lambda session, market_type=meta.market_type: CoverageService(session, market_type).get_intervals()
+        )
         result.append({
             "market_type": meta.market_type,
-            "last_update": meta.last_update
+            "last_update": meta.last_update,
+            "coverage": [
+                {"start_date": start, "end_date": end} for start, end in intervals
+            ]
         })
 
     return {
@@ -0,0 +1,157 @@
+"""
+数据采集任务路由
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies.deps import get_async_db, get_session_factory
+from app.core.config import settings
+from app.schemas.ingestion import (
+    BackfillJob,
+    BackfillJobList,
+    BackfillRequest,
+    IngestionRun,
+    IngestionRunList,
+    IngestionStatus,
+)
+from app.services.backfill_service import (
+    BackfillInProgressError,
+    BackfillService,
+    get_backfill_job,
+    get_recent_backfill_jobs,
+    is_backfill_running,
+    job_to_dict,
+)
+from app.services.ingestion_scheduler import (
+    JOB_NAME,
+    get_last_run,
+    get_lock,
+    get_recent_runs,
+    ingestion_scheduler,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 正在运行的后台回填（保留引用，避免任务被回收）
+_backfill_tasks = set()
+# 本进程中已安排执行的回填：任务 ID -> 后台任务（任务锁不可重入，同一 worker 内的重复请求靠它拒绝）
+_running_backfills: Dict[int, asyncio.Task] = {}
+
+
+@router.get("/status", response_model=IngestionStatus)
+async def get_job_status(db: AsyncSession = Depends(get_async_db)):
+    """
+    获取定时采集任务状态（最近一次运行的耗时和新增记录数）
+    """
+    lock = await db.run_sync(get_lock)
+    last_run = await db.run_sync(get_last_run)
+    last_success = await db.run_sync(get_last_run, status='success')
+    return IngestionStatus(
+        job_name=JOB_NAME,
+        enabled=settings.INGESTION_ENABLED,
+        running=ingestion_scheduler.running,
+        worker_id=ingestion_scheduler.worker_id,
+        interval_seconds=ingestion_scheduler.interval_seconds,
+        lookback_days=ingestion_scheduler.lookback_days,
+        next_run_at=ingestion_scheduler.next_run_at,
+        lock=lock,
+        last_run=last_run,
+        last_success=last_success
+    )
+
+
+@router.get("/runs", response_model=IngestionRunList)
+async def get_job_runs(
+    limit: int = Query(20, ge=1, le=200, description="返回条数"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取定时采集运行历史（按开始时间倒序）
+    """
+    runs = await db.run_sync(get_recent_runs, limit=limit)
+    return IngestionRunList(total_count=len(runs), runs=runs)
+
+
+@router.post("/run", response_model=IngestionRun)
+async def trigger_job():
+    """
+    立即执行一次采集
+    """
+    run = await ingestion_scheduler.run_once()
+    if run is None:
+        raise HTTPException(status_code=409, detail="采集任务正在运行")
+    return run
+
+
+def _run_backfill_in_background(service: BackfillService, job_id: int):
+    """在线程中执行回填，完成后移除任务引用和运行标记"""
+    async def runner():
+        try:
+            await asyncio.to_thread(service.run, job_id)
+        except BackfillInProgressError:
+            logger.info("回填任务 %s 已在其他 worker 中运行", job_id)
+        except Exception:
+            logger.exception("回填任务 %s 执行失败", job_id)
+        finally:
+            if _running_backfills.get(job_id) is asyncio.current_task():
+                del _running_backfills[job_id]
+
+    task = asyncio.create_task(runner())
+    _running_backfills[job_id] = task
+    _backfill_tasks.add(task)
+    task.add_done_callback(_backfill_tasks.discard)
+
+
+@router.post("/backfill", response_model=BackfillJob, status_code=202)
+async def start_backfill(
+    request: BackfillRequest,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    创建（或续跑）历史数据回填任务并在后台执行，通过 GET /backfill/{job_id} 查看进度
+    """
+    if request.start_date > request.end_date:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+
+    service = BackfillService(session_factory, parallelism=request.parallelism)
+    job = await asyncio.to_thread(
+        service.create_job, request.market_type, request.start_date, request.end_date,
+        request.chunk_days, request.resume
+    )
+    # 本进程内的检查和登记之间没有 await，同一 worker 的并发请求只有一个能安排执行
+    if await db.run_sync(is_backfill_running, job.id) or job.id in _running_backfills:
+        raise HTTPException(status_code=409, detail=f"回填任务 {job.id} 正在运行")
+
+    _run_backfill_in_background(service, job.id)
+    return job_to_dict(job)
+
+
+@router.get("/backfill", response_model=BackfillJobList)
+async def list_backfill_jobs(
+    limit: int = Query(20, ge=1, le=200, description="返回条数"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取最近的回填任务
+    """
+    jobs = await db.run_sync(get_recent_backfill_jobs, limit=limit)
+    return BackfillJobList(total_count=len(jobs), jobs=[job_to_dict(job) for job in jobs])
+
+
+@router.get("/backfill/{job_id}", response_model=BackfillJob)
+async def get_backfill(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    获取回填任务进度（已完成分块数、行数和吞吐量）
+    """
+    job = await db.run_sync(get_backfill_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="回填任务不存在")
+    return job_to_dict(job)
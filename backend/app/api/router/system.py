@@ -0,0 +1,32 @@
+"""
+系统运行状态路由
+"""
+from fastapi import APIRouter
+
+from app.db.pool_metrics import get_pool_stats
+from app.services.upstream_client import upstream_client
+
+router = APIRouter()
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    """
+    获取数据库连接池指标（签出等待时间、活跃连接数、超时次数），用于确定连接池大小
+    每个 worker 进程各自统计
+    """
+    return {
+        "status": "success",
+        "pools": get_pool_stats()
+    }
+
+
+@router.get("/upstream")
+async def get_upstream_stats():
+    """
+    获取上游数据源调用统计（尝试次数、重试、限速/退避等待时间、合并命中数）
+    """
+    return {
+        "status": "success",
+        "sources": upstream_client.stats()
+    }
@@ -1,55 +1,64 @@
 """
 用户路由
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.api.dependencies.deps import get_db
-from app.services.user import user_service
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.api.dependencies.deps import get_async_db
+from app.services.user import async_user_service
+from app.schemas.user import User, UserCreate, UserList, UserUpdate
+from app.utils.cursor import InvalidCursorError
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[User])
-async def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取用户列表"""
-    users = user_service.get_users(db, skip=skip, limit=limit)
-    return users
+@router.get("/", response_model=UserList)
+async def read_users(
+    skip: int = Query(0, ge=0, description="跳过条数（旧版 offset 分页，提供 cursor 时忽略）"),
+    limit: int = Query(100, ge=1, le=1000, description="每页条数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取用户列表（按 ID keyset 分页；skip 仍可用，之后的页用 next_cursor 继续）"""
+    try:
+        users, next_cursor = await async_user_service.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return UserList(users=users, next_cursor=next_cursor)
 
 
 @router.post("/", response_model=User)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """创建用户"""
-    db_user = user_service.get_user_by_username(db, username=user.username)
+    db_user = await async_user_service.get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="用户名已存在")
-    return user_service.create_user(db=db, user=user)
+    return await async_user_service.create_user(db=db, user=user)
 
 
 @router.get("/{user_id}", response_model=User)
-async def read_user(user_id: int, db: Session = Depends(get_db)):
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """获取用户详情"""
-    db_user = user_service.get_user(db, user_id=user_id)
+    db_user = await async_user_service.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="用户不存在")
     return db_user
 
 
 @router.put("/{user_id}", response_model=User)
-async def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db)):
     """更新用户"""
-    db_user = user_service.update_user(db=db, user_id=user_id, user=user)
+    db_user = await async_user_service.update_user(db=db, user_id=user_id, user=user)
     if db_user is None:
         raise HTTPException(status_code=404, detail="用户不存在")
     return db_user
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """删除用户"""
-    success = user_service.delete_user(db=db, user_id=user_id)
+    success = await async_user_service.delete_user(db=db, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="用户不存在")
     return {"message": "用户删除成功"}
@@ -0,0 +1,158 @@
+"""
+命令行工具
+
+用法（在 backend 目录执行）：
+    python -m app.cli rebuild-rollups [--market domestic]
+    python -m app.cli backfill --market domestic --start 2010-01-01 --end 2024-12-31 [--chunk-days 90] [--parallelism 4]
+    python -m app.cli backfill --job-id 3            # 续跑指定任务
+    python -m app.cli fixtures --rows 1000000 [--market domestic] [--start 1800-01-01] [--seed 42] [--mark-covered]
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime
+
+from app.db.database import Base, SessionLocal, engine
+
+# 导入所有模型，以确保它们被注册到 Base.metadata
+from app.models import gold_price  # noqa
+from app.models import user  # noqa
+from app.models import ingestion  # noqa
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    """根据日线数据重建周/月/年汇总表"""
+    from app.services.rollup_service import RollupService
+
+    db = SessionLocal()
+    try:
+        markets = [args.market] if args.market else None
+        result = RollupService(db).rebuild(markets)
+    finally:
+        db.close()
+
+    for market_type, counts in result.items():
+        summary = ", ".join(f"{period}={count}" for period, count in counts.items())
+        print(f"{market_type}: {summary}")
+    return 0
+
+
+def _parse_date(value: str) -> date:
+    """解析 YYYY-MM-DD 日期参数"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式错误: {value}，应为 YYYY-MM-DD")
+
+
+def backfill(args: argparse.Namespace) -> int:
+    """分块并行回填历史数据，中断后再次运行相同命令会从检查点续跑"""
+    from app.services.backfill_service import BackfillInProgressError, BackfillService
+
+    service = BackfillService(SessionLocal, parallelism=args.parallelism)
+    if args.job_id is not None:
+        job_id = args.job_id
+    else:
+        if not (args.market and args.start and args.end):
+            print("需要指定 --market、--start、--end，或用 --job-id 续跑已有任务", file=sys.stderr)
+            return 2
+        try:
+            job = service.create_job(args.market, args.start, args.end,
+                                     chunk_days=args.chunk_days, resume=not args.no_resume)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 2
+        job_id = job.id
+        print(f"回填任务 {job.id}: {job.market_type} {job.start_date}~{job.end_date} "
+              f"共 {job.chunks_total} 块，已完成 {job.chunks_done} 块")
+
+    def report(progress):
+        print(f"[{progress['chunks_done']:>4}/{progress['chunks_total']}] "
+              f"{progress['chunk_start']}~{progress['chunk_end']} {progress['chunk_status']:<7} "
+              f"rows={progress['chunk_rows']:<5} "
+              f"{progress['rows_per_second']:.1f} rows/s {progress['chunks_per_second']:.2f} chunks/s")
+
+    try:
+        result = service.run(job_id, progress=report)
+    except BackfillInProgressError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(f"{result['status']}: {result['chunks_done']}/{result['chunks_total']} 块, "
+          f"获取 {result['rows_fetched']} 行, 新增 {result['rows_inserted']} 行, "
+          f"耗时 {result['duration_seconds']:.1f}s")
+    return 0 if result['status'] == 'success' else 1
+
+
+def fixtures(args: argparse.Namespace) -> int:
+    """写入大批量模拟日线（压测 / 基准用），每个市场从 --start 起连续 --rows 个交易日"""
+    from app.services.gold_price_service import GoldPriceService
+    from app.utils.mock_data import MockPriceGenerator
+
+    markets = [args.market] if args.market else ["domestic", "international"]
+    db = SessionLocal()
+    try:
+        for market_type in markets:
+            started = time.perf_counter()
+
+            def report(rows):
+                elapsed = time.perf_counter() - started
+                print(f"{market_type}: {rows:,}/{args.rows:,} 行, {rows / elapsed:,.0f} rows/s")
+
+            generator = MockPriceGenerator(market_type, seed=args.seed)
+            result = GoldPriceService(db).bulk_load(generator.iter_frames(args.start, args.rows, args.chunk_size),
+                                                   replace=args.replace, progress=report,
+                                                   mark_covered=args.mark_covered)
+            print(f"{market_type}: 完成 {result['rows']:,} 行（含汇总和快照）, "
+                  f"耗时 {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="WebTools 后端命令行工具")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rebuild-rollups", help="重建黄金价格周/月/年汇总表")
+    rollups.add_argument("--market", choices=["domestic", "international"], help="只重建指定市场")
+    rollups.set_defaults(handler=rebuild_rollups)
+
+    backfill_parser = commands.add_parser("backfill", help="分块并行回填历史数据（可断点续跑）")
+    backfill_parser.add_argument("--market", choices=["domestic", "international"], help="市场类型")
+    backfill_parser.add_argument("--start", type=_parse_date, help="开始日期 YYYY-MM-DD")
+    backfill_parser.add_argument("--end", type=_parse_date, help="结束日期 YYYY-MM-DD")
+    backfill_parser.add_argument("--chunk-days", type=int, help="每块天数，默认 BACKFILL_CHUNK_DAYS")
+    backfill_parser.add_argument("--parallelism", type=int, help="并发分块数，默认 BACKFILL_PARALLELISM")
+    backfill_parser.add_argument("--job-id", type=int, help="续跑指定的回填任务")
+    backfill_parser.add_argument("--no-resume", action="store_true", help="不复用未完成的同参数任务，重新创建")
+    backfill_parser.set_defaults(handler=backfill)
+
+    fixtures_parser = commands.add_parser("fixtures", help="写入大批量模拟日线（压测 / 基准用）")
+    fixtures_parser.add_argument("--rows", type=int, required=True, help="每个市场的交易日数")
+    fixtures_parser.add_argument("--market", choices=["domestic", "international"], help="只写入指定市场")
+    fixtures_parser.add_argument("--start", type=_parse_date, default=date(1800, 1, 1),
+                                 help="第一个交易日 YYYY-MM-DD，默认 1800-01-01（数百万行时向后延伸到公元 5000 年以后）")
+    fixtures_parser.add_argument("--seed", type=int, default=42, help="随机数种子，默认 42")
+    fixtures_parser.add_argument("--chunk-size", type=int, default=50_000, help="每次提交的行数")
+    fixtures_parser.add_argument("--replace", action="store_true", help="覆盖已存在的记录（默认保留）")
+    fixtures_parser.add_argument("--mark-covered", action="store_true",
+                                 help="把写入的日期范围记为已同步（压测库不再向数据源补数）")
+    fixtures_parser.set_defaults(handler=fixtures)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    args = build_parser().parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+进程内缓存
+
+带容量上限（LRU 淘汰）和过期时间（TTL）的线程安全缓存，条目可以打标签，
+按标签批量失效（例如某个市场写入新数据后失效该市场的所有缓存）。
+每个标签有一个失效代数，生成缓存值前记下代数、写入时代数已变化则放弃写入，
+避免生成期间发生的失效被随后写入的旧值覆盖。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """LRU + TTL 缓存"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        :param maxsize: 最大条目数，超出后淘汰最久未使用的条目
+        :param ttl: 条目有效期（秒）
+        :param clock: 时钟函数（测试时可替换）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        # key -> (过期时间, 值, 标签)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        # 标签 -> 失效代数（每次 invalidate 加一，clear 不重置）
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，未命中或已过期返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """各标签当前的失效代数（生成缓存值之前读取，写入时传给 set）"""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (),
+            generations: Optional[Tuple[int, ...]] = None) -> bool:
+        """
+        写入缓存
+        :param generations: 生成 value 之前 generations(tags) 的结果；期间有标签被失效时不写入
+        :return: 是否写入
+        """
+        tags = tuple(tags)
+        with self._lock:
+            if generations is not None and generations != tuple(self._generations.get(tag, 0) for tag in tags):
+                return False
+            self._entries[key] = (self._clock() + self.ttl, value, set(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, tag: str) -> int:
+        """
+        失效带指定标签的所有条目
+        :return: 失效的条目数
+        """
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            keys = [key for key, (_, _, tags) in self._entries.items() if tag in tags]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存（不重置计数）"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中/淘汰计数"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+# 读接口响应缓存
+response_cache = TTLCache(
+    maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,253 @@
+"""
+请求级耗时统计与 Prometheus 指标
+
+每个 HTTP 请求在上下文变量中持有一个 RequestTiming，请求内的各环节向它累加：
+- SQL：引擎的 before/after_cursor_execute 事件记录语句数和执行耗时（同步、异步引擎都计入；
+  asyncio.to_thread 和 SQLAlchemy 的异步适配层都会沿用调用方的上下文）
+- 上游：UpstreamClient.fetch 按数据源记录耗时（含等待合并请求的时间）
+- 行数：读取服务返回的记录数
+- 阶段：timed_span 包住的代码段（例如响应体的生成和序列化）
+
+请求结束后由中间件写入 Server-Timing 响应头，并汇总到下面的直方图，/metrics 以 Prometheus 文本格式输出。
+每个 worker 进程各自统计。
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+# 耗时直方图的桶上限（秒）
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 每个请求的 SQL 语句数
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# 每个请求读取的行数
+ROW_BUCKETS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class Histogram:
+    """带标签的累积直方图（Prometheus histogram 语义，线程安全）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # 标签值 -> (各桶计数（最后一个为 +Inf）, 总和)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any):
+        """记录一个观测值"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """各标签组合的 {'count', 'sum', 'buckets': {上限: 累积计数}}"""
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        result = {}
+        for key, (counts, total) in series.items():
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                running += count
+                cumulative[bound] = running
+            result[key] = {'count': running, 'sum': total, 'buckets': cumulative}
+        return result
+
+    def render(self) -> List[str]:
+        """Prometheus 文本格式的行"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, sample in sorted(self.samples().items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            for bound, count in sample['buckets'].items():
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                bucket_labels = ','.join(labels + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {sample['sum']:.6g}")
+            lines.append(f"{self.name}_count{suffix} {sample['count']}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', "HTTP 请求总耗时", ('method', 'route', 'status'))
+REQUEST_SQL_STATEMENTS = Histogram(
+    'http_request_sql_statements', "每个请求执行的 SQL 语句数", ('route',), STATEMENT_BUCKETS)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', "每个请求的 SQL 执行耗时", ('route',))
+REQUEST_ROWS = Histogram(
+    'http_request_rows', "每个请求从数据库读取的行数", ('route',), ROW_BUCKETS)
+UPSTREAM_FETCH_DURATION = Histogram(
+    'upstream_fetch_duration_seconds', "上游数据源调用耗时（含限速等待和重试）", ('source', 'outcome'))
+
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_SQL_STATEMENTS, REQUEST_SQL_DURATION, REQUEST_ROWS, UPSTREAM_FETCH_DURATION)
+
+
+def render_metrics() -> str:
+    """所有指标的 Prometheus 文本格式"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    """清空所有指标（测试用）"""
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+class RequestTiming:
+    """单个请求内累计的耗时（线程池中的同步代码也会写入，因此加锁）"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.upstream: Dict[str, float] = {}
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_sql(self, seconds: float):
+        with self._lock:
+            self.sql_count += 1
+            self.sql_seconds += seconds
+
+    def add_rows(self, count: int):
+        with self._lock:
+            self.rows += count
+
+    def add_upstream(self, source: str, seconds: float):
+        with self._lock:
+            self.upstream[source] = self.upstream.get(source, 0.0) + seconds
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """
+        Server-Timing 响应头，例如：
+        total;dur=12.3, sql;dur=4.1;desc="3 queries", upstream-domestic;dur=0.8, build;dur=9.0, rows;desc="250"
+        """
+        with self._lock:
+            parts = [f"total;dur={(self.elapsed() if total is None else total) * 1000:.1f}",
+                     f'sql;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} queries"']
+            parts.extend(f"upstream-{source};dur={seconds * 1000:.1f}" for source, seconds in self.upstream.items())
+            parts.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items())
+            parts.append(f'rows;desc="{self.rows}"')
+        return ', '.join(parts)
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar('request_timing', default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """当前请求的 RequestTiming（不在请求中时为 None）"""
+    return _current_timing.get()
+
+
+@contextmanager
+def request_timing() -> Iterator[RequestTiming]:
+    """在当前上下文中开始统计一个请求"""
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+
+def record_rows(count: int):
+    """记录当前请求从数据库读取的行数"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.add_rows(count)
+
+
+def record_upstream(source: str, seconds: float):
+    """记录当前请求等待上游数据源的耗时"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.add_upstream(source, seconds)
+
+
+@contextmanager
+def timed_span(name: str):
+    """把代码段的耗时计入当前请求的 Server-Timing"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_span(name, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timing.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current_timing.get()
+    started = conn.info.get('query_started')
+    if timing is not None and started:
+        timing.add_sql(time.perf_counter() - started.pop())
+
+
+def _handle_error(context):
+    # 语句执行出错时不会触发 after_cursor_execute，丢弃对应的开始时间
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_sql(engine):
+    """为引擎注册 SQL 计数和计时（异步引擎传入 AsyncEngine 或其 sync_engine 均可）"""
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', _handle_error)
+
+
+def log_event(logger: logging.Logger, name: str, level: int = logging.INFO, **fields: Any):
+    """
+    输出结构化事件日志：消息为 "name key=value ..."，字段同时放在 LogRecord 的 event_fields 属性中，
+    便于 JSON 格式化器直接输出
+    """
+    if not logger.isEnabledFor(level):
+        return
+    message = ' '.join([name] + [f"{key}={_format_field(value)}" for key, value in fields.items()])
+    logger.log(level, message, extra={'event': name, 'event_fields': fields})
+
+
+def _format_field(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value)
+    return f'"{text}"' if ' ' in text or not text else text
@@ -0,0 +1,156 @@
+"""
+连接池指标
+
+记录每个引擎连接池的签出等待时间（含新建连接的耗时）、当前活跃连接数和峰值、
+等待超时次数，用于在生产环境中确定连接池大小。
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolMetrics:
+    """单个连接池的指标"""
+
+    def __init__(self, name: str, window: int = 1024):
+        """
+        :param name: 引擎名称（sync / async）
+        :param window: 用于计算等待时间分位数的最近签出次数
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.active = 0
+        self.peak_active = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        """记录一次签出等待"""
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.checkins += 1
+            self.active = max(self.active - 1, 0)
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        """指标快照；传入连接池时附带池的当前状态"""
+        with self._lock:
+            waits = np.fromiter(self._waits, dtype='float64')
+            result = {
+                'name': self.name,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'active': self.active,
+                'peak_active': self.peak_active,
+                'wait_avg_ms': self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_p50_ms': float(np.percentile(waits, 50)) * 1000 if len(waits) else 0.0,
+                'wait_p95_ms': float(np.percentile(waits, 95)) * 1000 if len(waits) else 0.0,
+                'wait_max_ms': self.wait_max * 1000,
+            }
+        if pool is not None:
+            result['pool_class'] = type(pool).__name__
+            if isinstance(pool, QueuePool):
+                result.update({
+                    'pool_size': pool.size(),
+                    'checked_in': pool.checkedin(),
+                    'checked_out': pool.checkedout(),
+                    'overflow': pool.overflow(),
+                    'max_overflow': pool._max_overflow,
+                })
+        return result
+
+
+class _TimedCheckoutMixin:
+    """在 _do_get（从队列取连接或新建连接）外层计时"""
+
+    _metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self._metrics is not None:
+                self._metrics.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，指标对象沿用到新池
+        pool = super().recreate()
+        pool._metrics = self._metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """记录签出等待时间的 QueuePool"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """记录签出等待时间的 AsyncAdaptedQueuePool"""
+
+
+# 引擎名称 -> (指标, 引擎)
+_registry: Dict[str, Any] = {}
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """
+    为引擎的连接池注册指标（异步引擎传入 AsyncEngine 或其 sync_engine 均可）
+    :return: 该引擎的指标对象
+    """
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    metrics = PoolMetrics(name)
+    handlers = {
+        'checkout': metrics.on_checkout,
+        'checkin': metrics.on_checkin,
+        'connect': metrics.on_connect,
+        'invalidate': metrics.on_invalidate,
+    }
+    for event_name, handler in handlers.items():
+        event.listen(sync_engine, event_name, handler)
+    if isinstance(sync_engine.pool, _TimedCheckoutMixin):
+        sync_engine.pool._metrics = metrics
+    _registry[name] = (metrics, sync_engine)
+    return metrics
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """所有已注册引擎的连接池指标"""
+    return {name: metrics.stats(engine.pool) for name, (metrics, engine) in _registry.items()}
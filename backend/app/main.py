@@ -1,25 +1,46 @@
 """
 FastAPI 主应用入口
 """
+import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.api.middleware import TimingMiddleware
 from app.core.config import settings
+from app.core.metrics import render_metrics
 from app.db.database import engine, Base
 
 # 导入所有模型，以确保它们被注册到 Base.metadata
 from app.models import gold_price  # noqa
 from app.models import user  # noqa
+from app.models import ingestion  # noqa
+from app.services.ingestion_scheduler import ingestion_scheduler
+
+# 应用日志（已由运行环境配置过根日志时不覆盖）
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
 # 创建所有数据库表
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动/停止后台定时采集"""
+    if settings.INGESTION_ENABLED:
+        await ingestion_scheduler.start()
+    yield
+    await ingestion_scheduler.stop()
+
+
 # 应用实例
 app = FastAPI(
     title=settings.APP_NAME,
     description="WebTools 项目后端 API",
     version=settings.APP_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS 中间件
@@ -29,11 +50,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 浏览器开发者工具可以读取跨域响应的 Server-Timing
+    expose_headers=["Server-Timing", "X-Data-Freshness"],
 )
 
+# 请求计时（Server-Timing 响应头和 /metrics 中的请求指标）
+app.add_middleware(TimingMiddleware)
+
 # API 路由注册
 from app.api.router.user import router as user_router
 from app.api.router.gold_price import router as gold_price_router
+from app.api.router.ingestion import router as ingestion_router
+from app.api.router.system import router as system_router
 
 # 注册用户路由
 app.include_router(user_router, prefix=settings.API_V1_STR + "/users", tags=["users"])
@@ -41,11 +69,22 @@ app.include_router(user_router, prefix=settings.API_V1_STR + "/users", tags=["us
 # 注册黄金价格路由
 app.include_router(gold_price_router, prefix=settings.API_V1_STR + "/gold", tags=["gold"])
 
+# 注册定时采集任务路由
+app.include_router(ingestion_router, prefix=settings.API_V1_STR + "/gold/jobs", tags=["jobs"])
+
+# 注册系统状态路由
+app.include_router(system_router, prefix=settings.API_V1_STR + "/system", tags=["system"])
+
 # 健康检查端点
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+# Prometheus 指标（每个 worker 进程各自统计）
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # 根路径
 @app.get("/")
 async def root():
@@ -1,7 +1,7 @@
 """
 黄金价格数据模型
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -12,9 +12,9 @@ class GoldPrice(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     # 数据类型：国内(domestic)或国际(international)
-    market_type = Column(String(20), nullable=False, index=True)
+    market_type = Column(String(20), nullable=False)
     # 日期
-    date = Column(DateTime(timezone=True), nullable=False, index=True)
+    date = Column(DateTime(timezone=True), nullable=False)
     # 开盘价
     open_price = Column(Float, nullable=True)
     # 最高价
@@ -28,9 +28,13 @@ class GoldPrice(Base):
     # 创建时间
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    # 复合唯一索引：市场类型 + 日期
+    # 复合唯一索引：市场类型 + 日期（同时服务于按市场、日期区间查询并按日期排序）
+    # 收盘价覆盖索引：分析、比价读取 (日期, 收盘价) 序列时只扫描索引，不回表；
+    # 整行 OHLCV 的覆盖索引实测读取没有明显收益，却让每百万行多约 70MB、写入更慢，不再使用
+    # market_type、date 的单列索引是这两个复合索引的前缀或从未单独使用，已移除
     __table_args__ = (
         UniqueConstraint('market_type', 'date', name='uix_market_date'),
+        Index('ix_gold_prices_market_date_close', 'market_type', 'date', 'close_price'),
     )
 
     def __repr__(self):
@@ -48,3 +52,68 @@ class GoldPriceMetadata(Base):
 
     def __repr__(self):
         return f"<GoldPriceMetadata(market_type={self.market_type}, last_update={self.last_update})>"
+
+
+class GoldPriceCoverage(Base):
+    """黄金价格覆盖区间（按交易日历连续、已同步过的日期区间）"""
+    __tablename__ = "gold_price_coverage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    market_type = Column(String(20), nullable=False, index=True)
+    # 区间起止日期（含）
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('market_type', 'start_date', name='uix_coverage_market_start'),
+    )
+
+    def __repr__(self):
+        return f"<GoldPriceCoverage(market_type={self.market_type}, start_date={self.start_date}, end_date={self.end_date})>"
+
+
+class GoldPriceRollup(Base):
+    """黄金价格周期汇总（周/月/年 OHLCV，由日线数据增量维护）"""
+    __tablename__ = "gold_price_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    market_type = Column(String(20), nullable=False)
+    # 周期：week / month / year
+    period = Column(String(10), nullable=False)
+    # 周期起始日（周一 / 月初 / 年初）
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    open_price = Column(Float, nullable=True)
+    high_price = Column(Float, nullable=True)
+    low_price = Column(Float, nullable=True)
+    close_price = Column(Float, nullable=False)
+    volume = Column(Float, nullable=True)
+    # 周期内的日线条数
+    bar_count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('market_type', 'period', 'period_start', name='uix_rollup_market_period_start'),
+    )
+
+    def __repr__(self):
+        return f"<GoldPriceRollup(market_type={self.market_type}, period={self.period}, period_start={self.period_start})>"
+
+
+class GoldPriceSnapshot(Base):
+    """黄金价格最新快照（每个市场一行，随数据写入更新）"""
+    __tablename__ = "gold_price_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    market_type = Column(String(20), unique=True, nullable=False, index=True)
+    latest_date = Column(DateTime(timezone=True), nullable=False)
+    latest_price = Column(Float, nullable=False)
+    previous_date = Column(DateTime(timezone=True), nullable=True)
+    previous_price = Column(Float, nullable=True)
+    change = Column(Float, nullable=True)
+    change_percent = Column(Float, nullable=True)
+    volume = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<GoldPriceSnapshot(market_type={self.market_type}, latest_date={self.latest_date}, latest_price={self.latest_price})>"
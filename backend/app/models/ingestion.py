@@ -0,0 +1,99 @@
+"""
+数据采集任务模型
+"""
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class IngestionLock(Base):
+    """任务锁（多进程部署时保证同一时刻只有一个 worker 执行采集）"""
+    __tablename__ = "ingestion_locks"
+
+    name = Column(String(50), primary_key=True)
+    # 持有者标识：主机名:进程号
+    owner = Column(String(100), nullable=False)
+    acquired_at = Column(DateTime(timezone=True), nullable=False)
+    # 过期时间，持有者异常退出后锁可被其他 worker 接管
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<IngestionLock(name={self.name}, owner={self.owner}, expires_at={self.expires_at})>"
+
+
+class IngestionRun(Base):
+    """采集任务运行记录"""
+    __tablename__ = "ingestion_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(50), nullable=False, index=True)
+    # 状态：running / success / partial / failed
+    status = Column(String(20), nullable=False)
+    owner = Column(String(100), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # 耗时（秒）
+    duration_seconds = Column(Float, nullable=True)
+    # 新增记录数
+    rows_ingested = Column(Integer, nullable=False, default=0)
+    message = Column(Text, nullable=True)
+    # 各市场的同步结果
+    details = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<IngestionRun(job_name={self.job_name}, status={self.status}, started_at={self.started_at})>"
+
+
+class BackfillJob(Base):
+    """历史数据回填任务"""
+    __tablename__ = "backfill_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    market_type = Column(String(20), nullable=False, index=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # 每个分块的天数
+    chunk_days = Column(Integer, nullable=False)
+    # 状态：pending / running / success / partial / failed
+    status = Column(String(20), nullable=False, default='pending')
+    owner = Column(String(100), nullable=True)
+    chunks_total = Column(Integer, nullable=False, default=0)
+    chunks_done = Column(Integer, nullable=False, default=0)
+    chunks_failed = Column(Integer, nullable=False, default=0)
+    # 从数据源获取的行数 / 新增的行数
+    rows_fetched = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # 累计运行耗时（秒，多次续跑累加）
+    duration_seconds = Column(Float, nullable=False, default=0.0)
+    message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<BackfillJob(id={self.id}, market_type={self.market_type}, status={self.status})>"
+
+
+class BackfillChunk(Base):
+    """回填任务的分块（断点续跑的检查点）"""
+    __tablename__ = "backfill_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("backfill_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_start = Column(Date, nullable=False)
+    chunk_end = Column(Date, nullable=False)
+    # 状态：pending / success / failed
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    rows_fetched = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('job_id', 'chunk_start', name='uix_backfill_chunk_job_start'),
+    )
+
+    def __repr__(self):
+        return f"<BackfillChunk(job_id={self.job_id}, {self.chunk_start}~{self.chunk_end}, status={self.status})>"
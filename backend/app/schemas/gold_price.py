@@ -2,7 +2,7 @@
 黄金价格 Pydantic 模型
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -46,6 +46,72 @@ class GoldPriceResponse(BaseModel):
     start_date: datetime
     end_date: datetime
     total_count: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标（分页请求且还有数据时返回）")
+    freshness: Optional[str] = Field(None, description="fresh：区间内数据完整；stale：有缺失区间，已在后台补数")
+
+
+class GoldPriceColumnar(BaseModel):
+    """黄金价格列式响应（并列数组，适用于图表）"""
+    market_type: str
+    start_date: datetime
+    end_date: datetime
+    total_count: int
+    dates: List[str] = Field(..., description="日期 (YYYY-MM-DD)")
+    open: List[Optional[float]] = Field(..., description="开盘价")
+    high: List[Optional[float]] = Field(..., description="最高价")
+    low: List[Optional[float]] = Field(..., description="最低价")
+    close: List[Optional[float]] = Field(..., description="收盘价")
+    volume: List[Optional[float]] = Field(..., description="成交量")
+    interval: Optional[str] = Field(None, description="聚合周期：week / month / year")
+    source_count: Optional[int] = Field(None, description="降采样前的数据条数")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（分页请求且还有数据时返回）")
+    freshness: Optional[str] = Field(None, description="fresh：区间内数据完整；stale：有缺失区间，已在后台补数")
+
+
+class AnalyticsSummary(BaseModel):
+    """区间统计汇总"""
+    total_return: Optional[float] = Field(None, description="区间收益率")
+    annualized_volatility: Optional[float] = Field(None, description="区间年化波动率（对数收益率）")
+    max_drawdown: Optional[float] = Field(None, description="最大回撤（<= 0）")
+    max_drawdown_peak_date: Optional[str] = Field(None, description="最大回撤起点日期")
+    max_drawdown_trough_date: Optional[str] = Field(None, description="最大回撤谷底日期")
+    latest_rsi: Optional[float] = Field(None, description="最新 RSI")
+
+
+class PriceAnalytics(BaseModel):
+    """收盘价统计指标（并列数组，与 dates 等长）"""
+    market_type: str
+    start_date: datetime
+    end_date: datetime
+    total_count: int
+    windows: List[int] = Field(..., description="移动平均窗口")
+    volatility_window: int = Field(..., description="滚动波动率窗口")
+    rsi_period: int = Field(..., description="RSI 周期")
+    dates: List[str] = Field(..., description="日期 (YYYY-MM-DD)")
+    close: List[float] = Field(..., description="收盘价")
+    returns: List[Optional[float]] = Field(..., description="日收益率")
+    log_returns: List[Optional[float]] = Field(..., description="对数收益率")
+    moving_averages: Dict[str, List[Optional[float]]] = Field(..., description="移动平均，键为窗口大小")
+    volatility: List[Optional[float]] = Field(..., description="滚动年化波动率")
+    drawdown: List[Optional[float]] = Field(..., description="相对此前最高价的回撤")
+    rsi: List[Optional[float]] = Field(..., description="RSI")
+    summary: AnalyticsSummary
+
+
+class MarketComparison(BaseModel):
+    """国内 / 国际收盘价对齐对比（并列数组，与 dates 等长）"""
+    start_date: datetime
+    end_date: datetime
+    fill: str = Field(..., description="对齐策略：inner / ffill / outer")
+    correlation_window: int = Field(..., description="滚动相关系数窗口")
+    total_count: int
+    dates: List[str] = Field(..., description="日期 (YYYY-MM-DD)")
+    domestic: List[Optional[float]] = Field(..., description="国内收盘价")
+    international: List[Optional[float]] = Field(..., description="国际收盘价")
+    spread: List[Optional[float]] = Field(..., description="价差（国内 - 国际）")
+    ratio: List[Optional[float]] = Field(..., description="比值（国内 / 国际）")
+    correlation: List[Optional[float]] = Field(..., description="对数收益率的滚动相关系数")
+    overall_correlation: Optional[float] = Field(None, description="区间内对数收益率的相关系数")
 
 
 class DateRangeQuery(BaseModel):
@@ -0,0 +1,89 @@
+"""
+数据采集任务 Pydantic 模型
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, datetime
+
+
+class IngestionRun(BaseModel):
+    """任务运行记录"""
+    id: int
+    job_name: str
+    status: str
+    owner: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    rows_ingested: int = 0
+    message: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+    model_config = {"from_attributes": True}
+
+
+class IngestionLockInfo(BaseModel):
+    """任务锁信息"""
+    owner: str
+    acquired_at: datetime
+    expires_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class IngestionStatus(BaseModel):
+    """任务状态"""
+    job_name: str
+    enabled: bool
+    running: bool
+    worker_id: str
+    interval_seconds: int
+    lookback_days: int
+    next_run_at: Optional[datetime] = None
+    lock: Optional[IngestionLockInfo] = None
+    last_run: Optional[IngestionRun] = None
+    last_success: Optional[IngestionRun] = None
+
+
+class IngestionRunList(BaseModel):
+    """任务运行历史"""
+    total_count: int
+    runs: List[IngestionRun]
+
+
+class BackfillRequest(BaseModel):
+    """历史数据回填请求"""
+    market_type: Literal['domestic', 'international']
+    start_date: date
+    end_date: date
+    chunk_days: Optional[int] = Field(None, ge=1, le=3660, description="每块天数")
+    parallelism: Optional[int] = Field(None, ge=1, le=32, description="并发分块数")
+    resume: bool = Field(True, description="存在参数相同且未完成的任务时续跑该任务")
+
+
+class BackfillJob(BaseModel):
+    """回填任务进度"""
+    id: int
+    market_type: str
+    start_date: date
+    end_date: date
+    chunk_days: int
+    status: str
+    owner: Optional[str] = None
+    chunks_total: int
+    chunks_done: int
+    chunks_failed: int
+    rows_fetched: int
+    rows_inserted: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: float = 0.0
+    rows_per_second: Optional[float] = None
+    chunks_per_second: Optional[float] = None
+    message: Optional[str] = None
+
+
+class BackfillJobList(BaseModel):
+    """回填任务列表"""
+    total_count: int
+    jobs: List[BackfillJob]
@@ -1,8 +1,8 @@
 """
 用户 Pydantic 模型
 """
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -37,6 +37,12 @@ class User(UserBase):
     model_config = {"from_attributes": True}
 
 
+class UserList(BaseModel):
+    """用户列表（keyset 分页）"""
+    users: List[User]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，已是最后一页时为空")
+
+
 class UserInDB(User):
     """用户数据库模型"""
     hashed_password: str
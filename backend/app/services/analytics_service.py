@@ -0,0 +1,78 @@
+"""
+价格统计指标服务
+
+只读取日期和收盘价两列（走覆盖索引，不构造 ORM 对象），向量化计算收益率、移动平均、波动率、回撤和 RSI。
+滚动指标需要区间开始前的数据预热，因此会多读取一段历史，结果只返回请求区间。
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.gold_price_service import AsyncGoldPriceService
+from app.utils.analytics import compute_analytics
+from app.utils.series_codec import nullable_list
+
+# 预热的交易日数换算为自然日（周末和节假日），再加几天余量
+CALENDAR_DAYS_PER_BAR = 1.5
+WARMUP_MARGIN_DAYS = 10
+
+
+class AnalyticsService:
+    """价格统计指标"""
+
+    def __init__(self, db: AsyncSession):
+        """初始化服务"""
+        self.db = db
+
+    async def get_analytics(self, market_type: str, start_date: datetime, end_date: datetime,
+                            windows: Sequence[int], volatility_window: int,
+                            rsi_period: int) -> Optional[Dict[str, Any]]:
+        """
+        计算区间内收盘价序列的统计指标
+        :param windows: 移动平均窗口
+        :param volatility_window: 滚动波动率窗口
+        :param rsi_period: RSI 周期
+        :return: 列式指标和汇总值；区间内没有数据时返回 None
+        """
+        warmup_bars = max(max(windows, default=1), volatility_window + 1, rsi_period + 1)
+        warmup_start = start_date - timedelta(days=int(warmup_bars * CALENDAR_DAYS_PER_BAR) + WARMUP_MARGIN_DAYS)
+        series = await AsyncGoldPriceService(self.db).get_close_series(market_type, warmup_start, end_date)
+
+        # 收盘价缺失（数据源回退时记为 0）的交易日不参与计算
+        close = series.to_numpy(dtype='float64')
+        valid = np.isfinite(close) & (close > 0)
+        dates = series.index.to_numpy(dtype='datetime64[D]')[valid]
+        close = close[valid]
+
+        offset = int(np.searchsorted(dates, np.datetime64(start_date.date(), 'D')))
+        if offset >= len(close):
+            return None
+
+        result = compute_analytics(close, windows, volatility_window, rsi_period, offset=offset)
+        dates = np.datetime_as_string(dates[offset:], unit='D').tolist()
+        summary = dict(result['summary'])
+        for key in ('max_drawdown_peak', 'max_drawdown_trough'):
+            position = summary.pop(key)
+            summary[f'{key}_date'] = dates[position] if position is not None else None
+
+        return {
+            'market_type': market_type,
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_count': len(dates),
+            'windows': list(windows),
+            'volatility_window': volatility_window,
+            'rsi_period': rsi_period,
+            'dates': dates,
+            'close': close[offset:].tolist(),
+            'returns': nullable_list(result['returns']),
+            'log_returns': nullable_list(result['log_returns']),
+            'moving_averages': {str(window): nullable_list(values)
+                                for window, values in result['moving_averages'].items()},
+            'volatility': nullable_list(result['volatility']),
+            'drawdown': nullable_list(result['drawdown']),
+            'rsi': nullable_list(result['rsi']),
+            'summary': summary,
+        }
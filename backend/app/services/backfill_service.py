@@ -0,0 +1,285 @@
+"""
+历史数据回填服务
+
+把长日期区间切分为固定天数的分块，在线程池中以有限并发逐块同步（每块经 GoldPriceService
+获取并在独立事务中写入），每完成一块就在 backfill_chunks 中记录检查点：
+中断后用相同参数（或任务 ID）再次运行时只处理未完成的分块。
+同一任务同一时刻只能由一个进程执行（复用采集任务锁）。
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.ingestion import BackfillChunk, BackfillJob, IngestionLock
+from app.services.gold_price_service import GoldPriceService
+from app.services.ingestion_scheduler import WORKER_ID, acquire_lock, release_lock, renew_lock
+from app.services.rollup_service import RollupService
+from app.services.snapshot_service import SnapshotService
+
+logger = logging.getLogger(__name__)
+
+# 进度回调：progress(进度字典)
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class BackfillInProgressError(Exception):
+    """回填任务正在运行（任务锁被本进程或其他进程持有）"""
+
+
+def plan_chunks(start_date: date, end_date: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """把 [start_date, end_date] 切分为每块 chunk_days 天的子区间"""
+    if chunk_days < 1:
+        raise ValueError("chunk_days 必须大于 0")
+    chunks = []
+    current = start_date
+    while current <= end_date:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), end_date)
+        chunks.append((current, chunk_end))
+        current = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def job_to_dict(job: BackfillJob) -> Dict[str, Any]:
+    """回填任务转为字典（附带吞吐量）"""
+    duration = job.duration_seconds or 0.0
+    return {
+        'id': job.id,
+        'market_type': job.market_type,
+        'start_date': job.start_date,
+        'end_date': job.end_date,
+        'chunk_days': job.chunk_days,
+        'status': job.status,
+        'owner': job.owner,
+        'chunks_total': job.chunks_total,
+        'chunks_done': job.chunks_done,
+        'chunks_failed': job.chunks_failed,
+        'rows_fetched': job.rows_fetched,
+        'rows_inserted': job.rows_inserted,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'duration_seconds': duration,
+        'rows_per_second': job.rows_fetched / duration if duration else None,
+        'chunks_per_second': job.chunks_done / duration if duration else None,
+        'message': job.message,
+    }
+
+
+def get_backfill_job(db: Session, job_id: int) -> Optional[BackfillJob]:
+    """获取回填任务"""
+    return db.get(BackfillJob, job_id)
+
+
+def get_recent_backfill_jobs(db: Session, limit: int = 20) -> List[BackfillJob]:
+    """获取最近的回填任务"""
+    return db.execute(
+        select(BackfillJob).order_by(BackfillJob.id.desc()).limit(limit)
+    ).scalars().all()
+
+
+def is_backfill_running(db: Session, job_id: int) -> bool:
+    """回填任务是否正在某个进程中运行（任务锁存在且未过期）"""
+    lock = db.get(IngestionLock, _lock_name(job_id))
+    return lock is not None and lock.expires_at > datetime.now()
+
+
+def _lock_name(job_id: int) -> str:
+    """回填任务锁名称"""
+    return f"backfill:{job_id}"
+
+
+class BackfillService:
+    """历史数据回填"""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, parallelism: Optional[int] = None,
+                 worker_id: str = WORKER_ID):
+        """
+        :param session_factory: 会话工厂（每个分块使用独立会话）
+        :param parallelism: 同时处理的分块数
+        """
+        self.session_factory = session_factory
+        self.parallelism = max(parallelism or settings.BACKFILL_PARALLELISM, 1)
+        self.worker_id = worker_id
+
+    def create_job(self, market_type: str, start_date: date, end_date: date,
+                   chunk_days: Optional[int] = None, resume: bool = True) -> BackfillJob:
+        """
+        创建回填任务并登记所有分块
+        :param resume: 存在参数相同且未完成的任务时直接返回该任务（断点续跑）
+        """
+        chunk_days = chunk_days or settings.BACKFILL_CHUNK_DAYS
+        if start_date > end_date:
+            raise ValueError("开始日期不能晚于结束日期")
+        chunks = plan_chunks(start_date, end_date, chunk_days)
+
+        db = self.session_factory()
+        try:
+            if resume:
+                existing = db.execute(
+                    select(BackfillJob)
+                    .where(
+                        BackfillJob.market_type == market_type,
+                        BackfillJob.start_date == start_date,
+                        BackfillJob.end_date == end_date,
+                        BackfillJob.chunk_days == chunk_days,
+                        BackfillJob.status != 'success'
+                    )
+                    .order_by(BackfillJob.id.desc())
+                ).scalars().first()
+                if existing is not None:
+                    return existing
+
+            job = BackfillJob(market_type=market_type, start_date=start_date, end_date=end_date,
+                              chunk_days=chunk_days, status='pending', chunks_total=len(chunks))
+            db.add(job)
+            db.flush()
+            db.add_all([
+                BackfillChunk(job_id=job.id, chunk_start=chunk_start, chunk_end=chunk_end)
+                for chunk_start, chunk_end in chunks
+            ])
+            db.commit()
+            db.refresh(job)
+            return job
+        finally:
+            db.close()
+
+    def run(self, job_id: int, progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        执行（或续跑）回填任务：只处理未成功的分块
+        :param progress: 每完成一个分块调用一次，参数包含已完成分块数、行数和吞吐量
+        :return: 任务字典
+        :raises BackfillInProgressError: 任务正在运行（任务锁被持有）
+        """
+        lock_name = _lock_name(job_id)
+        db = self.session_factory()
+        try:
+            if not acquire_lock(db, lock_name, self.worker_id, settings.INGESTION_LOCK_TTL_SECONDS):
+                raise BackfillInProgressError(f"回填任务 {job_id} 正在运行")
+            try:
+                return self._run_locked(db, job_id, lock_name, progress)
+            finally:
+                release_lock(db, lock_name, self.worker_id)
+        finally:
+            db.close()
+
+    def _run_locked(self, db: Session, job_id: int, lock_name: str,
+                    progress: Optional[ProgressCallback]) -> Dict[str, Any]:
+        """持有任务锁时执行回填"""
+        job = db.get(BackfillJob, job_id)
+        if job is None:
+            raise ValueError(f"回填任务 {job_id} 不存在")
+
+        pending = db.execute(
+            select(BackfillChunk)
+            .where(BackfillChunk.job_id == job_id, BackfillChunk.status != 'success')
+            .order_by(BackfillChunk.chunk_start)
+        ).scalars().all()
+
+        job.status = 'running'
+        job.owner = self.worker_id
+        job.started_at = datetime.now()
+        job.finished_at = None
+        job.chunks_failed = 0
+        db.commit()
+
+        started = time.perf_counter()
+        base_duration = job.duration_seconds or 0.0
+        run_rows = 0
+        run_chunks = 0
+
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="backfill") as executor:
+            futures = {
+                executor.submit(self._run_chunk, job.market_type, chunk.chunk_start, chunk.chunk_end): chunk
+                for chunk in pending
+            }
+            # 检查点只在当前线程中写入，分块线程只负责获取和写入行情
+            for future in as_completed(futures):
+                chunk = futures[future]
+                chunk.attempts += 1
+                chunk.finished_at = datetime.now()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.exception("回填分块失败: %s %s~%s", job.market_type, chunk.chunk_start, chunk.chunk_end)
+                    chunk.status = 'failed'
+                    chunk.error = str(e)
+                    job.chunks_failed += 1
+                else:
+                    chunk.status = 'success'
+                    chunk.error = None
+                    chunk.rows_fetched = result.get('fetched_count', 0)
+                    chunk.rows_inserted = result.get('saved_count', 0)
+                    job.chunks_done += 1
+                    job.rows_fetched += chunk.rows_fetched
+                    job.rows_inserted += chunk.rows_inserted
+                    run_rows += chunk.rows_fetched
+                    run_chunks += 1
+
+                elapsed = time.perf_counter() - started
+                job.duration_seconds = base_duration + elapsed
+                db.commit()
+                # 续期任务锁，长时间回填期间锁不会过期
+                if not renew_lock(db, lock_name, self.worker_id, settings.INGESTION_LOCK_TTL_SECONDS):
+                    logger.warning("回填任务 %s 的锁已过期或被接管", job.id)
+
+                if progress is not None:
+                    progress({
+                        'job_id': job.id,
+                        'chunk_start': chunk.chunk_start,
+                        'chunk_end': chunk.chunk_end,
+                        'chunk_status': chunk.status,
+                        'chunk_rows': chunk.rows_fetched,
+                        'chunks_done': job.chunks_done,
+                        'chunks_failed': job.chunks_failed,
+                        'chunks_total': job.chunks_total,
+                        'rows_fetched': job.rows_fetched,
+                        'elapsed_seconds': elapsed,
+                        'rows_per_second': run_rows / elapsed if elapsed else 0.0,
+                        'chunks_per_second': run_chunks / elapsed if elapsed else 0.0,
+                    })
+
+        if run_chunks:
+            # 相邻分块可能落在同一周期内，并行刷新汇总时后提交者可能没看到先提交的日线，
+            # 全部分块完成后按任务区间统一重算一次
+            try:
+                RollupService(db).refresh(job.market_type,
+                                          datetime.combine(job.start_date, datetime.min.time()),
+                                          datetime.combine(job.end_date, datetime.min.time()))
+                SnapshotService(db).refresh(job.market_type)
+            except Exception:
+                logger.exception("回填后重算周期汇总失败: %s", job.market_type)
+                db.rollback()
+
+        job.finished_at = datetime.now()
+        if job.chunks_failed == 0:
+            job.status = 'success'
+            job.message = '回填完成'
+        else:
+            job.status = 'failed' if job.chunks_done == 0 else 'partial'
+            job.message = f'{job.chunks_failed} 个分块失败，重新运行可续跑'
+        db.commit()
+        logger.info("回填任务 %s 完成: status=%s chunks=%s/%s rows=%s",
+                    job.id, job.status, job.chunks_done, job.chunks_total, job.rows_fetched)
+        return job_to_dict(job)
+
+    def _run_chunk(self, market_type: str, chunk_start: date, chunk_end: date) -> Dict[str, Any]:
+        """
+        同步一个分块（独立会话、独立事务；覆盖区间中已有的交易日不会重复获取）
+        数据源失败时直接抛出异常，不写入模拟数据、不记为覆盖，分块标记为失败以便续跑
+        """
+        db = self.session_factory()
+        try:
+            return GoldPriceService(db).sync_gold_price_data(
+                market_type,
+                datetime.combine(chunk_start, datetime.min.time()),
+                datetime.combine(chunk_end, datetime.min.time()),
+                fallback=False
+            )
+        finally:
+            db.close()
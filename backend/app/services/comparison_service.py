@@ -0,0 +1,232 @@
+"""
+国内 / 国际市场对比服务
+
+进程内维护一张两个市场收盘价的对齐表（日期并集为索引，某市场当日无数据为 NaN）：
+- 首次请求时从数据库读取请求区间；之后只补读请求区间中不在已加载区间列表里的部分
+  （已加载区间按列表记录：并发的不相交请求各自登记自己读过的区间，中间的空档不会被当作已加载）
+- 数据写入时记录变更的市场和日期区间，下次请求只重读这些区间并就地替换
+- 超过 COMPARISON_CACHE_TTL_SECONDS 后整表重新加载（其他 worker 进程写入的数据不会通知到本进程）
+对齐策略和对比指标在这张表的切片上向量化计算。
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.gold_price_service import AsyncGoldPriceService, register_write_listener
+from app.utils.comparison import MARKETS, align_closes, compute_comparison, empty_aligned_frame
+from app.utils.series_codec import nullable_list
+
+# 滚动相关系数、ffill 需要的预热数据：窗口对应的自然日再加几天余量
+CALENDAR_DAYS_PER_BAR = 1.5
+WARMUP_MARGIN_DAYS = 15
+
+# 一次读取：(市场, 开始, 结束)
+Read = Tuple[str, datetime, datetime]
+Span = Tuple[datetime, datetime]
+
+_ONE = timedelta(microseconds=1)
+
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _day_end(value: datetime) -> datetime:
+    return value.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+
+def _merge_spans(spans: List[Span]) -> List[Span]:
+    """合并重叠或相邻的区间，按起点升序返回"""
+    merged: List[Span] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + _ONE:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _uncovered(start: datetime, end: datetime, spans: List[Span]) -> List[Span]:
+    """[start, end] 中不被 spans（已合并、升序）覆盖的子区间"""
+    gaps: List[Span] = []
+    cursor = start
+    for span_start, span_end in spans:
+        if span_end < cursor:
+            continue
+        if span_start > end:
+            break
+        if span_start > cursor:
+            gaps.append((cursor, span_start - _ONE))
+        cursor = max(cursor, span_end + _ONE)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class AlignedCloseCache:
+    """两个市场收盘价的进程内对齐表，按区间增量更新"""
+
+    def __init__(self, ttl: float = settings.COMPARISON_CACHE_TTL_SECONDS, clock=time.monotonic):
+        """
+        :param ttl: 整表有效期（秒）
+        :param clock: 时钟函数（测试时可替换）
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._generation = 0
+        self.clear()
+
+    def clear(self):
+        """清空对齐表和计数"""
+        with self._lock:
+            self._frame = empty_aligned_frame()
+            self._loaded: List[Span] = []
+            self._loaded_at = 0.0
+            # 已加载的数据被整表丢弃时递增，丢弃前规划的读取不能再登记为已加载
+            self._generation += 1
+            self._dirty: List[Read] = []
+            self.full_loads = 0
+            self.incremental_reads = 0
+
+    def mark_dirty(self, market_type: str, start_date: datetime, end_date: datetime):
+        """记录某市场 [start_date, end_date] 的数据发生了变化"""
+        if market_type not in MARKETS:
+            return
+        with self._lock:
+            self._dirty.append((market_type, _day_start(start_date), _day_end(end_date)))
+
+    def stats(self) -> Dict[str, Any]:
+        """已加载区间、行数和读取计数"""
+        with self._lock:
+            return {
+                'loaded_start': self._loaded[0][0] if self._loaded else None,
+                'loaded_end': self._loaded[-1][1] if self._loaded else None,
+                'loaded_ranges': len(self._loaded),
+                'rows': len(self._frame),
+                'full_loads': self.full_loads,
+                'incremental_reads': self.incremental_reads,
+            }
+
+    def _plan_reads(self, start: datetime, end: datetime) -> List[Read]:
+        """需要从数据库读取的区间（读取完成后由 get 把 [start, end] 登记为已加载）"""
+        if not self._loaded or self._clock() - self._loaded_at > self.ttl:
+            # 并发请求在第一个请求登记前都会走到这里，各自只读自己的区间，登记时按列表合并
+            if self._loaded:
+                self._generation += 1
+            self._frame = empty_aligned_frame()
+            self._loaded = []
+            self._dirty = []
+            self._loaded_at = self._clock()
+            self.full_loads += 1
+            return [(market, start, end) for market in MARKETS]
+
+        reads: List[Read] = []
+        # 只重读与已加载区间相交的变更；区间外的数据在补读时自然是最新的
+        for market, dirty_start, dirty_end in self._dirty:
+            for loaded_start, loaded_end in self._loaded:
+                overlap_start, overlap_end = max(dirty_start, loaded_start), min(dirty_end, loaded_end)
+                if overlap_start <= overlap_end:
+                    reads.append((market, overlap_start, overlap_end))
+        self._dirty = []
+        for gap_start, gap_end in _uncovered(start, end, self._loaded):
+            reads += [(market, gap_start, gap_end) for market in MARKETS]
+        self.incremental_reads += len(reads)
+        return reads
+
+    def _apply(self, market_type: str, start: datetime, end: datetime, series: pd.Series):
+        """用新读取的数据替换某市场 [start, end] 内的收盘价"""
+        frame = self._frame
+        in_range = (frame.index >= start) & (frame.index <= end)
+        frame.loc[in_range, market_type] = np.nan
+        # 缺失收盘价（数据源回退时记为 0）视为当日无数据
+        series = series.where(series > 0).dropna()
+        if len(series):
+            frame = series.to_frame(market_type).combine_first(frame)
+        self._frame = frame.reindex(columns=list(MARKETS)).dropna(how='all')
+
+    async def get(self, db: AsyncSession, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        读取 [start_date, end_date] 的对齐表切片（必要时增量读取数据库）
+        :return: 以日期并集为索引的 domestic / international 收盘价表
+        """
+        # 收盘价按日记录：按整天读取和登记，相邻日期的区间可以合并
+        start_date, end_date = _day_start(start_date), _day_end(end_date)
+        service = AsyncGoldPriceService(db)
+        while True:
+            with self._lock:
+                reads = self._plan_reads(start_date, end_date)
+                generation = self._generation
+
+            # 读取期间发生的写入会再次记录为变更，下次请求时重读
+            results = [(read, await service.get_close_series(*read)) for read in reads]
+
+            with self._lock:
+                if generation != self._generation:
+                    # 读取期间整表过期被丢弃：只补读了缺口的结果不完整，重新规划
+                    continue
+                for (market, start, end), series in results:
+                    self._apply(market, start, end, series)
+                self._loaded = _merge_spans(self._loaded + [(start_date, end_date)])
+                frame = self._frame
+                return frame[(frame.index >= start_date) & (frame.index <= end_date)].copy()
+
+
+# 进程内对齐表
+aligned_cache = AlignedCloseCache()
+
+
+@register_write_listener
+def _mark_aligned_cache_dirty(market_type: str, start_date: datetime, end_date: datetime):
+    """数据写入后记录变更区间，下次对比请求时增量更新对齐表"""
+    aligned_cache.mark_dirty(market_type, start_date, end_date)
+
+
+class ComparisonService:
+    """国内 / 国际市场对比"""
+
+    def __init__(self, db: AsyncSession, cache: AlignedCloseCache = aligned_cache):
+        """初始化服务"""
+        self.db = db
+        self.cache = cache
+
+    async def compare(self, start_date: datetime, end_date: datetime, fill: str = 'ffill',
+                      correlation_window: int = 20) -> Dict[str, Any]:
+        """
+        对齐两个市场的收盘价并计算价差、比值和滚动相关系数
+        :param fill: 对齐策略 inner / ffill / outer
+        :param correlation_window: 滚动相关系数的窗口
+        :return: 列式结果（各数组与 dates 等长）
+        """
+        warmup = timedelta(days=int(correlation_window * CALENDAR_DAYS_PER_BAR) + WARMUP_MARGIN_DAYS)
+        frame = await self.cache.get(self.db, start_date - warmup, end_date)
+
+        aligned = align_closes(frame, fill)
+        metrics = compute_comparison(aligned, correlation_window)
+        # 预热数据只用于滚动窗口和 ffill，不出现在结果中
+        offset = int(aligned.index.searchsorted(pd.Timestamp(_day_start(start_date))))
+        aligned = aligned.iloc[offset:]
+
+        returns = np.log(aligned).diff().dropna()
+        overall = returns['domestic'].corr(returns['international']) if len(returns) > 2 else None
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'fill': fill,
+            'correlation_window': correlation_window,
+            'total_count': len(aligned),
+            'dates': np.datetime_as_string(aligned.index.to_numpy(dtype='datetime64[D]'), unit='D').tolist(),
+            'domestic': nullable_list(aligned['domestic'].to_numpy()),
+            'international': nullable_list(aligned['international'].to_numpy()),
+            'spread': nullable_list(metrics['spread'][offset:]),
+            'ratio': nullable_list(metrics['ratio'][offset:]),
+            'correlation': nullable_list(metrics['correlation'][offset:]),
+            'overall_correlation': float(overall) if overall is not None and np.isfinite(overall) else None,
+        }
@@ -0,0 +1,119 @@
+"""
+黄金价格覆盖区间索引服务
+
+记录每个市场已同步过的、按交易日历连续的日期区间，同步时据此只拉取缺失的子区间。
+"""
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from typing import DefaultDict, List, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.gold_price import GoldPrice, GoldPriceCoverage
+from app.utils.trading_calendar import get_calendar, to_day
+
+Interval = Tuple[date, date]
+
+# 覆盖区间是整体读改写的，同一进程内并发同步（例如回填的多个分块）按市场串行更新
+_market_locks: DefaultDict[str, threading.RLock] = defaultdict(threading.RLock)
+
+
+class CoverageService:
+    """覆盖区间服务"""
+
+    def __init__(self, db: Session, market_type: str):
+        """初始化服务"""
+        self.db = db
+        self.market_type = market_type
+        self.calendar = get_calendar(market_type)
+
+    def get_intervals(self) -> List[Interval]:
+        """
+        获取覆盖区间（按起始日期升序）
+        首次使用时从已有行情数据构建
+        """
+        intervals = self._load_intervals()
+        if not intervals:
+            with _market_locks[self.market_type]:
+                intervals = self._load_intervals() or self.rebuild()
+        return intervals
+
+    def rebuild(self) -> List[Interval]:
+        """
+        根据 gold_prices 中已有的日期重建覆盖区间
+        只查询日期列，不加载 ORM 对象
+        """
+        dates = self.db.execute(
+            select(GoldPrice.date).where(GoldPrice.market_type == self.market_type)
+        ).scalars().all()
+        days = np.array([to_day(value) for value in dates], dtype='datetime64[D]')
+        intervals = self.calendar.contiguous_runs(days)
+        self._store_intervals(intervals)
+        return intervals
+
+    def missing_ranges(self, start_date: datetime, end_date: datetime) -> List[Interval]:
+        """
+        计算 [start_date, end_date] 内未覆盖的交易日子区间
+        :return: [(起始日, 结束日), ...]，每段内的交易日连续
+        """
+        days = self.calendar.trading_days(start_date, end_date)
+        if len(days) == 0:
+            return []
+
+        intervals = self.get_intervals()
+        if intervals:
+            starts = np.array([s for s, _ in intervals], dtype='datetime64[D]')
+            ends = np.array([e for _, e in intervals], dtype='datetime64[D]')
+            slot = np.searchsorted(starts, days, side='right') - 1
+            covered = (slot >= 0) & (days <= ends[np.maximum(slot, 0)])
+            days = days[~covered]
+
+        return self.calendar.contiguous_runs(days)
+
+    def mark_covered(self, start_date: date, end_date: date) -> List[Interval]:
+        """
+        把 [start_date, end_date] 合并进覆盖区间（相邻且中间只隔休市日的区间会合并）
+        """
+        start_date, end_date = to_day(start_date).item(), to_day(end_date).item()
+        if end_date < start_date:
+            return self.get_intervals()
+
+        with _market_locks[self.market_type]:
+            return self._merge_and_store(start_date, end_date)
+
+    def _merge_and_store(self, start_date: date, end_date: date) -> List[Interval]:
+        """合并新区间并整体写回（调用方持有市场锁）"""
+        intervals = sorted(self.get_intervals() + [(start_date, end_date)])
+        merged: List[Interval] = [intervals[0]]
+        for start, end in intervals[1:]:
+            last_start, last_end = merged[-1]
+            # 两个区间之间没有交易日则视为连续
+            if start <= last_end or self.calendar.count_between(
+                    np.datetime64(last_end, 'D') + 1, np.datetime64(start, 'D') - 1) == 0:
+                merged[-1] = (last_start, max(last_end, end))
+            else:
+                merged.append((start, end))
+
+        self._store_intervals(merged)
+        return merged
+
+    def _load_intervals(self) -> List[Interval]:
+        """读取已存储的覆盖区间"""
+        rows = self.db.execute(
+            select(GoldPriceCoverage.start_date, GoldPriceCoverage.end_date)
+            .where(GoldPriceCoverage.market_type == self.market_type)
+            .order_by(GoldPriceCoverage.start_date)
+        ).all()
+        return [(row.start_date, row.end_date) for row in rows]
+
+    def _store_intervals(self, intervals: List[Interval]):
+        """整体替换该市场的覆盖区间"""
+        self.db.execute(delete(GoldPriceCoverage).where(GoldPriceCoverage.market_type == self.market_type))
+        self.db.add_all([
+            GoldPriceCoverage(market_type=self.market_type, start_date=start, end_date=end)
+            for start, end in intervals
+        ])
+        self.db.commit()
@@ -0,0 +1,77 @@
+"""
+数据同步服务
+
+国内（AKShare）和国际（yfinance）数据的获取都是阻塞调用，这里把每个市场的同步
+放到线程池中并发执行：每个市场使用独立的数据库会话，并各自设置超时。
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Sequence
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.gold_price_service import GoldPriceService
+
+logger = logging.getLogger(__name__)
+
+# 支持的市场类型
+MARKET_TYPES = ('domestic', 'international')
+
+
+def sync_market_in_session(session_factory: sessionmaker, market_type: str,
+                           start_date: datetime, end_date: datetime, fallback: bool = False) -> Dict[str, Any]:
+    """
+    在独立会话中同步单个市场（阻塞，供线程池调用）
+    :param fallback: 数据源失败时是否回退到模拟数据等（回退数据不写库）；默认直接报错
+    """
+    db = session_factory()
+    try:
+        return GoldPriceService(db).sync_gold_price_data(market_type, start_date, end_date, fallback=fallback)
+    finally:
+        db.close()
+
+
+async def sync_market(market_type: str, start_date: datetime, end_date: datetime,
+                      session_factory: sessionmaker = SessionLocal, fallback: bool = False) -> Dict[str, Any]:
+    """
+    在线程池中同步单个市场，不阻塞事件循环
+    超时后立即返回 timeout 状态；已发出的上游请求无法中断，会在后台线程中继续完成并落库
+    数据源失败时（fallback=False）返回 error 状态，区间保持未覆盖，下次同步重试
+    """
+    timeout = settings.sync_timeout(market_type)
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(sync_market_in_session, session_factory, market_type, start_date, end_date,
+                              fallback),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        return {
+            'status': 'timeout',
+            'message': f'同步超时（{timeout:g} 秒）',
+            'synced': False
+        }
+    except Exception as e:
+        logger.exception("同步%s数据失败", market_type)
+        return {
+            'status': 'error',
+            'message': f'同步失败: {e}',
+            'synced': False
+        }
+
+
+async def sync_markets(start_date: datetime, end_date: datetime,
+                       market_types: Sequence[str] = MARKET_TYPES,
+                       session_factory: sessionmaker = SessionLocal) -> Dict[str, Dict[str, Any]]:
+    """
+    并发同步多个市场，总耗时约为最慢的单个市场
+    :return: {market_type: 同步结果}
+    """
+    results = await asyncio.gather(*[
+        sync_market(market_type, start_date, end_date, session_factory)
+        for market_type in market_types
+    ])
+    return dict(zip(market_types, results))
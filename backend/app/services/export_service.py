@@ -0,0 +1,126 @@
+"""
+价格历史流式导出
+
+通过服务端游标（yield_per）分批读取行情，每批编码为 NDJSON 或 CSV 后立即发送：
+内存占用只与批大小有关，与导出区间长度无关，首字节也不必等待整个区间查询完成。
+可选 gzip 流式压缩（逐批压缩，不缓存整个响应）。
+"""
+import csv
+import io
+import json
+import math
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.services.gold_price_service import price_frame_query
+from app.utils.ohlcv import CANONICAL_COLUMNS
+
+# 导出格式 -> 媒体类型
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# 每批从游标读取的行数
+EXPORT_BATCH_SIZE = 5000
+
+# 未指定日期时导出全部历史
+EXPORT_MIN_DATE = datetime(1, 1, 1)
+EXPORT_MAX_DATE = datetime(9999, 12, 31)
+
+
+def _number(value: Optional[float]) -> Optional[float]:
+    """NaN / 无穷大按缺失值输出"""
+    if value is None or not math.isfinite(value):
+        return None
+    return value
+
+
+def encode_ndjson(rows: Sequence) -> bytes:
+    """一批行编码为 NDJSON（每行一个 JSON 对象，日期为 YYYY-MM-DD）"""
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    lines = [
+        dumps({
+            'market_type': market_type,
+            'date': day.date().isoformat(),
+            'open_price': _number(open_),
+            'high_price': _number(high),
+            'low_price': _number(low),
+            'close_price': _number(close),
+            'volume': _number(volume),
+        })
+        for market_type, day, open_, high, low, close, volume in rows
+    ]
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def encode_csv(rows: Sequence, header: bool = False) -> bytes:
+    """一批行编码为 CSV（缺失值为空字段）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(CANONICAL_COLUMNS)
+    writer.writerows(
+        (market_type, day.date().isoformat(), _number(open_), _number(high), _number(low),
+         _number(close), _number(volume))
+        for market_type, day, open_, high, low, close, volume in rows
+    )
+    return buffer.getvalue().encode('utf-8')
+
+
+async def iter_price_batches(session_factory: async_sessionmaker, market_type: str,
+                             start_date: datetime, end_date: datetime,
+                             batch_size: Optional[int] = None) -> AsyncIterator[Sequence]:
+    """
+    通过服务端游标按批读取区间内的行情（按日期升序）
+    会话在生成器内创建，整个流式响应期间保持打开，发送结束或客户端断开时关闭
+    """
+    async with session_factory() as db:
+        result = await db.stream(
+            price_frame_query(market_type, start_date, end_date)
+            .execution_options(yield_per=batch_size or EXPORT_BATCH_SIZE)
+        )
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+
+async def export_prices(session_factory: async_sessionmaker, market_type: str,
+                        start_date: datetime, end_date: datetime, export_format: str = 'ndjson',
+                        batch_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    流式导出区间内的行情
+    :param export_format: ndjson / csv
+    :param batch_size: 每批行数，默认 EXPORT_BATCH_SIZE
+    :return: 编码后的字节块（每批一块）
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {export_format}")
+
+    first = True
+    async for rows in iter_price_batches(session_factory, market_type, start_date, end_date, batch_size):
+        if export_format == 'csv':
+            yield encode_csv(rows, header=first)
+        else:
+            yield encode_ndjson(rows)
+        first = False
+
+    # 空区间的 CSV 也输出表头
+    if first and export_format == 'csv':
+        yield encode_csv([], header=True)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """逐块 gzip 压缩字节流"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
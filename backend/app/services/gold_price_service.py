@@ -1,16 +1,138 @@
 """
 黄金价格数据获取服务
+
+同步、写入和回退以结构化事件记录日志（log_event：事件名 + key=value 字段，含各阶段耗时），
+读取的行数计入当前请求的 Server-Timing 和 /metrics。
 """
-import akshare as ak
-import yfinance as yf
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, select, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterable, List, Optional, Dict, Any, Tuple, Union
+from app.core.config import settings
+from app.core.metrics import log_event, record_rows
 from app.models.gold_price import GoldPrice, GoldPriceMetadata
+from app.services.coverage_service import CoverageService
+from app.services.rollup_service import RollupService, rollup_completeness_query, rollup_query
+from app.services.snapshot_service import SnapshotService
+from app.services.upstream_client import UpstreamRateLimitError, upstream_client
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from app.utils.mock_data import generate_mock_frame
+from app.utils.ohlcv import (
+    PRICE_COLUMNS,
+    empty_ohlcv_frame,
+    frame_to_records,
+    normalize_dates,
+    records_to_frame,
+    rows_to_frame,
+)
 import pandas as pd
 import numpy as np
 import time
-import random
+
+logger = logging.getLogger(__name__)
+
+# 行情数据的来源：数据源 / 限流时回退的数据库已有数据 / 模拟数据
+SOURCE_UPSTREAM = 'upstream'
+SOURCE_DATABASE = 'database'
+SOURCE_MOCK = 'mock'
+
+# 单条 executemany 语句的最大行数
+BULK_BATCH_SIZE = 5000
+
+# 数据写入监听器：listener(market_type, start_date, end_date)，在新增/更新的数据提交后调用
+WriteListener = Callable[[str, datetime, datetime], None]
+_write_listeners: List[WriteListener] = []
+
+
+def register_write_listener(listener: WriteListener) -> WriteListener:
+    """注册数据写入监听器（可用作装饰器）"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+    return listener
+
+
+def notify_data_written(market_type: str, start_date: datetime, end_date: datetime):
+    """通知监听器：某市场 [start_date, end_date] 内的数据发生了变化"""
+    for listener in list(_write_listeners):
+        try:
+            listener(market_type, start_date, end_date)
+        except Exception as e:
+            log_event(logger, 'write_listener_failed', logging.ERROR,
+                      market=market_type, listener=getattr(listener, '__name__', repr(listener)), error=repr(e))
+
+
+def _range_filter(market_type: str, start_date: datetime, end_date: datetime):
+    """某市场 [start_date, end_date] 的过滤条件"""
+    return (
+        GoldPrice.market_type == market_type,
+        GoldPrice.date >= start_date,
+        GoldPrice.date <= end_date
+    )
+
+
+def price_query(market_type: str, start_date: datetime, end_date: datetime):
+    """区间内的 ORM 行查询（按日期升序）"""
+    return select(GoldPrice).where(*_range_filter(market_type, start_date, end_date)).order_by(GoldPrice.date)
+
+
+def price_frame_query(market_type: str, start_date: datetime, end_date: datetime):
+    """区间内的按列查询（标准 OHLCV 列顺序，按日期升序）"""
+    return (
+        select(GoldPrice.market_type, GoldPrice.date, *[getattr(GoldPrice, c) for c in PRICE_COLUMNS])
+        .where(*_range_filter(market_type, start_date, end_date))
+        .order_by(GoldPrice.date)
+    )
+
+
+def close_series_query(market_type: str, start_date: datetime, end_date: datetime):
+    """区间内的 (日期, 收盘价) 两列查询（按日期升序），只需要收盘价时比整行 OHLCV 少一半解码开销"""
+    return (
+        select(GoldPrice.date, GoldPrice.close_price)
+        .where(*_range_filter(market_type, start_date, end_date))
+        .order_by(GoldPrice.date)
+    )
+
+
+def price_page_query(market_type: str, start_date: datetime, end_date: datetime,
+                     after_date: Optional[datetime], limit: int, columns: bool = False):
+    """
+    keyset 分页查询：日期晚于 after_date 的前 limit 条（按日期升序）
+    (market_type, date) 唯一索引直接定位起点，任意一页的代价都与第一页相同
+    """
+    query = price_frame_query(market_type, start_date, end_date) if columns \
+        else price_query(market_type, start_date, end_date)
+    if after_date is not None:
+        query = query.where(GoldPrice.date > after_date)
+    return query.limit(limit)
+
+
+def encode_price_cursor(market_type: str, last_date: datetime) -> str:
+    """价格序列的分页游标（当前页最后一条的日期）"""
+    return encode_cursor({'m': market_type, 'd': last_date.isoformat()})
+
+
+def decode_price_cursor(market_type: str, cursor: str) -> datetime:
+    """
+    解析价格序列的分页游标
+    :raises InvalidCursorError: 游标无效或属于其他市场
+    """
+    position = decode_cursor(cursor)
+    if position.get('m') != market_type:
+        raise InvalidCursorError("分页游标不属于该市场")
+    try:
+        return datetime.fromisoformat(position['d'])
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"无效的分页游标: {cursor}") from e
+
+
+def price_count_query(market_type: str, start_date: datetime, end_date: datetime):
+    """区间内的记录数查询"""
+    return select(func.count()).select_from(GoldPrice).where(*_range_filter(market_type, start_date, end_date))
 
 
 class GoldPriceService:
@@ -27,43 +149,7 @@ class GoldPriceService:
         :param end_date: 结束日期 (YYYYMMDD)
         :return: 黄金价格数据列表
         """
-        try:
-            # 使用AKShare获取黄金价格数据
-            df = ak.spot_gold历史数据(start_date=start_date, end_date=end_date)
-
-            if df.empty:
-                return []
-
-            data_list = []
-            for index, row in df.iterrows():
-                data_list.append({
-                    'market_type': 'domestic',
-                    'date': pd.to_datetime(index),
-                    'open_price': float(row.get('开盘', 0)) if pd.notna(row.get('开盘')) else None,
-                    'high_price': float(row.get('最高', 0)) if pd.notna(row.get('最高')) else None,
-                    'low_price': float(row.get('最低', 0)) if pd.notna(row.get('最低')) else None,
-                    'close_price': float(row.get('收盘', 0)) if pd.notna(row.get('收盘')) else 0,
-                    'volume': float(row.get('成交量', 0)) if pd.notna(row.get('成交量')) else None,
-                })
-
-            return data_list
-        except Exception as e:
-            error_msg = str(e).lower()
-            print(f"获取国内黄金数据失败: {e}")
-
-            # 检查是否是限流错误
-            if any(keyword in error_msg for keyword in ['rate limit', 'too many requests', 'too frequent', '429', 'limited']):
-                print(f"国内数据API限流，使用缓存或模拟数据")
-                # 检查数据库中是否有历史数据可用
-                mock_start = datetime.strptime(start_date, '%Y%m%d')
-                mock_end = datetime.strptime(end_date, '%Y%m%d')
-                existing_data = self.get_data_from_db('domestic', mock_start, mock_end)
-                if existing_data:
-                    print(f"使用数据库中已有的国内数据，{len(existing_data)}条")
-                    return existing_data
-
-            # 如果AKShare数据获取失败，返回模拟数据
-            return self._generate_mock_data(start_date, end_date, 'domestic')
+        return frame_to_records(self.get_domestic_gold_frame(start_date, end_date))
 
     def get_international_gold_data(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """
@@ -72,137 +158,239 @@ class GoldPriceService:
         :param end_date: 结束日期 (YYYY-MM-DD)
         :return: 黄金价格数据列表
         """
-        try:
-            # 使用yfinance获取黄金ETF(GLD)数据
-            ticker = yf.Ticker("GLD")
-            hist = ticker.history(start=start_date, end=end_date)
-
-            if hist.empty:
-                return []
-
-            data_list = []
-            for index, row in hist.iterrows():
-                data_list.append({
-                    'market_type': 'international',
-                    'date': pd.to_datetime(index),
-                    'open_price': float(row['Open']) if pd.notna(row['Open']) else None,
-                    'high_price': float(row['High']) if pd.notna(row['High']) else None,
-                    'low_price': float(row['Low']) if pd.notna(row['Low']) else None,
-                    'close_price': float(row['Close']) if pd.notna(row['Close']) else 0,
-                    'volume': float(row['Volume']) if pd.notna(row['Volume']) else None,
-                })
-
-            return data_list
-        except Exception as e:
-            error_msg = str(e).lower()
-            print(f"获取国际黄金数据失败: {e}")
-
-            # 检查是否是限流错误
-            if any(keyword in error_msg for keyword in ['rate limit', 'too many requests', 'too frequent', '429', 'limited']):
-                print(f"国际数据API限流，使用缓存或模拟数据")
-                # 检查数据库中是否有历史数据可用
-                mock_start = datetime.strptime(start_date, '%Y-%m-%d')
-                mock_end = datetime.strptime(end_date, '%Y-%m-%d')
-                existing_data = self.get_data_from_db('international', mock_start, mock_end)
-                if existing_data:
-                    print(f"使用数据库中已有的国际数据，{len(existing_data)}条")
-                    return existing_data
+        return frame_to_records(self.get_international_gold_frame(start_date, end_date))
 
-            # 如果yfinance数据获取失败，返回模拟数据
-            return self._generate_mock_data(start_date, end_date, 'international')
-
-    def _generate_mock_data(self, start_date: str, end_date: str, market_type: str) -> List[Dict[str, Any]]:
+    def get_domestic_gold_frame(self, start_date: str, end_date: str) -> pd.DataFrame:
         """
-        生成模拟数据（用于测试）
+        获取国内黄金价格数据（使用AKShare），返回标准 OHLCV 表
+        :param start_date: 开始日期 (YYYYMMDD)
+        :param end_date: 结束日期 (YYYYMMDD)
+        :return: 标准 OHLCV DataFrame
         """
-        start = datetime.strptime(start_date, '%Y%m%d' if market_type == 'domestic' else '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y%m%d' if market_type == 'domestic' else '%Y-%m-%d')
-
-        # 基准价格
-        base_price = 450.0 if market_type == 'domestic' else 1800.0
-
-        data_list = []
-        current_date = start
-
-        while current_date <= end:
-            # 跳过周末（仅对国际市场）
-            if market_type == 'international' and current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-                continue
-
-            # 生成随机价格波动（±2%）
-            price_change = np.random.normal(0, 0.02)
-            base_price *= (1 + price_change)
-
-            # 生成开盘价
-            open_price = base_price * (1 + np.random.normal(0, 0.01))
-
-            # 生成最高价和最低价
-            high_price = max(open_price, base_price) * (1 + abs(np.random.normal(0, 0.01)))
-            low_price = min(open_price, base_price) * (1 - abs(np.random.normal(0, 0.01)))
-
-            data_list.append({
-                'market_type': market_type,
-                'date': current_date,
-                'open_price': round(open_price, 2),
-                'high_price': round(high_price, 2),
-                'low_price': round(low_price, 2),
-                'close_price': round(base_price, 2),
-                'volume': np.random.randint(1000, 10000),
-            })
-
-            current_date += timedelta(days=1)
+        # 通过共享的上游客户端（限速、重试、合并并发请求）从 AKShare 获取
+        frame, _ = self.fetch_gold_frame(
+            'domestic',
+            datetime.strptime(start_date, '%Y%m%d').date(),
+            datetime.strptime(end_date, '%Y%m%d').date()
+        )
+        return frame
+
+    def get_international_gold_frame(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取国际黄金价格数据（使用yfinance），返回标准 OHLCV 表
+        :param start_date: 开始日期 (YYYY-MM-DD)
+        :param end_date: 结束日期 (YYYY-MM-DD)
+        :return: 标准 OHLCV DataFrame
+        """
+        # 通过共享的上游客户端从 yfinance 获取黄金ETF(GLD)数据（end 为开区间）
+        frame, _ = self.fetch_gold_frame(
+            'international',
+            datetime.strptime(start_date, '%Y-%m-%d').date(),
+            datetime.strptime(end_date, '%Y-%m-%d').date() - timedelta(days=1)
+        )
+        return frame
+
+    def _fallback_frame(self, error: Exception, market_type: str,
+                        start_date: date, end_date: date) -> Tuple[pd.DataFrame, str]:
+        """
+        数据源获取失败时的回退：限流时优先使用数据库中已有数据，否则返回模拟数据
+        :return: (标准 OHLCV 表, 来源 SOURCE_DATABASE / SOURCE_MOCK)
+        """
+        rate_limited = isinstance(error, UpstreamRateLimitError)
+        log_event(logger, 'upstream_fetch_failed', logging.WARNING, market=market_type,
+                  start=start_date, end=end_date, rate_limited=rate_limited, error=repr(error))
+
+        # 限流且重试耗尽
+        if rate_limited:
+            # 检查数据库中是否有历史数据可用
+            existing = self.get_frame_from_db(
+                market_type,
+                datetime.combine(start_date, datetime.min.time()),
+                datetime.combine(end_date, datetime.max.time())
+            )
+            if not existing.empty:
+                log_event(logger, 'upstream_fallback', logging.WARNING, market=market_type,
+                          source=SOURCE_DATABASE, rows=len(existing))
+                return existing, SOURCE_DATABASE
 
-        return data_list
+        # 如果数据源获取失败，返回模拟数据（按市场交易日历生成，MOCK_DATA_SEED 可固定结果）
+        log_event(logger, 'upstream_fallback', logging.WARNING, market=market_type, source=SOURCE_MOCK)
+        frame = generate_mock_frame(market_type, datetime.combine(start_date, datetime.min.time()),
+                                    datetime.combine(end_date, datetime.min.time()), seed=settings.MOCK_DATA_SEED)
+        return frame, SOURCE_MOCK
 
     def save_gold_price_data(self, data_list: List[Dict[str, Any]]) -> int:
         """
-        保存黄金价格数据到数据库
+        保存黄金价格数据到数据库（已存在的记录跳过）
         :param data_list: 黄金价格数据列表
-        :return: 保存的记录数
+        :return: 新增的记录数
         """
-        saved_count = 0
-
-        for data in data_list:
-            try:
-                # 检查是否已存在
-                existing = self.db.query(GoldPrice).filter(
-                    GoldPrice.market_type == data['market_type'],
-                    GoldPrice.date == data['date']
-                ).first()
-
-                if existing:
-                    continue  # 跳过已存在的记录
-
-                # 创建新记录
-                gold_price = GoldPrice(
-                    market_type=data['market_type'],
-                    date=data['date'],
-                    open_price=data.get('open_price'),
-                    high_price=data.get('high_price'),
-                    low_price=data.get('low_price'),
-                    close_price=data.get('close_price', 0),
-                    volume=data.get('volume')
-                )
-
-                self.db.add(gold_price)
-                saved_count += 1
+        result = self.bulk_save_gold_price_data(data_list)
+        return result['inserted']
 
-            except Exception as e:
-                print(f"保存数据失败: {e}")
-                continue
+    def bulk_save_gold_price_data(self, data: Union[List[Dict[str, Any]], pd.DataFrame],
+                                  update_existing: bool = False) -> Dict[str, int]:
+        """
+        批量写入黄金价格数据（基于 uix_market_date 的集合式 upsert）
+        每个市场只查询一次已有记录，向量化比对后用 INSERT ... ON CONFLICT 写入整批数据
+        :param data: 黄金价格数据列表，或标准 OHLCV DataFrame
+        :param update_existing: 已存在且 OHLC 有变化的记录是否覆盖更新
+        :return: {'inserted': 新增数, 'updated': 更新数, 'skipped': 跳过数}
+        """
+        started = time.perf_counter()
+        frame = data if isinstance(data, pd.DataFrame) else records_to_frame(data)
+        # 非字典数据（例如限流时回退返回的数据库记录）本身已在库中
+        skipped = len(data) - len(frame)
+
+        to_insert = []
+        to_update = []
+        for market_type, group in frame.groupby('market_type', sort=False):
+            bars = group.drop_duplicates(subset=['date'], keep='last')
+            skipped += len(group) - len(bars)
+            existing = self._load_existing_frame(market_type, bars['date'].min(), bars['date'].max())
+            merged = bars.merge(existing, on='date', how='left', suffixes=('', '_db'))
+
+            is_new = merged['id'].isna().to_numpy()
+            changed = np.zeros(len(merged), dtype=bool)
+            if update_existing:
+                for column in PRICE_COLUMNS:
+                    new_values = merged[column].to_numpy(dtype='float64')
+                    old_values = merged[f'{column}_db'].to_numpy(dtype='float64')
+                    same = (new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values))
+                    changed |= ~same
+                changed &= ~is_new
+
+            to_insert.append(merged.loc[is_new, bars.columns])
+            to_update.append(merged.loc[changed, list(bars.columns) + ['id']])
+            skipped += int((~is_new & ~changed).sum())
+
+        insert_frame = pd.concat(to_insert, ignore_index=True) if to_insert else empty_ohlcv_frame()
+        update_frame = pd.concat(to_update, ignore_index=True) if to_update else empty_ohlcv_frame()
+        compared = time.perf_counter()
 
         try:
+            self._write_rows(insert_frame, update_frame)
             self.db.commit()
         except Exception as e:
-            print(f"提交数据库事务失败: {e}")
+            log_event(logger, 'bulk_write_failed', logging.ERROR, rows=len(frame), error=repr(e))
             self.db.rollback()
-            return 0
+            return {'inserted': 0, 'updated': 0, 'skipped': len(data)}
+        written_at = time.perf_counter()
 
         # 更新元数据
-        self._update_metadata(data_list)
+        for market_type in frame['market_type'].unique():
+            self._update_metadata([{'market_type': market_type}])
+
+        written = pd.concat([insert_frame[['market_type', 'date']], update_frame[['market_type', 'date']]])
+        for market_type, dates in written.groupby('market_type')['date']:
+            start, end = dates.min().to_pydatetime(), dates.max().to_pydatetime()
+            # 增量重算受影响周期的汇总，并更新最新价格快照
+            try:
+                RollupService(self.db).refresh(market_type, start, end)
+                SnapshotService(self.db).refresh(market_type)
+            except Exception as e:
+                log_event(logger, 'derived_refresh_failed', logging.ERROR, market=market_type, error=repr(e))
+                self.db.rollback()
+            notify_data_written(market_type, start, end)
+
+        finished = time.perf_counter()
+        log_event(logger, 'bulk_write', logging.DEBUG, inserted=len(insert_frame), updated=len(update_frame),
+                  skipped=skipped, compare_ms=(compared - started) * 1000, write_ms=(written_at - compared) * 1000,
+                  derived_ms=(finished - written_at) * 1000)
+        return {'inserted': len(insert_frame), 'updated': len(update_frame), 'skipped': skipped}
+
+    def bulk_load(self, frames: Iterable[pd.DataFrame], replace: bool = False,
+                  progress: Optional[Callable[[int], None]] = None, mark_covered: bool = False) -> Dict[str, int]:
+        """
+        大批量写入（压测数据、模拟数据等）：逐块直接 INSERT ... ON CONFLICT 并提交，不与已有数据比对；
+        全部写完后每个市场只重算一次周期汇总、最新快照和元数据，再通知写入监听器
+        :param frames: 标准 OHLCV 表的迭代器（可以是生成器，内存占用只与单块大小有关）
+        :param replace: 已存在的记录是否覆盖（否则保留已有记录）
+        :param progress: 每写完一块调用一次，参数为累计写入行数
+        :param mark_covered: 是否把写入的日期范围记为已覆盖（之后同步不再向数据源请求）；
+            写入的不是数据源数据时保持默认 False
+        :return: {'rows': 写入（含跳过的已存在记录）的行数}
+        """
+        started = time.perf_counter()
+        ranges: Dict[str, Tuple[datetime, datetime]] = {}
+        rows = 0
+        for frame in frames:
+            if frame.empty:
+                continue
+            if replace:
+                self._write_rows(empty_ohlcv_frame(), frame)
+            else:
+                self._write_rows(frame, empty_ohlcv_frame())
+            self.db.commit()
+
+            for market_type, dates in frame.groupby('market_type')['date']:
+                start, end = dates.min().to_pydatetime(), dates.max().to_pydatetime()
+                if market_type in ranges:
+                    start, end = min(start, ranges[market_type][0]), max(end, ranges[market_type][1])
+                ranges[market_type] = (start, end)
+            rows += len(frame)
+            if progress:
+                progress(rows)
+
+        written_at = time.perf_counter()
+        for market_type, (start, end) in ranges.items():
+            RollupService(self.db).refresh(market_type, start, end)
+            SnapshotService(self.db).refresh(market_type)
+            self._update_metadata([{'market_type': market_type}])
+            if mark_covered:
+                CoverageService(self.db, market_type).mark_covered(start.date(), end.date())
+            notify_data_written(market_type, start, end)
+        log_event(logger, 'bulk_load', rows=rows, markets=','.join(ranges),
+                  write_ms=(written_at - started) * 1000, derived_ms=(time.perf_counter() - written_at) * 1000)
+        return {'rows': rows}
+
+    def _load_existing_frame(self, market_type: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        一次性读取区间内已有记录的 (date, id, OHLCV)，只查列不构造 ORM 对象
+        """
+        rows = self.db.execute(
+            select(GoldPrice.date, GoldPrice.id, *[getattr(GoldPrice, c) for c in PRICE_COLUMNS])
+            .where(
+                GoldPrice.market_type == market_type,
+                GoldPrice.date >= start_date,
+                GoldPrice.date <= end_date
+            )
+        ).all()
+        existing = pd.DataFrame(rows, columns=['date', 'id'] + [f'{c}_db' for c in PRICE_COLUMNS])
+        existing['date'] = normalize_dates(existing['date']).to_numpy()
+        return existing.drop_duplicates(subset=['date'], keep='last')
 
-        return saved_count
+    def _write_rows(self, insert_frame: pd.DataFrame, update_frame: pd.DataFrame):
+        """
+        按数据库方言执行批量写入
+        SQLite/PostgreSQL 使用 ON CONFLICT，并发写入同一行时不会因唯一约束失败
+        """
+        dialect = self.db.get_bind().dialect.name
+        inserts = frame_to_records(insert_frame)
+
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+            stmt = dialect_insert(GoldPrice)
+            upsert = stmt.on_conflict_do_update(
+                index_elements=['market_type', 'date'],
+                set_={c: getattr(stmt.excluded, c) for c in PRICE_COLUMNS}
+            )
+            insert_only = stmt.on_conflict_do_nothing(index_elements=['market_type', 'date'])
+
+            for batch in _batched(inserts):
+                self.db.execute(insert_only, batch)
+            for batch in _batched(frame_to_records(update_frame)):
+                self.db.execute(upsert, batch)
+            return
+
+        # 其他数据库：普通批量插入 + 按主键批量更新
+        for batch in _batched(inserts):
+            self.db.execute(insert(GoldPrice), batch)
+        updates = update_frame[['id'] + PRICE_COLUMNS].astype(object)
+        updates = updates.where(update_frame[['id'] + PRICE_COLUMNS].notna(), None)
+        updates['id'] = update_frame['id'].astype('int64').tolist()
+        for batch in _batched(updates.to_dict('records')):
+            self.db.execute(update(GoldPrice), batch)
 
     def _update_metadata(self, data_list: List[Dict[str, Any]]):
         """
@@ -232,7 +420,17 @@ class GoldPriceService:
             )
             self.db.add(metadata)
 
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # 并行写入（如分块回填）时其他会话已先创建了该市场的元数据记录
+            self.db.rollback()
+            self.db.execute(
+                update(GoldPriceMetadata)
+                .where(GoldPriceMetadata.market_type == market_type)
+                .values(last_update=datetime.now())
+            )
+            self.db.commit()
 
     def get_data_from_db(self, market_type: str, start_date: datetime, end_date: datetime) -> List[GoldPrice]:
         """
@@ -242,50 +440,228 @@ class GoldPriceService:
         :param end_date: 结束日期
         :return: 黄金价格数据列表
         """
-        return self.db.query(GoldPrice).filter(
-            GoldPrice.market_type == market_type,
-            GoldPrice.date >= start_date,
-            GoldPrice.date <= end_date
-        ).order_by(GoldPrice.date).all()
+        data = self.db.execute(price_query(market_type, start_date, end_date)).scalars().all()
+        record_rows(len(data))
+        return data
+
+    def get_frame_from_db(self, market_type: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        按列从数据库读取黄金价格数据（不构造 ORM 对象）
+        :param market_type: 市场类型
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 标准 OHLCV DataFrame
+        """
+        rows = self.db.execute(price_frame_query(market_type, start_date, end_date)).all()
+        record_rows(len(rows))
+        return rows_to_frame(rows)
+
+    def count_data_in_db(self, market_type: str, start_date: datetime, end_date: datetime) -> int:
+        """
+        统计区间内的记录数
+        """
+        return self.db.execute(price_count_query(market_type, start_date, end_date)).scalar_one()
 
-    def sync_gold_price_data(self, market_type: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    def fetch_upstream_frame(self, market_type: str, start_date: date, end_date: date) -> pd.DataFrame:
         """
-        同步黄金价格数据（如果数据库中没有则从接口获取）
+        直接从数据源获取 [start_date, end_date] 的标准 OHLCV 表，不回退到数据库或模拟数据
+        :raises Exception: 数据源获取失败（包括限流且重试耗尽）
+        """
+        return upstream_client.fetch(market_type, start_date, end_date)
+
+    def fetch_gold_frame(self, market_type: str, start_date: date, end_date: date) -> Tuple[pd.DataFrame, str]:
+        """
+        从数据源获取 [start_date, end_date] 的标准 OHLCV 表（失败时回退，见 _fallback_frame）
+        :param market_type: 市场类型
+        :param start_date: 开始日期（含）
+        :param end_date: 结束日期（含）
+        :return: (标准 OHLCV 表, 来源 SOURCE_UPSTREAM / SOURCE_DATABASE / SOURCE_MOCK)
+        """
+        try:
+            return self.fetch_upstream_frame(market_type, start_date, end_date), SOURCE_UPSTREAM
+        except Exception as e:
+            return self._fallback_frame(e, market_type, start_date, end_date)
+
+    def sync_gold_price_data(self, market_type: str, start_date: datetime, end_date: datetime,
+                             fallback: bool = True) -> Dict[str, Any]:
+        """
+        同步黄金价格数据（只从接口获取覆盖区间中缺失的交易日子区间）
         :param market_type: 市场类型
         :param start_date: 开始日期
         :param end_date: 结束日期
+        :param fallback: 数据源失败时是否回退到数据库/模拟数据；为 False 时直接抛出异常，
+                         失败的子区间不写入也不记为覆盖
         :return: 同步结果
         """
-        # 检查数据库中是否已有足够的数据
-        existing_data = self.get_data_from_db(market_type, start_date, end_date)
+        coverage = CoverageService(self.db, market_type)
+        # 未来的日期不可能有数据
+        end_date = min(end_date, datetime.now())
+        missing = coverage.missing_ranges(start_date, end_date)
 
-        if len(existing_data) >= (end_date - start_date).days * 0.8:  # 80%以上的数据已存在
+        if not missing:
             return {
                 'status': 'success',
                 'message': '数据库中已有足够数据',
-                'data_count': len(existing_data),
+                'data_count': self.count_data_in_db(market_type, start_date, end_date),
                 'synced': False
             }
 
-        # 从接口获取数据
-        start_date_str = start_date.strftime('%Y%m%d') if market_type == 'domestic' else start_date.strftime('%Y-%m-%d')
-        end_date_str = end_date.strftime('%Y%m%d') if market_type == 'domestic' else end_date.strftime('%Y-%m-%d')
+        saved_count = 0
+        fetched_count = 0
+        fetch_seconds = 0.0
+        save_seconds = 0.0
+        today = date.today()
+        fallback_ranges = []
+        for range_start, range_end in missing:
+            started = time.perf_counter()
+            if fallback:
+                frame, source = self.fetch_gold_frame(market_type, range_start, range_end)
+            else:
+                frame, source = self.fetch_upstream_frame(market_type, range_start, range_end), SOURCE_UPSTREAM
+            fetched = time.perf_counter()
+            fetch_seconds += fetched - started
+            if source != SOURCE_UPSTREAM:
+                # 回退数据（模拟数据或数据库已有数据）不写库也不记为覆盖，下次同步重新向数据源请求
+                fallback_ranges.append((range_start, range_end))
+                continue
+            fetched_count += len(frame)
+            # 保存到数据库（标准 OHLCV 表直接交给批量写入）
+            saved_count += self.bulk_save_gold_price_data(frame)['inserted']
+            save_seconds += time.perf_counter() - fetched
+
+            # 当天行情可能尚未收盘，只把已确定的日期记为覆盖
+            covered_end = range_end
+            if range_end >= today:
+                last_bar = frame['date'].max().date() if not frame.empty else None
+                covered_end = min(last_bar, range_end) if last_bar else today - timedelta(days=1)
+            coverage.mark_covered(range_start, covered_end)
+
+        log_event(logger, 'sync_completed', market=market_type, ranges=len(missing), fetched=fetched_count,
+                  saved=saved_count, fallback_ranges=len(fallback_ranges),
+                  fetch_ms=fetch_seconds * 1000, save_ms=save_seconds * 1000)
+        result = {
+            'status': 'partial' if fallback_ranges else 'success',
+            'message': f'成功同步 {saved_count} 条新数据',
+            'data_count': self.count_data_in_db(market_type, start_date, end_date),
+            'synced': True,
+            'saved_count': saved_count,
+            'fetched_count': fetched_count,
+            'fetched_ranges': [
+                {'start_date': range_start.isoformat(), 'end_date': range_end.isoformat()}
+                for range_start, range_end in missing if (range_start, range_end) not in fallback_ranges
+            ]
+        }
+        if fallback_ranges:
+            result['message'] += f'，{len(fallback_ranges)} 个区间数据源不可用，未写入回退数据'
+            result['fallback_ranges'] = [
+                {'start_date': range_start.isoformat(), 'end_date': range_end.isoformat()}
+                for range_start, range_end in fallback_ranges
+            ]
+        return result
+
+
+class AsyncGoldPriceService:
+    """
+    黄金价格读取服务（异步会话）
+    API 路由使用，查询期间不阻塞事件循环；抓取和写入仍由 GoldPriceService 在线程池中完成
+    """
+
+    def __init__(self, db: AsyncSession):
+        """初始化服务"""
+        self.db = db
 
-        if market_type == 'domestic':
-            data_list = self.get_domestic_gold_data(start_date_str, end_date_str)
-        else:
-            data_list = self.get_international_gold_data(start_date_str, end_date_str)
+    async def get_data_from_db(self, market_type: str, start_date: datetime, end_date: datetime) -> List[GoldPrice]:
+        """
+        从数据库获取黄金价格数据
+        :param market_type: 市场类型
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 黄金价格数据列表
+        """
+        result = await self.db.execute(price_query(market_type, start_date, end_date))
+        data = result.scalars().all()
+        record_rows(len(data))
+        return data
 
-        # 保存到数据库
-        saved_count = self.save_gold_price_data(data_list)
+    async def get_frame_from_db(self, market_type: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        按列从数据库读取黄金价格数据（不构造 ORM 对象）
+        :return: 标准 OHLCV DataFrame
+        """
+        result = await self.db.execute(price_frame_query(market_type, start_date, end_date))
+        rows = result.all()
+        record_rows(len(rows))
+        return rows_to_frame(rows)
 
-        # 重新获取数据
-        synced_data = self.get_data_from_db(market_type, start_date, end_date)
+    async def get_close_series(self, market_type: str, start_date: datetime, end_date: datetime) -> pd.Series:
+        """
+        只读取区间内的收盘价
+        :return: 以日期（零点）为索引、按日期升序的收盘价序列
+        """
+        rows = (await self.db.execute(close_series_query(market_type, start_date, end_date))).all()
+        record_rows(len(rows))
+        if not rows:
+            return pd.Series([], index=pd.DatetimeIndex([], dtype='datetime64[us]'), dtype='float64')
+        dates, close = zip(*rows)
+        return pd.Series(close, index=pd.DatetimeIndex(normalize_dates(dates)), dtype='float64')
+
+    async def get_page(self, market_type: str, start_date: datetime, end_date: datetime, limit: int,
+                       after_date: Optional[datetime] = None,
+                       columns: bool = False) -> Tuple[Union[List[GoldPrice], pd.DataFrame], Optional[str]]:
+        """
+        keyset 分页读取区间内的数据
+        :param limit: 每页条数
+        :param after_date: 上一页最后一条的日期（decode_price_cursor 的结果），为空时从第一页开始
+        :param columns: 是否按列读取为 DataFrame（否则为 ORM 对象列表）
+        :return: (当前页数据, 下一页游标；已是最后一页时为 None)
+        """
+        # 多取一条判断是否还有下一页
+        result = await self.db.execute(
+            price_page_query(market_type, start_date, end_date, after_date, limit + 1, columns=columns)
+        )
+        rows = result.all() if columns else result.scalars().all()
+        record_rows(len(rows))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        # 游标取数据库中的原始日期（DataFrame 中的日期已截断到零点）
+        last_date = rows[-1].date if has_more else None
+        page = rows_to_frame(rows) if columns else rows
+        return page, encode_price_cursor(market_type, last_date) if has_more else None
+
+    async def count_data_in_db(self, market_type: str, start_date: datetime, end_date: datetime) -> int:
+        """
+        统计区间内的记录数
+        """
+        result = await self.db.execute(price_count_query(market_type, start_date, end_date))
+        return result.scalar_one()
 
-        return {
-            'status': 'success',
-            'message': f'成功同步 {saved_count} 条新数据',
-            'data_count': len(synced_data),
-            'synced': True,
-            'saved_count': saved_count
-        }
+    async def get_rollup_frame(self, market_type: str, period: str,
+                               start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        读取覆盖 [start_date, end_date] 的周/月/年汇总数据
+        """
+        result = await self.db.execute(rollup_query(market_type, period, start_date, end_date))
+        rows = result.all()
+        record_rows(len(rows))
+        return rows_to_frame(rows)
+
+    async def rollup_is_complete(self, market_type: str, period: str,
+                                 start_date: datetime, end_date: datetime) -> bool:
+        """
+        覆盖 [start_date, end_date] 的汇总是否包含了这些周期内的全部日线
+        """
+        result = await self.db.execute(rollup_completeness_query(market_type, period, start_date, end_date))
+        bar_count, day_count = result.one()
+        return bar_count == day_count
+
+    async def get_snapshot(self, market_type: str) -> Optional[Dict[str, Any]]:
+        """
+        获取最新价格快照（快照缺失时需要重算并写入，复用同步实现）
+        """
+        return await self.db.run_sync(lambda session: SnapshotService(session).get(market_type))
+
+
+def _batched(rows: List[Dict[str, Any]], size: int = BULK_BATCH_SIZE):
+    """按固定大小切分批次"""
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
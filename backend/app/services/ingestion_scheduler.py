@@ -0,0 +1,263 @@
+"""
+后台定时采集服务
+
+在应用生命周期内周期性地拉取各市场最近的行情并写入数据库。
+多个 uvicorn worker 同时运行时，通过数据库中的任务锁保证同一时刻只有一个进程执行采集，
+每次执行都会记录到 ingestion_runs 表。各市场依次同步，每个市场开始前续期任务锁，
+续期失败（锁已过期被其他 worker 接管）时中止本次采集。
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.ingestion import IngestionLock, IngestionRun
+from app.services.data_sync_service import MARKET_TYPES, sync_market
+
+logger = logging.getLogger(__name__)
+
+# 任务名（同时作为锁名）
+JOB_NAME = 'gold_price_ingestion'
+
+# 当前进程标识
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lock(db: Session, name: str, owner: str, ttl_seconds: int) -> bool:
+    """
+    获取任务锁：锁不存在或已过期时成功
+    锁不可重入：owner 已持有时同样失败（同一进程内的并发执行由调用方另行防护），续期使用 renew_lock
+    通过带条件的 UPDATE / 主键冲突的 INSERT 保证并发下只有一个 worker 成功
+    """
+    now = datetime.now()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    result = db.execute(
+        update(IngestionLock)
+        .where(IngestionLock.name == name, IngestionLock.expires_at < now)
+        .values(owner=owner, acquired_at=now, expires_at=expires_at)
+    )
+    if result.rowcount == 1:
+        db.commit()
+        return True
+
+    try:
+        db.add(IngestionLock(name=name, owner=owner, acquired_at=now, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        # 锁被其他 worker 持有
+        db.rollback()
+        return False
+
+
+def renew_lock(db: Session, name: str, owner: str, ttl_seconds: int) -> bool:
+    """
+    续期 owner 当前持有且未过期的任务锁
+    :return: 锁已过期或被其他 worker 接管时为 False
+    """
+    now = datetime.now()
+    result = db.execute(
+        update(IngestionLock)
+        .where(IngestionLock.name == name, IngestionLock.owner == owner, IngestionLock.expires_at >= now)
+        .values(expires_at=now + timedelta(seconds=ttl_seconds))
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_lock(db: Session, name: str, owner: str):
+    """释放任务锁（只释放自己持有的锁）"""
+    db.execute(delete(IngestionLock).where(IngestionLock.name == name, IngestionLock.owner == owner))
+    db.commit()
+
+
+class IngestionScheduler:
+    """定时采集调度器"""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal,
+                 interval_seconds: Optional[int] = None, lookback_days: Optional[int] = None,
+                 market_types=MARKET_TYPES, worker_id: str = WORKER_ID):
+        """初始化调度器"""
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds or settings.INGESTION_INTERVAL_SECONDS
+        self.lookback_days = lookback_days or settings.INGESTION_LOOKBACK_DAYS
+        self.market_types = tuple(market_types)
+        self.worker_id = worker_id
+        self.next_run_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def started(self) -> bool:
+        """调度循环是否在本进程中运行"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def running(self) -> bool:
+        """本进程是否正在执行采集"""
+        return self._running
+
+    async def start(self):
+        """启动调度循环"""
+        if not self.started:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止调度循环"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.next_run_at = None
+
+    async def _loop(self):
+        """调度循环：启动后立即执行一次，之后按间隔执行"""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("定时采集执行异常")
+            self.next_run_at = datetime.now() + timedelta(seconds=self.interval_seconds)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """
+        执行一次采集
+        :return: 本次运行记录；本进程正在采集（定时循环与手动触发重叠）或锁被其他 worker 持有时返回 None
+        """
+        # 先在进程内占位（检查和设置之间没有 await），数据库锁不可重入，不能依赖它区分本进程的并发执行
+        if self._running:
+            logger.info("本进程正在执行采集，跳过本次采集")
+            return None
+        self._running = True
+        db = self.session_factory()
+        try:
+            locked = await asyncio.to_thread(
+                acquire_lock, db, JOB_NAME, self.worker_id, settings.INGESTION_LOCK_TTL_SECONDS
+            )
+            if not locked:
+                logger.info("采集锁由其他 worker 持有，跳过本次采集")
+                return None
+
+            try:
+                return await self._run_locked(db)
+            finally:
+                await asyncio.to_thread(release_lock, db, JOB_NAME, self.worker_id)
+        finally:
+            self._running = False
+            db.close()
+
+    async def _run_locked(self, db: Session) -> Dict[str, Any]:
+        """持有锁时执行采集并记录运行历史"""
+        started_at = datetime.now()
+        run = IngestionRun(job_name=JOB_NAME, status='running', owner=self.worker_id, started_at=started_at)
+        await asyncio.to_thread(_persist, db, run)
+
+        started = time.perf_counter()
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=self.lookback_days)
+        try:
+            results = await self._sync_markets(db, start_date, end_date)
+            failed = [market for market, result in results.items() if result.get('status') != 'success']
+            run.status = 'success' if not failed else ('failed' if len(failed) == len(results) else 'partial')
+            run.rows_ingested = sum(result.get('saved_count', 0) for result in results.values())
+            run.message = f"{'、'.join(failed)} 同步失败" if failed else '采集完成'
+            if any(result.get('status') == 'aborted' for result in results.values()):
+                run.message += '（采集锁续期失败，已中止）'
+            run.details = results
+        except Exception as e:
+            logger.exception("定时采集失败")
+            run.status = 'failed'
+            run.message = str(e)
+
+        run.finished_at = datetime.now()
+        run.duration_seconds = time.perf_counter() - started
+        await asyncio.to_thread(_persist, db, run)
+        logger.info("定时采集完成: status=%s rows=%s duration=%.2fs",
+                    run.status, run.rows_ingested, run.duration_seconds)
+        return _run_to_dict(run)
+
+    async def _sync_markets(self, db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        依次同步各市场，每个市场开始前续期任务锁
+        :return: {market_type: 同步结果}；续期失败后未同步的市场状态为 aborted
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for index, market_type in enumerate(self.market_types):
+            # 第一个市场开始前刚获取锁，无需续期
+            if index > 0 and not await asyncio.to_thread(
+                    renew_lock, db, JOB_NAME, self.worker_id, settings.INGESTION_LOCK_TTL_SECONDS):
+                logger.warning("采集锁续期失败，中止本次采集: 剩余 %s", '、'.join(self.market_types[index:]))
+                for skipped in self.market_types[index:]:
+                    results[skipped] = {'status': 'aborted', 'message': '采集锁续期失败', 'synced': False}
+                break
+            results[market_type] = await sync_market(market_type, start_date, end_date, self.session_factory)
+        return results
+
+
+def _persist(db: Session, run: IngestionRun):
+    """保存运行记录"""
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+
+
+def _run_to_dict(run: IngestionRun) -> Dict[str, Any]:
+    """运行记录转为字典"""
+    return {
+        'id': run.id,
+        'job_name': run.job_name,
+        'status': run.status,
+        'owner': run.owner,
+        'started_at': run.started_at,
+        'finished_at': run.finished_at,
+        'duration_seconds': run.duration_seconds,
+        'rows_ingested': run.rows_ingested,
+        'message': run.message,
+        'details': run.details,
+    }
+
+
+def get_recent_runs(db: Session, limit: int = 20) -> List[IngestionRun]:
+    """获取最近的运行记录（所有 worker）"""
+    return db.execute(
+        select(IngestionRun)
+        .where(IngestionRun.job_name == JOB_NAME)
+        .order_by(IngestionRun.started_at.desc(), IngestionRun.id.desc())
+        .limit(limit)
+    ).scalars().all()
+
+
+def get_last_run(db: Session, status: Optional[str] = None) -> Optional[IngestionRun]:
+    """获取最近一次（指定状态的）运行记录"""
+    query = select(IngestionRun).where(IngestionRun.job_name == JOB_NAME)
+    if status:
+        query = query.where(IngestionRun.status == status)
+    return db.execute(
+        query.order_by(IngestionRun.started_at.desc(), IngestionRun.id.desc()).limit(1)
+    ).scalars().first()
+
+
+def get_lock(db: Session) -> Optional[IngestionLock]:
+    """获取当前任务锁"""
+    return db.get(IngestionLock, JOB_NAME)
+
+
+# 应用内的调度器实例
+ingestion_scheduler = IngestionScheduler()
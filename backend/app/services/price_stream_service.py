@@ -0,0 +1,194 @@
+"""
+实时价格推送（Server-Sent Events）
+
+每个 worker 进程一个扇出中心 PriceStreamHub：
+- 数据写入监听器通知某市场有新数据后，中心只读取一次最新快照，组装成精简消息推送给所有订阅者，
+  N 个连接的看板每次更新只产生一次读取，而不是每个轮询周期 N 次
+- 每个订阅者一个有界队列；慢客户端的队列满时丢弃最旧的消息（价格消息只有最新的有意义），
+  不会阻塞其他订阅者，也不会无限占用内存
+- 写入监听器可能在线程池或后台线程中执行，通过 call_soon_threadsafe 切换到事件循环
+- 写入通知只在本进程内传递，缓存的最新消息带过期时间（SNAPSHOT_MEMORY_TTL_SECONDS），
+  其他 worker 写入的数据最迟在过期后被新连接读到
+"""
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.gold_price_service import AsyncGoldPriceService, register_write_listener
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ('domestic', 'international')
+
+
+def snapshot_message(market_type: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """最新价格快照转换为推送消息（最新价 + 涨跌汇总）"""
+    latest_date = snapshot['latest_date']
+    return {
+        'market_type': market_type,
+        'date': latest_date.date().isoformat() if isinstance(latest_date, datetime) else latest_date,
+        'price': snapshot['latest_price'],
+        'previous_price': snapshot['previous_price'],
+        'change': snapshot['change'],
+        'change_percent': snapshot['change_percent'],
+        'volume': snapshot['volume'],
+    }
+
+
+def format_sse(message: Dict[str, Any], event: str = 'price', event_id: Optional[int] = None) -> bytes:
+    """编码为一条 SSE 事件"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(message, ensure_ascii=False, separators=(',', ':')))
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+
+class Subscription:
+    """一个订阅者：有界队列，满时丢弃最旧的消息"""
+
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, message: Dict[str, Any]):
+        """放入消息（只能在事件循环线程中调用）"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Dict[str, Any]:
+        """等待下一条消息"""
+        return await self.queue.get()
+
+
+class PriceStreamHub:
+    """进程内价格推送扇出中心"""
+
+    def __init__(self, queue_size: int = settings.PRICE_STREAM_QUEUE_SIZE,
+                 latest_ttl: float = settings.SNAPSHOT_MEMORY_TTL_SECONDS):
+        """
+        :param queue_size: 每个订阅者最多积压的消息数
+        :param latest_ttl: 缓存的最新消息有效期（秒）
+        """
+        self.queue_size = queue_size
+        self.latest_ttl = latest_ttl
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """断开所有订阅者并清空状态"""
+        with self._lock:
+            self._subscribers: Set[Subscription] = set()
+            # market_type -> 最新消息
+            self._latest = TTLCache(maxsize=len(MARKETS), ttl=self.latest_ttl)
+            self._pending: Set[str] = set()
+            self._loop: Optional[asyncio.AbstractEventLoop] = None
+            self._session_factory: Optional[async_sessionmaker] = None
+            self.sequence = 0
+            self.reads = 0
+            self.dropped = 0
+
+    def subscribe(self, session_factory: async_sessionmaker) -> Subscription:
+        """
+        新增订阅者（在事件循环中调用）；中心绑定到当前事件循环和会话工厂
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._session_factory = session_factory
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """移除订阅者"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+            self.dropped += subscription.dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """订阅者数、推送条数、读取次数和丢弃的消息数"""
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.sequence,
+                'reads': self.reads,
+                'dropped': self.dropped + sum(s.dropped for s in self._subscribers),
+            }
+
+    def notify(self, market_type: str):
+        """
+        某市场有新数据（可在任意线程调用）
+        没有订阅者时只让缓存的最新消息失效；同一市场尚未处理的通知合并为一次读取
+        """
+        with self._lock:
+            self._latest.invalidate(market_type)
+            loop = self._loop
+            if not self._subscribers or loop is None or market_type in self._pending:
+                return
+            self._pending.add(market_type)
+        try:
+            loop.call_soon_threadsafe(lambda: loop.create_task(self._refresh(market_type)))
+        except RuntimeError:
+            # 事件循环已关闭（进程正在退出）
+            with self._lock:
+                self._pending.discard(market_type)
+
+    async def _read(self, market_type: str) -> Optional[Dict[str, Any]]:
+        """读取一次最新快照并缓存为消息"""
+        self.reads += 1
+        async with self._session_factory() as db:
+            snapshot = await AsyncGoldPriceService(db).get_snapshot(market_type)
+        if snapshot is None:
+            return None
+        message = snapshot_message(market_type, snapshot)
+        self._latest.set(market_type, message, tags=(market_type,))
+        return message
+
+    async def _refresh(self, market_type: str):
+        """读取最新快照并推送给所有订阅者"""
+        with self._lock:
+            self._pending.discard(market_type)
+        try:
+            message = await self._read(market_type)
+        except Exception:
+            logger.exception("读取最新价格快照失败: %s", market_type)
+            return
+        if message is not None:
+            self.publish(message)
+
+    def publish(self, message: Dict[str, Any]):
+        """推送消息给所有订阅者（在事件循环线程中调用）"""
+        with self._lock:
+            self.sequence += 1
+            message = {**message, 'sequence': self.sequence}
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(message)
+
+    async def current(self) -> List[Dict[str, Any]]:
+        """各市场当前的最新消息（新连接的初始状态，缓存未过期的市场不再读取）"""
+        messages = []
+        for market in MARKETS:
+            message = self._latest.get(market) or await self._read(market)
+            if message is not None:
+                messages.append(message)
+        return messages
+
+
+# 每个 worker 进程一个扇出中心
+price_hub = PriceStreamHub()
+
+
+@register_write_listener
+def _notify_price_hub(market_type: str, start_date: datetime, end_date: datetime):
+    """数据写入后推送该市场的最新价格"""
+    price_hub.notify(market_type)
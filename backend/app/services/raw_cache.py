@@ -0,0 +1,126 @@
+"""
+上游行情的本地文件缓存
+
+按 数据源 / 代码 / 月份 分块保存数据源返回的行情表（已映射为标准列），每月一个文件：
+- 已结束的月份（月末之后又过了 close_grace_days 天）永不过期，再次同步、回填时直接读取本地文件；
+  宽限期内月末的日线可能尚未发布（例如国际数据源在东八区的月初），仍按当月处理
+- 当月数据仍在变化，保存为 .open 文件，超过 current_ttl 秒后重新下载
+- 空结果不落盘：数据源偶发返回空表时不会把整月永久缓存为空
+
+有 pyarrow 时使用 Parquet，否则退化为 pickle。测试可以预先放入文件回放，无需访问网络。
+"""
+import logging
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+Chunk = Tuple[date, date]
+
+logger = logging.getLogger(__name__)
+
+# 文件格式 -> 扩展名
+FORMAT_SUFFIXES = {'parquet': '.parquet', 'pickle': '.pkl'}
+
+
+def month_chunks(start_date: date, end_date: date) -> List[Chunk]:
+    """[start_date, end_date] 涉及的完整月份：[(月初, 月末), ...]"""
+    chunks = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        chunks.append((current, next_month - timedelta(days=1)))
+        current = next_month
+    return chunks
+
+
+class RawFrameCache:
+    """按月分块的行情文件缓存"""
+
+    def __init__(self, root: str, fmt: str = 'parquet', current_ttl: float = 300.0, close_grace_days: int = 1,
+                 today: Callable[[], date] = date.today, clock: Callable[[], float] = time.time):
+        """
+        :param root: 缓存目录
+        :param fmt: parquet / pickle（没有 pyarrow 时 parquet 自动改用 pickle）
+        :param current_ttl: 当月文件的有效期（秒）
+        :param close_grace_days: 月末之后再过多少天才视为月份已结束
+        :param today: 当前日期函数（测试时可替换）
+        :param clock: 时钟函数（测试时可替换）
+        """
+        if fmt not in FORMAT_SUFFIXES:
+            raise ValueError(f"不支持的缓存格式: {fmt}")
+        self.root = Path(root)
+        self.format = 'pickle' if fmt == 'parquet' and not HAS_PARQUET else fmt
+        self.current_ttl = current_ttl
+        self.close_grace = timedelta(days=close_grace_days)
+        self._today = today
+        self._clock = clock
+
+    def today(self) -> date:
+        """当前日期"""
+        return self._today()
+
+    def is_closed(self, chunk_end: date) -> bool:
+        """月份是否已结束（数据不会再变化）：月末之后已过宽限期，最后一个交易日的数据已经发布"""
+        return chunk_end + self.close_grace < self._today()
+
+    def path(self, source: str, symbol: str, chunk_start: date, closed: bool) -> Path:
+        """缓存文件路径：<root>/<source>/<symbol>/<YYYY-MM>[.open].<ext>"""
+        name = chunk_start.strftime('%Y-%m') + ('' if closed else '.open') + FORMAT_SUFFIXES[self.format]
+        return self.root / source / symbol / name
+
+    def read(self, source: str, symbol: str, chunk: Chunk) -> Optional[pd.DataFrame]:
+        """
+        读取一个月的缓存
+        :return: 缓存的行情表；不存在、当月文件已过期或读取失败时返回 None
+        """
+        closed = self.is_closed(chunk[1])
+        path = self.path(source, symbol, chunk[0], closed)
+        try:
+            if not closed and self._clock() - path.stat().st_mtime > self.current_ttl:
+                return None
+            if self.format == 'parquet':
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("读取行情缓存失败 %s: %s", path, e)
+            return None
+
+    def write(self, source: str, symbol: str, chunk: Chunk, frame: pd.DataFrame) -> bool:
+        """
+        写入一个月的缓存（先写临时文件再原子替换，多进程并发写入安全）
+        :return: 是否写入
+        """
+        if frame.empty:
+            return False
+        closed = self.is_closed(chunk[1])
+        path = self.path(source, symbol, chunk[0], closed)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            frame = frame.reset_index(drop=True)
+            if self.format == 'parquet':
+                frame.to_parquet(tmp, index=False)
+            else:
+                frame.to_pickle(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        if closed:
+            # 月份结束后完整下载一次，旧的当月文件不再需要
+            self.path(source, symbol, chunk[0], closed=False).unlink(missing_ok=True)
+        return True
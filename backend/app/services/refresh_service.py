@@ -0,0 +1,170 @@
+"""
+读路径的后台补数（stale-while-revalidate）
+
+读接口不再在请求中同步抓取上游数据：先按覆盖区间判断库中数据是否完整，直接返回已有数据并标明
+新鲜度，缺失的区间交给后台刷新。每个 worker 进程一个 ReadRefresher：
+- 同一市场进行中的刷新覆盖了请求的缺失区间时直接复用，并发读取同一区间只触发一次同步
+- 刷新完成后失效该市场的响应缓存（缓存的响应记录了新鲜度，即使没有写入新数据也要重新生成）
+- 刷新完成后的冷却时间内不再为同一区间重复刷新（例如当天尚未收盘、上游还没有数据的区间）；
+  上游失败时不回退到模拟数据，区间保持 stale，也不进入冷却，下一次读取重新刷新
+- wait 模式等待共享的刷新任务，而不是自己再发起一次同步
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.services.coverage_service import CoverageService
+from app.services.data_sync_service import sync_market
+
+Interval = Tuple[date, date]
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+def missing_ranges_in_session(session_factory: sessionmaker, market_type: str,
+                              start_date: datetime, end_date: datetime) -> List[Interval]:
+    """
+    在独立会话中计算 [start_date, end_date] 内未覆盖的交易日子区间（阻塞，供线程池调用）
+    未来的日期不可能有数据，不计为缺失
+    """
+    end_date = min(end_date, datetime.now())
+    if start_date > end_date:
+        return []
+    db = session_factory()
+    try:
+        return CoverageService(db, market_type).missing_ranges(start_date, end_date)
+    finally:
+        db.close()
+
+
+@dataclass
+class _Refresh:
+    """进行中或刚完成的刷新"""
+    start: date
+    end: date
+    task: asyncio.Task
+    finished_at: Optional[float] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start <= start and self.end >= end
+
+
+class ReadRefresher:
+    """按市场去重的后台刷新（只在事件循环线程中调用）"""
+
+    def __init__(self, cooldown: float = settings.READ_REFRESH_COOLDOWN_SECONDS):
+        """
+        :param cooldown: 刷新完成后多少秒内不再为其覆盖的区间重复刷新
+        """
+        self.cooldown = cooldown
+        self._refreshes: Dict[str, List[_Refresh]] = {}
+        self.started = 0
+        self.joined = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def reset(self):
+        """清空状态和计数（测试用）"""
+        self._refreshes.clear()
+        self.started = self.joined = self.skipped = self.failed = 0
+
+    async def missing_ranges(self, session_factory: sessionmaker, market_type: str,
+                             start_date: datetime, end_date: datetime) -> List[Interval]:
+        """库中 [start_date, end_date] 未覆盖的交易日子区间（在线程池中查询）"""
+        return await asyncio.to_thread(missing_ranges_in_session, session_factory, market_type, start_date, end_date)
+
+    def _find(self, market_type: str, start: date, end: date) -> Optional[_Refresh]:
+        """覆盖 [start, end] 的进行中刷新，或冷却时间内完成的刷新"""
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        live = []
+        found = None
+        for refresh in self._refreshes.get(market_type, []):
+            if refresh.finished_at is None:
+                # 其他事件循环中的任务无法等待（例如测试客户端每个请求一个事件循环）
+                if refresh.task.get_loop() is not loop or refresh.task.done():
+                    continue
+            elif now - refresh.finished_at > self.cooldown:
+                continue
+            live.append(refresh)
+            if found is None and refresh.covers(start, end):
+                found = refresh
+        self._refreshes[market_type] = live
+        return found
+
+    def ensure(self, market_type: str, missing: List[Interval],
+               session_factory: sessionmaker) -> Optional[asyncio.Task]:
+        """
+        确保有一个覆盖缺失区间的刷新
+        :param missing: missing_ranges 的结果，刷新其首尾之间的整段区间（同步时只抓取其中缺失的部分）
+        :return: 进行中的刷新任务；冷却时间内已刷新过时为 None
+        """
+        if not missing:
+            return None
+        start, end = missing[0][0], missing[-1][1]
+        refresh = self._find(market_type, start, end)
+        if refresh is not None:
+            if refresh.finished_at is not None:
+                self.skipped += 1
+                return None
+            self.joined += 1
+            return refresh.task
+
+        task = asyncio.get_running_loop().create_task(self._run(market_type, start, end, session_factory))
+        self._refreshes.setdefault(market_type, []).append(_Refresh(start, end, task))
+        self.started += 1
+        return task
+
+    async def wait(self, market_type: str, missing: List[Interval],
+                   session_factory: sessionmaker) -> Optional[Dict[str, Any]]:
+        """
+        等待覆盖缺失区间的刷新完成（共享进行中的任务；取消等待不会取消刷新本身）
+        :return: 同步结果；冷却时间内已刷新过时为 None
+        """
+        task = self.ensure(market_type, missing, session_factory)
+        if task is None:
+            return None
+        return await asyncio.shield(task)
+
+    async def _run(self, market_type: str, start: date, end: date,
+                   session_factory: sessionmaker) -> Dict[str, Any]:
+        """
+        执行同步（超时和异常由 sync_market 转换为结果状态），完成后失效响应缓存
+        失败的刷新不记录完成时间：任务结束后即从进行中移除，不参与冷却
+        """
+        result = await sync_market(market_type, datetime.combine(start, datetime.min.time()),
+                                   datetime.combine(end, datetime.min.time()), session_factory, fallback=False)
+        failed = result.get('status') != 'success'
+        if failed:
+            self.failed += 1
+        for refresh in self._refreshes.get(market_type, []):
+            if refresh.task is asyncio.current_task() and not failed:
+                refresh.finished_at = time.monotonic()
+                refresh.result = result
+        response_cache.invalidate(market_type)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """刷新计数和各市场进行中的刷新数"""
+        return {
+            'started': self.started,
+            'joined': self.joined,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'in_flight': {
+                market_type: sum(1 for refresh in refreshes if refresh.finished_at is None and not refresh.task.done())
+                for market_type, refreshes in self._refreshes.items()
+            },
+        }
+
+
+# 进程内共享的读路径刷新器
+read_refresher = ReadRefresher()
@@ -0,0 +1,189 @@
+"""
+周期汇总（rollup）服务
+
+在 gold_price_rollups 表中维护每个市场的周/月/年 OHLCV。日线数据写入后按受影响的周期增量重算，
+区间查询可以直接读取最粗的满足分辨率的汇总表，多年数据只需读取几百行。
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.gold_price import GoldPrice, GoldPriceRollup
+from app.utils.downsampling import bucket_starts, resample_ohlcv
+from app.utils.ohlcv import PRICE_COLUMNS, rows_to_frame
+
+# 汇总周期（由细到粗）
+ROLLUP_PERIODS = ('week', 'month', 'year')
+
+# 各周期的平均自然日长度，用于估算区间内的点数
+PERIOD_DAYS = {'day': 1, 'week': 7, 'month': 30.44, 'year': 365.25}
+
+
+def period_bounds(period: str, start_date: datetime, end_date: datetime):
+    """
+    把日期区间扩展到完整周期：返回 (首个周期起始日, 最后一个周期结束日的次日)
+    """
+    first = bucket_starts(np.array([np.datetime64(start_date, 'D')]), period)[0]
+    last = bucket_starts(np.array([np.datetime64(end_date, 'D')]), period)[0]
+    if period == 'week':
+        stop = last + np.timedelta64(7, 'D')
+    elif period == 'month':
+        stop = (last.astype('datetime64[M]') + 1).astype('datetime64[D]')
+    else:
+        stop = (last.astype('datetime64[Y]') + 1).astype('datetime64[D]')
+    return first.item(), stop.item()
+
+
+def choose_period(start_date: datetime, end_date: datetime, max_points: int) -> str:
+    """
+    选择点数不超过 max_points 的最细周期（即满足分辨率要求的最粗汇总）
+    :return: day / week / month / year
+    """
+    days = max((end_date - start_date).days + 1, 1)
+    for period in ('day',) + ROLLUP_PERIODS:
+        if days / PERIOD_DAYS[period] <= max_points:
+            return period
+    return ROLLUP_PERIODS[-1]
+
+
+def _rollup_filter(market_type: str, period: str, start_date: datetime, end_date: datetime):
+    """覆盖 [start_date, end_date] 的汇总行（首尾周期完整包含）的过滤条件"""
+    first, _ = period_bounds(period, start_date, end_date)
+    return (
+        GoldPriceRollup.market_type == market_type,
+        GoldPriceRollup.period == period,
+        GoldPriceRollup.period_start >= datetime.combine(first, datetime.min.time()),
+        GoldPriceRollup.period_start <= end_date
+    )
+
+
+def rollup_query(market_type: str, period: str, start_date: datetime, end_date: datetime):
+    """覆盖 [start_date, end_date] 的汇总行按列查询（标准 OHLCV 列顺序，日期为周期起始日）"""
+    return (
+        select(GoldPriceRollup.market_type, GoldPriceRollup.period_start,
+               *[getattr(GoldPriceRollup, c) for c in PRICE_COLUMNS])
+        .where(*_rollup_filter(market_type, period, start_date, end_date))
+        .order_by(GoldPriceRollup.period_start)
+    )
+
+
+def rollup_completeness_query(market_type: str, period: str, start_date: datetime, end_date: datetime):
+    """
+    (汇总行的 bar_count 之和, 同一批完整周期内的日线数) 查询
+    两者不等说明汇总不完整（例如升级前写入的日线还没有汇总行）
+    """
+    first, stop = period_bounds(period, start_date, end_date)
+    bars = select(func.coalesce(func.sum(GoldPriceRollup.bar_count), 0)).where(
+        *_rollup_filter(market_type, period, start_date, end_date)
+    )
+    days = select(func.count()).select_from(GoldPrice).where(
+        GoldPrice.market_type == market_type,
+        GoldPrice.date >= datetime.combine(first, datetime.min.time()),
+        GoldPrice.date < datetime.combine(stop, datetime.min.time())
+    )
+    return select(bars.scalar_subquery(), days.scalar_subquery())
+
+
+class RollupService:
+    """周期汇总服务"""
+
+    def __init__(self, db: Session):
+        """初始化服务"""
+        self.db = db
+
+    def refresh(self, market_type: str, start_date: datetime, end_date: datetime,
+                periods: Sequence[str] = ROLLUP_PERIODS, commit: bool = True) -> Dict[str, int]:
+        """
+        重算 [start_date, end_date] 所涉及的完整周期
+        :return: {周期: 写入的汇总行数}
+        """
+        written = {}
+        bounds = {period: period_bounds(period, start_date, end_date) for period in periods}
+        if not bounds:
+            return written
+        # 各周期的范围互相重叠，只读取一次覆盖所有周期的日线，再按周期切片
+        loaded = self._load_daily(market_type,
+                                  datetime.combine(min(first for first, _ in bounds.values()), datetime.min.time()),
+                                  datetime.combine(max(stop for _, stop in bounds.values()), datetime.min.time()))
+        days = loaded['date'].to_numpy(dtype='datetime64[D]')
+        for period, (first, stop) in bounds.items():
+            in_period = (days >= np.datetime64(first, 'D')) & (days < np.datetime64(stop, 'D'))
+            daily = loaded[in_period]
+            rollup = resample_ohlcv(daily, period, with_counts=True) if not daily.empty else daily
+
+            # 先删后插，周期内日线被删除或修改时也能保持一致
+            self.db.execute(delete(GoldPriceRollup).where(
+                GoldPriceRollup.market_type == market_type,
+                GoldPriceRollup.period == period,
+                GoldPriceRollup.period_start >= datetime.combine(first, datetime.min.time()),
+                GoldPriceRollup.period_start < datetime.combine(stop, datetime.min.time())
+            ))
+            if not rollup.empty:
+                self.db.execute(insert(GoldPriceRollup), self._to_rows(market_type, period, rollup))
+            written[period] = len(rollup)
+
+        if commit:
+            self.db.commit()
+        return written
+
+    def rebuild(self, market_types: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        根据全部日线数据重建汇总表
+        :return: {市场: {周期: 行数}}
+        """
+        if market_types is None:
+            market_types = self.db.execute(select(GoldPrice.market_type).distinct()).scalars().all()
+
+        result = {}
+        for market_type in market_types:
+            first, last = self.db.execute(
+                select(func.min(GoldPrice.date), func.max(GoldPrice.date))
+                .where(GoldPrice.market_type == market_type)
+            ).one()
+            self.db.execute(delete(GoldPriceRollup).where(GoldPriceRollup.market_type == market_type))
+            if first is None:
+                self.db.commit()
+                result[market_type] = {period: 0 for period in ROLLUP_PERIODS}
+                continue
+            result[market_type] = self.refresh(market_type, first, last)
+        return result
+
+    def get_frame(self, market_type: str, period: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        读取覆盖 [start_date, end_date] 的汇总数据，返回标准 OHLCV 表（日期为周期起始日）
+        """
+        return rows_to_frame(self.db.execute(rollup_query(market_type, period, start_date, end_date)).all())
+
+    def _load_daily(self, market_type: str, start_date: datetime, stop_date: datetime) -> pd.DataFrame:
+        """按列读取 [start_date, stop_date) 的日线"""
+        rows = self.db.execute(
+            select(GoldPrice.market_type, GoldPrice.date, *[getattr(GoldPrice, c) for c in PRICE_COLUMNS])
+            .where(
+                GoldPrice.market_type == market_type,
+                GoldPrice.date >= start_date,
+                GoldPrice.date < stop_date
+            )
+            .order_by(GoldPrice.date)
+        ).all()
+        return rows_to_frame(rows)
+
+    @staticmethod
+    def _to_rows(market_type: str, period: str, rollup: pd.DataFrame) -> List[Dict]:
+        """汇总表转为插入参数"""
+        columns = {
+            'period_start': rollup['date'].to_numpy().astype('datetime64[us]').astype(object).tolist(),
+            'bar_count': rollup['bar_count'].astype('int64').tolist(),
+        }
+        for column in PRICE_COLUMNS:
+            values = rollup[column].to_numpy(dtype='float64')
+            columns[column] = np.where(np.isnan(values), None, values).tolist()
+        columns['close_price'] = [value if value is not None else 0 for value in columns['close_price']]
+        keys = list(columns)
+        return [
+            dict(zip(keys, values), market_type=market_type, period=period)
+            for values in zip(*columns.values())
+        ]
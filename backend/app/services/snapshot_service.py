@@ -0,0 +1,102 @@
+"""
+最新价格快照服务
+
+每个市场在 gold_price_snapshots 中维护一行：最新收盘价、前一交易日收盘价、涨跌和成交量。
+快照在数据写入时更新（按日期倒序取两行，走 (market_type, date) 索引），
+读取时优先使用进程内存，其次读取单行快照，与数据的时间跨度和节假日空档无关。
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.gold_price import GoldPrice, GoldPriceSnapshot
+
+# 进程内快照缓存：market_type -> 快照字典
+snapshot_cache = TTLCache(maxsize=16, ttl=settings.SNAPSHOT_MEMORY_TTL_SECONDS)
+
+
+def _to_dict(snapshot: GoldPriceSnapshot) -> Dict[str, Any]:
+    """快照行转为字典"""
+    return {
+        'market_type': snapshot.market_type,
+        'latest_date': snapshot.latest_date,
+        'latest_price': snapshot.latest_price,
+        'previous_date': snapshot.previous_date,
+        'previous_price': snapshot.previous_price,
+        'change': snapshot.change,
+        'change_percent': snapshot.change_percent,
+        'volume': snapshot.volume,
+    }
+
+
+class SnapshotService:
+    """最新价格快照服务"""
+
+    def __init__(self, db: Session):
+        """初始化服务"""
+        self.db = db
+
+    def refresh(self, market_type: str, commit: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        根据最新两根日线重算快照
+        :return: 快照字典；该市场没有数据时返回 None
+        """
+        rows = self.db.execute(
+            select(GoldPrice.date, GoldPrice.close_price, GoldPrice.volume)
+            .where(GoldPrice.market_type == market_type)
+            .order_by(GoldPrice.date.desc())
+            .limit(2)
+        ).all()
+        if not rows:
+            return None
+
+        latest = rows[0]
+        previous = rows[1] if len(rows) > 1 else None
+        change = None
+        change_percent = None
+        if previous is not None:
+            change = latest.close_price - previous.close_price
+            change_percent = (change / previous.close_price) * 100 if previous.close_price else None
+
+        snapshot = self.db.execute(
+            select(GoldPriceSnapshot).where(GoldPriceSnapshot.market_type == market_type)
+        ).scalars().first()
+        if snapshot is None:
+            snapshot = GoldPriceSnapshot(market_type=market_type)
+            self.db.add(snapshot)
+
+        snapshot.latest_date = latest.date
+        snapshot.latest_price = latest.close_price
+        snapshot.previous_date = previous.date if previous is not None else None
+        snapshot.previous_price = previous.close_price if previous is not None else None
+        snapshot.change = change
+        snapshot.change_percent = change_percent
+        snapshot.volume = latest.volume
+
+        if commit:
+            self.db.commit()
+        result = _to_dict(snapshot)
+        snapshot_cache.set(market_type, result)
+        return result
+
+    def get(self, market_type: str) -> Optional[Dict[str, Any]]:
+        """
+        获取市场快照：内存 -> 快照行 -> 从日线重算
+        :return: 快照字典；该市场没有数据时返回 None
+        """
+        cached = snapshot_cache.get(market_type)
+        if cached is not None:
+            return cached
+
+        snapshot = self.db.execute(
+            select(GoldPriceSnapshot).where(GoldPriceSnapshot.market_type == market_type)
+        ).scalars().first()
+        if snapshot is None:
+            return self.refresh(market_type)
+
+        result = _to_dict(snapshot)
+        snapshot_cache.set(market_type, result)
+        return result
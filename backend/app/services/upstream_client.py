@@ -0,0 +1,405 @@
+"""
+上游数据源访问层
+
+AKShare（国内）和 yfinance（国际）的所有请求都经过 UpstreamClient：
+- 每个数据源一个令牌桶，限制请求速率
+- 限流和网络类错误按指数退避（全抖动）重试，重试耗尽的限流错误抛出 UpstreamRateLimitError
+- 单飞合并：并发请求的日期区间被进行中的请求覆盖时直接共享结果，部分重叠时只请求未覆盖的部分
+- 配置了 RawFrameCache 时按月读写本地文件缓存，只向数据源请求缺失的月份（连续缺失的月份合并为一次请求）
+- 记录请求次数、上游调用次数、重试、等待时间、合并命中数和文件缓存命中数
+- 每次数据源调用的耗时计入 /metrics 的直方图，fetch 的耗时计入当前请求的 Server-Timing
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import akshare as ak
+import pandas as pd
+import yfinance as yf
+
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_FETCH_DURATION, record_upstream
+from app.services.raw_cache import RawFrameCache, month_chunks
+from app.utils.ohlcv import AKSHARE_COLUMN_MAP, YFINANCE_COLUMN_MAP, empty_ohlcv_frame, normalize_ohlcv_frame
+
+# 限流错误的特征（数据源抛出的是普通异常，只能根据状态码和错误信息判断）
+RATE_LIMIT_KEYWORDS = ('rate limit', 'too many requests', 'too frequent', '429', 'limited')
+
+Loader = Callable[[date, date], pd.DataFrame]
+
+
+class UpstreamRateLimitError(Exception):
+    """数据源限流且重试耗尽"""
+
+    def __init__(self, source: str, cause: Exception):
+        super().__init__(f"{source} 数据源限流: {cause}")
+        self.source = source
+        self.cause = cause
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """是否为限流错误（HTTP 429 或错误信息包含限流关键字）"""
+    if isinstance(error, UpstreamRateLimitError):
+        return True
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return any(keyword in message for keyword in RATE_LIMIT_KEYWORDS)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """是否为可重试的网络类错误"""
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random) -> float:
+    """
+    指数退避（全抖动）：在 [0, min(cap, base * 2^attempt)] 中均匀取值
+    :param attempt: 已失败的次数（从 0 开始）
+    """
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """令牌桶限速器（线程安全）"""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        :param rate: 每秒补充的令牌数，<= 0 表示不限速
+        :param capacity: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        取一个令牌，不足时阻塞等待
+        :return: 等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 预扣令牌：并发调用方依次排在后面，各自等待自己的补充时间
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@dataclass
+class UpstreamSource:
+    """数据源配置"""
+    name: str
+    symbol: str
+    loader: Loader
+    rate: float
+    burst: int
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+
+
+class _Flight:
+    """进行中的上游请求"""
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.end = end
+        self._done = threading.Event()
+        self._result: Optional[pd.DataFrame] = None
+        self._error: Optional[Exception] = None
+
+    def resolve(self, result: Optional[pd.DataFrame] = None, error: Optional[Exception] = None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def wait(self) -> pd.DataFrame:
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def _slice(frame: pd.DataFrame, start: date, end: date) -> pd.DataFrame:
+    """截取 [start, end] 内的行"""
+    if frame.empty:
+        return frame
+    days = frame['date'].to_numpy(dtype='datetime64[D]')
+    mask = (days >= pd.Timestamp(start).to_datetime64()) & (days <= pd.Timestamp(end).to_datetime64())
+    return frame[mask]
+
+
+def _gaps(start: date, end: date, covered: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """[start, end] 中未被 covered 覆盖的子区间"""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in sorted(covered):
+        if covered_start > cursor:
+            gaps.append((cursor, min(end, covered_start - timedelta(days=1))))
+        cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _concat(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """合并多段行情表（按日期去重、排序）"""
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return empty_ohlcv_frame()
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    frame = pd.concat(parts, ignore_index=True)
+    return frame.drop_duplicates(subset=['date'], keep='last').sort_values('date').reset_index(drop=True)
+
+
+class UpstreamClient:
+    """共享的上游数据源客户端"""
+
+    def __init__(self, sources: Dict[str, UpstreamSource], clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, seed: Optional[int] = None,
+                 raw_cache: Optional[RawFrameCache] = None):
+        """
+        :param sources: 数据源名称 -> 配置
+        :param raw_cache: 按月的本地文件缓存，为空时每次都请求数据源
+        :param clock: 时钟函数（测试时可替换）
+        :param sleep: 等待函数（测试时可替换）
+        :param seed: 退避抖动的随机种子
+        """
+        self.sources = sources
+        self.raw_cache = raw_cache
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._buckets = {
+            name: TokenBucket(source.rate, source.burst, clock=clock, sleep=sleep)
+            for name, source in sources.items()
+        }
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, List[_Flight]] = {name: [] for name in sources}
+        self._stats: Dict[str, Dict[str, Any]] = {name: self._empty_stats() for name in sources}
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            'requests': 0,
+            'upstream_calls': 0,
+            'attempts': 0,
+            'retries': 0,
+            'failures': 0,
+            'rate_limited': 0,
+            'coalesced': 0,
+            'partially_coalesced': 0,
+            'throttle_wait_seconds': 0.0,
+            'backoff_wait_seconds': 0.0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_writes': 0,
+        }
+
+    def _count(self, source: str, key: str, value: float = 1):
+        with self._lock:
+            self._stats[source][key] += value
+
+    def fetch(self, source: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        获取 [start_date, end_date]（含两端）的标准 OHLCV 表
+        :raises UpstreamRateLimitError: 限流且重试耗尽
+        """
+        started = time.perf_counter()
+        try:
+            return self._fetch(source, start_date, end_date)
+        finally:
+            record_upstream(source, time.perf_counter() - started)
+
+    def _fetch(self, source: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """fetch 的实现（部分重叠时递归请求缺口）"""
+        if start_date > end_date:
+            return empty_ohlcv_frame()
+
+        with self._lock:
+            self._stats[source]['requests'] += 1
+            flights = self._inflight[source]
+            container = next((f for f in flights if f.start <= start_date and f.end >= end_date), None)
+            overlapping = [f for f in flights if f.start <= end_date and f.end >= start_date]
+            flight = None
+            if container is not None:
+                self._stats[source]['coalesced'] += 1
+            elif overlapping:
+                self._stats[source]['partially_coalesced'] += 1
+            else:
+                flight = _Flight(start_date, end_date)
+                flights.append(flight)
+
+        if container is not None:
+            return _slice(container.wait(), start_date, end_date)
+        if flight is None:
+            return self._fetch_around(source, start_date, end_date, overlapping)
+
+        try:
+            result = self._load(source, start_date, end_date)
+        except Exception as e:
+            flight.resolve(error=e)
+            raise
+        else:
+            flight.resolve(result=result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight[source].remove(flight)
+
+    def _fetch_around(self, source: str, start_date: date, end_date: date,
+                      overlapping: List[_Flight]) -> pd.DataFrame:
+        """部分重叠：重叠部分复用进行中的请求，其余部分单独请求（先请求缺口，再等待进行中的请求）"""
+        covered = [(max(start_date, flight.start), min(end_date, flight.end)) for flight in overlapping]
+        parts = [self._fetch(source, gap_start, gap_end) for gap_start, gap_end in _gaps(start_date, end_date, covered)]
+        for flight, (overlap_start, overlap_end) in zip(overlapping, covered):
+            parts.append(_slice(flight.wait(), overlap_start, overlap_end))
+        return _concat(parts)
+
+    def _load(self, source: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        读取 [start_date, end_date]：先读本地月度缓存，缺失的连续月份合并为一次数据源请求后按月写回
+        """
+        if self.raw_cache is None:
+            return self._call(source, start_date, end_date)
+
+        symbol = self.sources[source].symbol
+        parts = []
+        missing: List[Tuple[date, date]] = []
+        for chunk in month_chunks(start_date, end_date):
+            cached = self.raw_cache.read(source, symbol, chunk)
+            if cached is None:
+                self._count(source, 'cache_misses')
+                if missing and missing[-1][1] + timedelta(days=1) == chunk[0]:
+                    missing[-1] = (missing[-1][0], chunk[1])
+                else:
+                    missing.append(chunk)
+            else:
+                self._count(source, 'cache_hits')
+                parts.append(cached)
+
+        today = self.raw_cache.today()
+        for run_start, run_end in missing:
+            # 按整月请求，保证写入的文件覆盖完整月份；不请求未来的日期
+            frame = self._call(source, run_start, min(run_end, today))
+            for chunk in month_chunks(run_start, run_end):
+                chunk_frame = _slice(frame, *chunk)
+                if self.raw_cache.write(source, symbol, chunk, chunk_frame):
+                    self._count(source, 'cache_writes')
+            parts.append(frame)
+
+        return _slice(_concat(parts), start_date, end_date).reset_index(drop=True)
+
+    def _call(self, source: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """调用数据源，耗时按数据源和结果计入直方图"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            frame = self._call_with_retries(source, start_date, end_date)
+            outcome = 'success'
+            return frame
+        finally:
+            UPSTREAM_FETCH_DURATION.observe(time.perf_counter() - started, source=source, outcome=outcome)
+
+    def _call_with_retries(self, source: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """限速 + 重试地调用数据源"""
+        config = self.sources[source]
+        bucket = self._buckets[source]
+        self._count(source, 'upstream_calls')
+
+        for attempt in range(config.max_retries + 1):
+            waited = bucket.acquire()
+            if waited:
+                self._count(source, 'throttle_wait_seconds', waited)
+            self._count(source, 'attempts')
+            try:
+                return config.loader(start_date, end_date)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if rate_limited:
+                    self._count(source, 'rate_limited')
+                if not (rate_limited or is_transient_error(e)) or attempt == config.max_retries:
+                    self._count(source, 'failures')
+                    if rate_limited and not isinstance(e, UpstreamRateLimitError):
+                        raise UpstreamRateLimitError(source, e) from e
+                    raise
+
+                delay = backoff_delay(attempt, config.backoff_base, config.backoff_max, self._rng)
+                self._count(source, 'retries')
+                self._count(source, 'backoff_wait_seconds', delay)
+                self._sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各数据源的调用统计"""
+        with self._lock:
+            return {
+                name: {**stats, 'in_flight': len(self._inflight[name])}
+                for name, stats in self._stats.items()
+            }
+
+
+def load_domestic(start_date: date, end_date: date) -> pd.DataFrame:
+    """从 AKShare 获取国内黄金行情"""
+    df = ak.spot_gold历史数据(start_date=start_date.strftime('%Y%m%d'), end_date=end_date.strftime('%Y%m%d'))
+    return normalize_ohlcv_frame(df, 'domestic', AKSHARE_COLUMN_MAP)
+
+
+def load_international(start_date: date, end_date: date) -> pd.DataFrame:
+    """从 yfinance 获取黄金 ETF(GLD) 行情（yfinance 的 end 为开区间）"""
+    hist = yf.Ticker("GLD").history(
+        start=start_date.strftime('%Y-%m-%d'),
+        end=(end_date + timedelta(days=1)).strftime('%Y-%m-%d')
+    )
+    return normalize_ohlcv_frame(hist, 'international', YFINANCE_COLUMN_MAP)
+
+
+def _source(name: str, symbol: str, loader: Loader) -> UpstreamSource:
+    """按 Settings 创建数据源配置"""
+    rate, burst = settings.upstream_rate_limit(name)
+    return UpstreamSource(
+        name=name,
+        symbol=symbol,
+        loader=loader,
+        rate=rate,
+        burst=burst,
+        max_retries=settings.UPSTREAM_MAX_RETRIES,
+        backoff_base=settings.UPSTREAM_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.UPSTREAM_BACKOFF_MAX_SECONDS,
+    )
+
+
+def create_raw_cache() -> Optional[RawFrameCache]:
+    """按 Settings 创建本地行情缓存（未启用时返回 None）"""
+    if not settings.RAW_CACHE_ENABLED:
+        return None
+    return RawFrameCache(
+        settings.RAW_CACHE_DIR,
+        fmt=settings.RAW_CACHE_FORMAT,
+        current_ttl=settings.RAW_CACHE_CURRENT_TTL_SECONDS,
+        close_grace_days=settings.RAW_CACHE_CLOSE_GRACE_DAYS
+    )
+
+
+# 进程内共享的上游客户端
+upstream_client = UpstreamClient({
+    'domestic': _source('domestic', 'spot_gold', load_domestic),
+    'international': _source('international', 'GLD', load_international),
+}, raw_cache=create_raw_cache())
@@ -1,10 +1,70 @@
 """
 用户业务逻辑服务
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def users_query(after_id: Optional[int], limit: int, skip: int = 0):
+    """
+    keyset 分页查询：ID 大于 after_id 的前 limit 个用户（走主键索引）
+    :param skip: 旧版 offset 分页的跳过条数（只在没有游标时使用）
+    """
+    query = select(User).order_by(User.id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def decode_user_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    解析用户列表的分页游标
+    :raises InvalidCursorError: 游标无效
+    """
+    if not cursor:
+        return None
+    after_id = decode_cursor(cursor).get('id')
+    if not isinstance(after_id, int):
+        raise InvalidCursorError(f"无效的分页游标: {cursor}")
+    return after_id
+
+
+def _split_page(users: List[User], limit: int) -> Tuple[List[User], Optional[str]]:
+    """多取的一条用于判断是否还有下一页"""
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, encode_cursor({'id': users[-1].id})
+
+
+def hash_password(password: str) -> str:
+    """密码加密（同步、异步服务共用）"""
+    # TODO: 实现密码加密
+    return password
+
+
+def build_user(user: UserCreate) -> User:
+    """根据创建请求构造用户对象"""
+    return User(
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        hashed_password=hash_password(user.password),
+        is_active=user.is_active
+    )
+
+
+def apply_user_update(db_user: User, user: UserUpdate):
+    """把更新请求中显式设置的字段写入用户对象"""
+    for field, value in user.model_dump(exclude_unset=True).items():
+        setattr(db_user, field, value)
 
 
 class UserService:
@@ -21,22 +81,21 @@ class UserService:
         return db.query(User).filter(User.username == username).first()
 
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-        """获取用户列表"""
-        return db.query(User).offset(skip).limit(limit).all()
+    def get_users(db: Session, skip: int = 0, limit: int = 100,
+                  cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        """
+        获取用户列表（按 ID keyset 分页）
+        :param skip: 旧版 offset 分页的跳过条数，提供 cursor 时忽略
+        :param cursor: 上一页返回的游标，为空时从第一页（或第 skip 条）开始
+        :return: (用户列表, 下一页游标；已是最后一页时为 None)
+        """
+        users = db.execute(users_query(decode_user_cursor(cursor), limit + 1, skip)).scalars().all()
+        return _split_page(users, limit)
 
     @staticmethod
     def create_user(db: Session, user: UserCreate) -> User:
         """创建用户"""
-        # TODO: 实现密码加密
-        hashed_password = user.password
-        db_user = User(
-            username=user.username,
-            email=user.email,
-            full_name=user.full_name,
-            hashed_password=hashed_password,
-            is_active=user.is_active
-        )
+        db_user = build_user(user)
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
@@ -47,9 +106,7 @@ class UserService:
         """更新用户"""
         db_user = db.query(User).filter(User.id == user_id).first()
         if db_user:
-            update_data = user.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_user, field, value)
+            apply_user_update(db_user, user)
             db.commit()
             db.refresh(db_user)
         return db_user
@@ -65,4 +122,61 @@ class UserService:
         return False
 
 
+class AsyncUserService:
+    """用户服务（异步会话）"""
+
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+        """根据 ID 获取用户"""
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """根据用户名获取用户"""
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100,
+                        cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        """
+        获取用户列表（按 ID keyset 分页）
+        :param skip: 旧版 offset 分页的跳过条数，提供 cursor 时忽略
+        :param cursor: 上一页返回的游标，为空时从第一页（或第 skip 条）开始
+        :return: (用户列表, 下一页游标；已是最后一页时为 None)
+        """
+        result = await db.execute(users_query(decode_user_cursor(cursor), limit + 1, skip))
+        return _split_page(result.scalars().all(), limit)
+
+    @staticmethod
+    async def create_user(db: AsyncSession, user: UserCreate) -> User:
+        """创建用户"""
+        db_user = build_user(user)
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+    @staticmethod
+    async def update_user(db: AsyncSession, user_id: int, user: UserUpdate) -> Optional[User]:
+        """更新用户"""
+        db_user = await db.get(User, user_id)
+        if db_user:
+            apply_user_update(db_user, user)
+            await db.commit()
+            await db.refresh(db_user)
+        return db_user
+
+    @staticmethod
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
+        """删除用户"""
+        db_user = await db.get(User, user_id)
+        if db_user:
+            await db.delete(db_user)
+            await db.commit()
+            return True
+        return False
+
+
 user_service = UserService()
+async_user_service = AsyncUserService()
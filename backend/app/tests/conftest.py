@@ -0,0 +1,119 @@
+"""
+pytest 公共配置
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.database import Base, create_async_db_engine, create_db_engine, to_async_url
+from app.models import gold_price  # noqa
+from app.models import user  # noqa
+from app.models import ingestion  # noqa
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """每个测试使用空的响应缓存和快照缓存（计数清零）"""
+    from app.core.cache import response_cache
+    from app.services.comparison_service import aligned_cache
+    from app.services.price_stream_service import price_hub
+    from app.services.snapshot_service import snapshot_cache
+    response_cache.clear()
+    snapshot_cache.clear()
+    aligned_cache.clear()
+    price_hub.reset()
+    for counter in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+        setattr(response_cache, counter, 0)
+    yield
+    response_cache.clear()
+    snapshot_cache.clear()
+    aligned_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_raw_cache(tmp_path, monkeypatch):
+    """上游行情文件缓存写到每个测试的临时目录"""
+    from app.services.raw_cache import RawFrameCache
+    from app.services.upstream_client import upstream_client
+    monkeypatch.setattr(upstream_client, 'raw_cache', RawFrameCache(str(tmp_path / 'raw_cache')))
+
+
+@pytest.fixture(autouse=True)
+def no_read_refresh(monkeypatch):
+    """默认不在读路径后台补数（避免测试中访问上游和产生后台写入），需要的测试自行开启"""
+    from app.core.config import settings
+    from app.services.refresh_service import read_refresher
+    monkeypatch.setattr(settings, 'READ_REFRESH_ENABLED', False)
+    read_refresher.reset()
+    yield
+    read_refresher.reset()
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """每个测试一个干净的 SQLite 文件库（同步和异步引擎连接同一个文件）"""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def db_engine(db_url):
+    """同步引擎"""
+    engine = create_db_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_engine, db_url):
+    """绑定测试库的异步会话工厂（NullPool：连接不跨事件循环复用）"""
+    engine = create_async_db_engine(to_async_url(db_url), poolclass=NullPool)
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """数据库会话"""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    """绑定测试引擎的会话工厂"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+@pytest.fixture
+def client(session_factory, async_session_factory):
+    """使用测试数据库的 API 客户端"""
+    from fastapi.testclient import TestClient
+    from app.api.dependencies.deps import get_async_db, get_async_session_factory, get_db, get_session_factory
+    from app.main import app
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_async_session_factory] = lambda: async_session_factory
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
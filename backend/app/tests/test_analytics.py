@@ -0,0 +1,111 @@
+"""
+价格统计指标测试
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.gold_price_service import GoldPriceService
+from app.utils.analytics import TRADING_DAYS_PER_YEAR, compute_analytics
+
+
+def _random_walk(count, seed=7):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+
+
+def _reference_rsi(close: pd.Series, period: int) -> pd.Series:
+    delta = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    avg_loss = (-delta).clip(lower=0).ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def test_compute_analytics_matches_pandas_reference():
+    """向量化结果与 pandas rolling 逐项计算一致，offset 之前的点只用于预热"""
+    close = _random_walk(400)
+    offset = 100
+    result = compute_analytics(close, windows=(5, 60), volatility_window=20, rsi_period=14, offset=offset)
+
+    series = pd.Series(close)
+    log_returns = np.log(series).diff()
+    np.testing.assert_allclose(result['returns'], series.pct_change()[offset:], rtol=1e-12)
+    np.testing.assert_allclose(result['log_returns'], log_returns[offset:], rtol=1e-12)
+    for window in (5, 60):
+        np.testing.assert_allclose(result['moving_averages'][window],
+                                   series.rolling(window).mean()[offset:], rtol=1e-9)
+    expected_volatility = log_returns.rolling(20).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+    np.testing.assert_allclose(result['volatility'], expected_volatility[offset:], rtol=1e-6)
+    np.testing.assert_allclose(result['rsi'], _reference_rsi(series, 14)[offset:], rtol=1e-9)
+
+    in_range = series[offset:].reset_index(drop=True)
+    expected_drawdown = in_range / in_range.cummax() - 1
+    np.testing.assert_allclose(result['drawdown'], expected_drawdown, rtol=1e-12)
+
+    summary = result['summary']
+    assert summary['total_return'] == in_range.iloc[-1] / in_range.iloc[0] - 1
+    assert summary['max_drawdown'] == expected_drawdown.min()
+    assert summary['max_drawdown_trough'] == int(expected_drawdown.idxmin())
+    assert summary['max_drawdown_peak'] == int(in_range[:summary['max_drawdown_trough'] + 1].idxmax())
+
+
+def test_compute_analytics_short_and_monotonic_series():
+    """数据不足一个窗口时滚动指标为 NaN；只涨不跌时 RSI 为 100、回撤为 0"""
+    close = np.arange(1.0, 21.0)
+    result = compute_analytics(close, windows=(30,), volatility_window=20, rsi_period=14)
+
+    assert np.isnan(result['moving_averages'][30]).all()
+    assert np.isnan(result['volatility']).all()
+    assert result['rsi'][-1] == 100.0
+    assert (result['drawdown'] == 0).all()
+    assert result['summary']['max_drawdown'] == 0.0
+    assert result['summary']['latest_rsi'] == 100.0
+
+
+def test_analytics_endpoint_is_cached_and_invalidated_on_write(client, session_factory):
+    """接口返回请求区间的指标，预热数据不出现在结果中；新数据写入后缓存失效"""
+    start = datetime(2024, 1, 1)
+    close = _random_walk(200, seed=3)
+    db = session_factory()
+    try:
+        GoldPriceService(db).bulk_save_gold_price_data([
+            {'market_type': 'domestic', 'date': start + timedelta(days=i), 'close_price': float(value)}
+            for i, value in enumerate(close)
+        ])
+    finally:
+        db.close()
+
+    params = {'start_date': '2024-03-01', 'end_date': '2024-06-30', 'windows': '20,5'}
+    first = client.get("/api/v1/gold/analytics/domestic", params=params)
+    assert first.status_code == 200
+    assert first.headers['x-cache'] == 'MISS'
+    body = first.json()
+
+    offset = (datetime(2024, 3, 1) - start).days
+    count = (datetime(2024, 6, 30) - datetime(2024, 3, 1)).days + 1
+    assert body['windows'] == [5, 20]
+    assert body['total_count'] == count
+    assert body['dates'][0] == '2024-03-01'
+    # 区间内第一个点已经有完整的窗口（来自预热数据）
+    assert body['moving_averages']['20'][0] == pytest.approx(np.mean(close[offset - 19:offset + 1]))
+    assert body['returns'][0] == pytest.approx(close[offset] / close[offset - 1] - 1)
+    assert body['summary']['total_return'] == pytest.approx(close[offset + count - 1] / close[offset] - 1)
+
+    assert client.get("/api/v1/gold/analytics/domestic", params=params).headers['x-cache'] == 'HIT'
+
+    db = session_factory()
+    try:
+        GoldPriceService(db).bulk_save_gold_price_data([
+            {'market_type': 'domestic', 'date': datetime(2024, 6, 30), 'close_price': 1.0}
+        ], update_existing=True)
+    finally:
+        db.close()
+    refreshed = client.get("/api/v1/gold/analytics/domestic", params=params)
+    assert refreshed.headers['x-cache'] == 'MISS'
+    assert refreshed.json()['close'][-1] == 1.0
+
+    assert client.get("/api/v1/gold/analytics/domestic", params={'windows': '1,5'}).status_code == 400
+    assert client.get("/api/v1/gold/analytics/domestic", params={'windows': 'a'}).status_code == 400
+    assert client.get("/api/v1/gold/analytics/international", params=params).status_code == 404
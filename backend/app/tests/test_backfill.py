@@ -0,0 +1,188 @@
+"""
+历史数据回填测试
+"""
+import asyncio
+import threading
+from datetime import date
+
+import httpx
+
+import pandas as pd
+import pytest
+
+from app.models.gold_price import GoldPrice
+from app.models.ingestion import BackfillChunk, BackfillJob
+from app.services.backfill_service import BackfillInProgressError, BackfillService, plan_chunks
+from app.services.coverage_service import CoverageService
+from app.services.gold_price_service import GoldPriceService
+from app.services.ingestion_scheduler import acquire_lock
+from app.services.upstream_client import upstream_client
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    """替换数据源：区间内每个工作日一根日线，记录每次请求的区间"""
+    calls = []
+    failing = set()
+    lock = threading.Lock()
+
+    def fetch_upstream_frame(self, market_type, start_date, end_date):
+        with lock:
+            calls.append((start_date, end_date))
+            if start_date in failing:
+                failing.discard(start_date)
+                raise ConnectionError("upstream down")
+        dates = pd.bdate_range(start_date, end_date)
+        return pd.DataFrame({
+            'market_type': market_type,
+            'date': dates,
+            'open_price': 400.0,
+            'high_price': 401.0,
+            'low_price': 399.0,
+            'close_price': 400.5,
+            'volume': 1000.0,
+        })
+
+    monkeypatch.setattr(GoldPriceService, 'fetch_upstream_frame', fetch_upstream_frame)
+    return calls, failing
+
+
+def test_plan_chunks():
+    """按天数切分，最后一块截断到结束日期"""
+    assert plan_chunks(date(2024, 1, 1), date(2024, 1, 10), 4) == [
+        (date(2024, 1, 1), date(2024, 1, 4)),
+        (date(2024, 1, 5), date(2024, 1, 8)),
+        (date(2024, 1, 9), date(2024, 1, 10)),
+    ]
+    assert plan_chunks(date(2024, 1, 1), date(2024, 1, 1), 30) == [(date(2024, 1, 1), date(2024, 1, 1))]
+
+
+def test_backfill_checkpoints_and_resumes(session_factory, fake_fetch):
+    """失败的分块记录检查点，续跑时只处理未完成的分块"""
+    calls, failing = fake_fetch
+    failing.add(date(2023, 2, 1))
+    service = BackfillService(session_factory, parallelism=3)
+    job = service.create_job('domestic', date(2023, 1, 1), date(2023, 4, 30), chunk_days=31)
+
+    progress = []
+    result = service.run(job.id, progress=progress.append)
+    assert result['status'] == 'partial'
+    assert result['chunks_total'] == 4
+    assert result['chunks_done'] == 3
+    assert result['chunks_failed'] == 1
+    assert len(progress) == 4
+    assert progress[-1]['rows_per_second'] >= 0
+
+    # 相同参数再次创建时复用未完成的任务
+    resumed = service.create_job('domestic', date(2023, 1, 1), date(2023, 4, 30), chunk_days=31)
+    assert resumed.id == job.id
+
+    calls.clear()
+    result = service.run(job.id)
+    assert calls == [(date(2023, 2, 1), date(2023, 3, 3))]
+    assert result['status'] == 'success'
+    assert result['chunks_done'] == 4
+    assert result['rows_fetched'] == len(pd.bdate_range('2023-01-01', '2023-04-30'))
+
+    db = session_factory()
+    try:
+        assert db.query(GoldPrice).count() == result['rows_fetched']
+        assert db.query(BackfillChunk).filter(BackfillChunk.status == 'success').count() == 4
+        failed_once = db.query(BackfillChunk).filter(BackfillChunk.chunk_start == date(2023, 2, 1)).one()
+        assert failed_once.attempts == 2
+    finally:
+        db.close()
+
+
+def test_backfill_upstream_failure_marks_chunk_failed(session_factory, monkeypatch):
+    """数据源失败时分块记为失败，不写入模拟数据，也不记为覆盖"""
+    def fetch(source, start_date, end_date):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(upstream_client, 'fetch', fetch)
+    service = BackfillService(session_factory)
+    job = service.create_job('domestic', date(2023, 1, 1), date(2023, 1, 31), chunk_days=31)
+
+    result = service.run(job.id)
+    assert result['status'] == 'failed'
+
+    db = session_factory()
+    try:
+        chunk = db.query(BackfillChunk).filter(BackfillChunk.job_id == job.id).one()
+        assert chunk.status == 'failed'
+        assert 'upstream down' in chunk.error
+        assert db.query(GoldPrice).count() == 0
+        assert CoverageService(db, 'domestic').get_intervals() == []
+    finally:
+        db.close()
+
+
+def test_backfill_refuses_concurrent_run(session_factory, fake_fetch):
+    """任务锁被其他进程持有时拒绝执行"""
+    service = BackfillService(session_factory, worker_id='worker-a')
+    job = service.create_job('international', date(2023, 1, 1), date(2023, 1, 31))
+
+    db = session_factory()
+    try:
+        assert acquire_lock(db, f"backfill:{job.id}", 'worker-b', ttl_seconds=60)
+    finally:
+        db.close()
+    with pytest.raises(BackfillInProgressError):
+        service.run(job.id)
+
+
+def test_backfill_api(client, fake_fetch):
+    """创建任务后在后台执行，可查询进度"""
+    response = client.post("/api/v1/gold/jobs/backfill", json={
+        'market_type': 'domestic', 'start_date': '2023-01-01', 'end_date': '2023-01-31', 'chunk_days': 10
+    })
+    assert response.status_code == 202
+    job = response.json()
+    assert job['chunks_total'] == 4
+
+    assert client.get("/api/v1/gold/jobs/backfill/999").status_code == 404
+    assert client.get("/api/v1/gold/jobs/backfill").json()['total_count'] == 1
+
+    bad = client.post("/api/v1/gold/jobs/backfill", json={
+        'market_type': 'domestic', 'start_date': '2023-02-01', 'end_date': '2023-01-01'
+    })
+    assert bad.status_code == 400
+
+
+def test_backfill_api_rejects_duplicate_run_in_same_worker(client, fake_fetch, monkeypatch, session_factory):
+    """同一 worker 内对同一任务的并发请求只安排一次执行，进度不会重复计数"""
+    from app.api.router import ingestion as ingestion_router
+    from app.main import app
+
+    release = threading.Event()
+    fetch = GoldPriceService.fetch_upstream_frame
+
+    def blocked_fetch(self, market_type, start_date, end_date):
+        release.wait(5)
+        return fetch(self, market_type, start_date, end_date)
+
+    monkeypatch.setattr(GoldPriceService, 'fetch_upstream_frame', blocked_fetch)
+    monkeypatch.setattr(ingestion_router, '_running_backfills', {})
+    # 两个请求续跑同一个已创建的任务
+    BackfillService(session_factory).create_job('domestic', date(2023, 1, 1), date(2023, 1, 31), chunk_days=10)
+    body = {'market_type': 'domestic', 'start_date': '2023-01-01', 'end_date': '2023-01-31', 'chunk_days': 10}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            responses = await asyncio.gather(*[api.post("/api/v1/gold/jobs/backfill", json=body) for _ in range(2)])
+        release.set()
+        await asyncio.gather(*ingestion_router._backfill_tasks)
+        return sorted(response.status_code for response in responses)
+
+    assert asyncio.run(run()) == [202, 409]
+    assert not ingestion_router._running_backfills
+
+    db = session_factory()
+    try:
+        job = db.query(BackfillJob).one()
+        assert job.status == 'success'
+        assert job.chunks_done == job.chunks_total == 4
+        assert job.rows_fetched == len(pd.bdate_range('2023-01-01', '2023-01-31'))
+    finally:
+        db.close()
@@ -0,0 +1,49 @@
+"""
+进程内缓存测试
+"""
+from app.core.cache import TTLCache
+
+
+def test_lru_eviction_and_ttl():
+    """超出容量淘汰最久未使用的条目，过期条目视为未命中"""
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+    now[0] = 11
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_invalidate_by_tag():
+    """按标签失效"""
+    cache = TTLCache()
+    cache.set(('data', 'domestic'), 1, tags=['domestic'])
+    cache.set(('comparison',), 2, tags=['domestic', 'international'])
+    cache.set(('data', 'international'), 3, tags=['international'])
+
+    assert cache.invalidate('domestic') == 2
+    assert cache.get(('data', 'international')) == 3
+    assert len(cache) == 1
+
+
+def test_set_skipped_after_invalidation_during_build():
+    """生成期间标签被失效时不写入旧值，其他标签不受影响"""
+    cache = TTLCache()
+    generations = cache.generations(['domestic'])
+    cache.invalidate('domestic')
+    assert cache.set('stale', 1, tags=['domestic'], generations=generations) is False
+    assert cache.get('stale') is None
+
+    generations = cache.generations(['domestic', 'international'])
+    cache.invalidate('other')
+    assert cache.set('fresh', 2, tags=['domestic', 'international'], generations=generations) is True
+    assert cache.get('fresh') == 2
@@ -0,0 +1,116 @@
+"""
+国内 / 国际市场对齐对比测试
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.comparison_service import AlignedCloseCache
+from app.services.gold_price_service import GoldPriceService
+from app.utils.comparison import align_closes, compute_comparison
+
+
+def _frame(domestic, international):
+    index = pd.date_range('2024-01-01', periods=len(domestic), freq='D')
+    return pd.DataFrame({'domestic': domestic, 'international': international}, index=index, dtype='float64')
+
+
+def test_align_closes_fill_policies():
+    """inner 只保留共同日期，ffill 沿用前值（最多 max_gap 个日期），outer 保留空值"""
+    nan = np.nan
+    frame = _frame([1, 2, nan, nan, nan, 6], [nan, 20, 30, 40, 50, 60])
+
+    assert align_closes(frame, 'inner')['domestic'].tolist() == [2, 6]
+    filled = align_closes(frame, 'ffill', max_gap=2)
+    assert filled['domestic'].tolist() == [2, 2, 2, 6]
+    assert filled['international'].tolist() == [20, 30, 40, 60]
+    assert len(align_closes(frame, 'outer')) == 6
+    with pytest.raises(ValueError):
+        align_closes(frame, 'bfill')
+
+
+def test_compute_comparison_matches_pandas():
+    """价差、比值和对数收益率滚动相关系数与逐项计算一致"""
+    rng = np.random.default_rng(1)
+    domestic = 450 * np.exp(np.cumsum(rng.normal(0, 0.01, 100)))
+    international = 180 * np.exp(np.cumsum(rng.normal(0, 0.01, 100)))
+    frame = _frame(domestic, international)
+
+    result = compute_comparison(frame, correlation_window=10)
+    np.testing.assert_allclose(result['spread'], domestic - international)
+    np.testing.assert_allclose(result['ratio'], domestic / international)
+    expected = np.log(frame).diff()
+    expected = expected['domestic'].rolling(10).corr(expected['international'])
+    np.testing.assert_allclose(result['correlation'], expected, rtol=1e-9)
+
+
+def _seed(session_factory, market_type, start, days, close, skip=()):
+    db = session_factory()
+    try:
+        GoldPriceService(db).bulk_save_gold_price_data([
+            {'market_type': market_type, 'date': start + timedelta(days=i), 'close_price': close + i}
+            for i in range(days) if i not in skip
+        ], update_existing=True)
+    finally:
+        db.close()
+
+
+def test_aligned_comparison_updates_incrementally(client, session_factory):
+    """对齐结果跨日历填充；新数据写入后只增量重读变更区间"""
+    start = datetime(2024, 1, 1)
+    # 国内 1 月 25 日至 27 日休市
+    _seed(session_factory, 'domestic', start, 60, 500.0, skip=(24, 25, 26))
+    _seed(session_factory, 'international', start, 60, 200.0)
+
+    params = {'start_date': '2024-01-20', 'end_date': '2024-02-29', 'correlation_window': 5}
+    body = client.get("/api/v1/gold/comparison/aligned", params=params).json()
+    assert body['dates'][0] == '2024-01-20'
+    assert body['total_count'] == 41
+    holiday = body['dates'].index('2024-01-26')
+    assert body['domestic'][holiday] == 523.0
+    assert body['spread'][holiday] == 523.0 - 225.0
+    assert body['ratio'][0] == pytest.approx(519.0 / 219.0)
+    # 预热数据使第一个点已有完整的相关系数窗口
+    assert body['correlation'][0] is not None
+
+    inner = client.get("/api/v1/gold/comparison/aligned", params={**params, 'fill': 'inner'}).json()
+    assert '2024-01-26' not in inner['dates'] and inner['total_count'] == 38
+    assert client.get("/api/v1/gold/comparison/aligned", params={**params, 'fill': 'bfill'}).status_code == 400
+
+    # 新的一根国内日线：只重读这一天
+    _seed(session_factory, 'domestic', datetime(2024, 1, 26), 1, 999.0)
+    updated = client.get("/api/v1/gold/comparison/aligned", params=params).json()
+    assert updated['domestic'][holiday] == 999.0
+    assert updated['domestic'][holiday + 1] == 999.0
+
+    stats = client.get("/api/v1/gold/cache/stats").json()['comparison']
+    assert stats['full_loads'] == 1
+    assert stats['incremental_reads'] == 1
+
+
+def test_concurrent_disjoint_ranges_do_not_mark_gap_loaded(session_factory, async_session_factory):
+    """并发的不相交请求各自登记读过的区间，中间的空档之后仍会从数据库补读"""
+    start = datetime(2024, 1, 1)
+    _seed(session_factory, 'domestic', start, 60, 500.0)
+    _seed(session_factory, 'international', start, 60, 200.0)
+    cache = AlignedCloseCache()
+
+    async def get(range_start, range_end):
+        async with async_session_factory() as db:
+            return await cache.get(db, range_start, range_end)
+
+    async def run():
+        first, second = await asyncio.gather(get(datetime(2024, 1, 1), datetime(2024, 1, 10)),
+                                             get(datetime(2024, 2, 1), datetime(2024, 2, 10)))
+        assert len(first) == len(second) == 10
+        assert cache.stats()['loaded_ranges'] == 2
+        return await get(datetime(2024, 1, 11), datetime(2024, 1, 31))
+
+    gap = asyncio.run(run())
+    assert len(gap) == 21
+    assert gap['domestic'].iloc[0] == 510.0
+    assert gap['international'].notna().all()
+    assert cache.stats()['loaded_ranges'] == 1
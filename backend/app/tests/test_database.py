@@ -0,0 +1,45 @@
+"""
+数据库引擎配置测试
+"""
+from sqlalchemy import text
+
+from app.db.database import create_db_engine
+from app.db.pool_metrics import instrument_engine
+
+
+def test_sqlite_connections_use_wal(db_engine):
+    """新建的 SQLite 连接启用 WAL 和 synchronous=NORMAL"""
+    with db_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        # NORMAL = 1
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+
+
+def test_pool_metrics_track_checkouts(tmp_path):
+    """连接池指标记录签出次数、活跃连接和等待时间"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=0)
+    metrics = instrument_engine(engine, 'test')
+    try:
+        first = engine.connect()
+        second = engine.connect()
+        stats = metrics.stats(engine.pool)
+        assert stats['active'] == 2
+        assert stats['checked_out'] == 2
+        first.close()
+        second.close()
+
+        stats = metrics.stats(engine.pool)
+        assert stats['checkouts'] == 2
+        assert stats['active'] == 0
+        assert stats['peak_active'] == 2
+        assert stats['connects'] == 2
+        assert stats['wait_max_ms'] > 0
+    finally:
+        engine.dispose()
+
+
+def test_pool_stats_endpoint(client):
+    """连接池指标接口返回同步和异步引擎"""
+    body = client.get("/api/v1/system/db/pool").json()
+    assert set(body['pools']) >= {'sync', 'async'}
+    assert 'wait_p95_ms' in body['pools']['sync']
@@ -0,0 +1,51 @@
+"""
+价格序列降采样测试
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.downsampling import downsample, lttb_indices, resample_ohlcv
+
+
+def _frame(days):
+    dates = pd.date_range('2024-01-01', periods=days)  # 2024-01-01 为周一
+    values = np.arange(days, dtype='float64')
+    return pd.DataFrame({
+        'market_type': 'domestic',
+        'date': dates,
+        'open_price': values,
+        'high_price': values + 1,
+        'low_price': values - 1,
+        'close_price': values + 0.5,
+        'volume': np.ones(days),
+    })
+
+
+def test_resample_weekly_ohlcv():
+    """按周聚合：开盘取首个、收盘取最后一个、极值和成交量按周计算"""
+    weekly = resample_ohlcv(_frame(10), 'week')
+
+    assert weekly['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-01', '2024-01-08']
+    assert weekly['open_price'].tolist() == [0.0, 7.0]
+    assert weekly['close_price'].tolist() == [6.5, 9.5]
+    assert weekly['high_price'].tolist() == [7.0, 10.0]
+    assert weekly['low_price'].tolist() == [-1.0, 6.0]
+    assert weekly['volume'].tolist() == [7.0, 3.0]
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """LTTB 保留首尾点和明显的峰值"""
+    y = np.zeros(1000)
+    y[500] = 100.0
+    indices = lttb_indices(np.arange(1000.0), y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 500 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_downsample_bounds_points():
+    """结果点数不超过 max_points"""
+    assert len(downsample(_frame(3650), interval='week', max_points=200)) == 200
+    assert len(downsample(_frame(100), max_points=500)) == 100
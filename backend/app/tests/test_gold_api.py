@@ -0,0 +1,224 @@
+"""
+黄金价格接口测试
+"""
+import time
+
+from app.core.config import settings
+from app.services.gold_price_service import GoldPriceService
+
+SYNC_BODY = {"start_date": "2024-01-01T00:00:00", "end_date": "2024-01-31T00:00:00"}
+
+
+def test_sync_runs_markets_concurrently(client, monkeypatch):
+    """国内和国际同步并发执行，总耗时约为单个市场的耗时"""
+    def slow_sync(self, market_type, start_date, end_date, fallback=True):
+        time.sleep(0.3)
+        return {'status': 'success', 'message': market_type, 'data_count': 0, 'synced': True}
+
+    monkeypatch.setattr(GoldPriceService, 'sync_gold_price_data', slow_sync)
+
+    started = time.perf_counter()
+    response = client.post("/api/v1/gold/sync", json=SYNC_BODY)
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['status'] == 'success'
+    assert body['domestic']['message'] == 'domestic'
+    assert body['international']['message'] == 'international'
+    assert elapsed < 0.55
+
+
+def test_sync_reports_per_source_timeout(client, monkeypatch):
+    """单个数据源超时不影响另一个市场的结果"""
+    def sync(self, market_type, start_date, end_date, fallback=True):
+        if market_type == 'international':
+            time.sleep(0.5)
+        return {'status': 'success', 'message': market_type, 'data_count': 0, 'synced': True}
+
+    monkeypatch.setattr(GoldPriceService, 'sync_gold_price_data', sync)
+    monkeypatch.setattr(settings, 'INTERNATIONAL_SYNC_TIMEOUT', 0.1)
+
+    body = client.post("/api/v1/gold/sync", json=SYNC_BODY).json()
+
+    assert body['status'] == 'partial'
+    assert body['domestic']['status'] == 'success'
+    assert body['international']['status'] == 'timeout'
+
+
+def test_sync_reports_upstream_error_without_storing_mock(client, monkeypatch):
+    """数据源失败时同步返回 error，不写入模拟数据"""
+    def fail(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(GoldPriceService, 'fetch_upstream_frame', fail)
+
+    body = client.post("/api/v1/gold/sync", json=SYNC_BODY).json()
+
+    assert body['status'] == 'partial'
+    assert body['domestic']['status'] == 'error'
+    assert body['international']['status'] == 'error'
+    assert client.get("/api/v1/gold/data/domestic?start_date=2024-01-01&end_date=2024-01-31").json()['data'] == []
+
+
+def _seed(session_factory, market_type, days, close=100.0):
+    """写入最近 days 天的数据"""
+    from datetime import datetime, timedelta
+
+    db = session_factory()
+    try:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        GoldPriceService(db).bulk_save_gold_price_data([
+            {'market_type': market_type, 'date': today - timedelta(days=i), 'close_price': close}
+            for i in range(1, days + 1)
+        ], update_existing=True)
+    finally:
+        db.close()
+
+
+def test_data_endpoint_is_cached_and_invalidated_on_write(client, session_factory):
+    """相同参数命中缓存，写入新数据后该市场缓存失效"""
+    _seed(session_factory, 'domestic', 5)
+
+    first = client.get("/api/v1/gold/data/domestic")
+    second = client.get("/api/v1/gold/data/domestic")
+    assert first.headers['x-cache'] == 'MISS'
+    assert second.headers['x-cache'] == 'HIT'
+    assert second.json()['total_count'] == 5
+
+    _seed(session_factory, 'domestic', 5, close=120.0)
+    third = client.get("/api/v1/gold/data/domestic")
+    assert third.headers['x-cache'] == 'MISS'
+    assert third.json()['data'][0]['close_price'] == 120.0
+
+    stats = client.get("/api/v1/gold/cache/stats").json()['cache']
+    assert stats['hits'] == 1
+    assert stats['invalidations'] == 1
+
+
+def test_unchanged_response_returns_304(client, session_factory):
+    """If-None-Match 与 ETag 一致时返回 304"""
+    _seed(session_factory, 'international', 3)
+
+    response = client.get("/api/v1/gold/summary/international")
+    etag = response.headers['etag']
+
+    not_modified = client.get("/api/v1/gold/summary/international", headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+
+
+def test_data_endpoint_columnar_and_binary(client, session_factory):
+    """列式 JSON 和二进制格式返回相同的数据"""
+    from app.utils.series_codec import COLUMNAR_MEDIA_TYPE, decode_binary
+
+    _seed(session_factory, 'domestic', 4)
+
+    columnar = client.get("/api/v1/gold/data/domestic", headers={'Accept': COLUMNAR_MEDIA_TYPE}).json()
+    assert columnar['total_count'] == 4
+    assert columnar['close'] == [100.0] * 4
+    assert columnar['open'] == [None] * 4
+    assert len(columnar['dates'][0]) == len('2024-01-01')
+
+    binary = client.get("/api/v1/gold/data/domestic", params={'format': 'binary'})
+    assert binary.headers['content-type'] == 'application/octet-stream'
+    series = decode_binary(binary.content)['domestic']
+    assert series['close'].tolist() == columnar['close']
+    assert [str(day) for day in series['dates']] == columnar['dates']
+
+    assert client.get("/api/v1/gold/data/domestic", params={'format': 'xml'}).status_code == 400
+
+
+def test_data_endpoint_downsamples(client, session_factory):
+    """指定 max_points 时以列式返回降采样后的序列"""
+    _seed(session_factory, 'domestic', 25)
+
+    body = client.get("/api/v1/gold/data/domestic", params={'max_points': 10}).json()
+    # 30 天区间按周汇总即可满足 10 个点
+    assert body['interval'] == 'week'
+    assert body['total_count'] <= 10
+    assert body['source_count'] == 25
+
+    body = client.get("/api/v1/gold/data/domestic", params={'max_points': 10, 'interval': 'day'}).json()
+    assert body['total_count'] == 10
+    assert len(body['close']) == 10
+
+    assert client.get("/api/v1/gold/data/domestic", params={'interval': 'hour'}).status_code == 400
+
+
+def test_summary_uses_snapshot_across_gaps(client, session_factory):
+    """最近几天没有数据（长假）时仍返回最新快照"""
+    from datetime import datetime
+
+    db = session_factory()
+    GoldPriceService(db).bulk_save_gold_price_data([
+        {'market_type': 'domestic', 'date': datetime(2024, 1, 2), 'close_price': 100.0, 'volume': 5.0},
+        {'market_type': 'domestic', 'date': datetime(2024, 1, 3), 'close_price': 110.0, 'volume': 7.0},
+    ])
+    db.close()
+
+    summary = client.get("/api/v1/gold/summary/domestic").json()
+    assert summary['latest_price'] == 110.0
+    assert summary['previous_price'] == 100.0
+    assert summary['change'] == 10.0
+    assert summary['volume'] == 7.0
+
+    latest = client.get("/api/v1/gold/latest").json()['data']
+    assert latest['domestic']['price'] == 110.0
+    assert 'international' not in latest
+    assert client.get("/api/v1/gold/summary/international").status_code == 404
+
+
+def test_export_streams_ndjson_and_csv(client, session_factory, monkeypatch):
+    """导出接口分批流式输出 NDJSON / CSV，gzip 传输时客户端解压后内容一致"""
+    import json
+
+    from app.services import export_service
+
+    monkeypatch.setattr(export_service, 'EXPORT_BATCH_SIZE', 4)
+    _seed(session_factory, 'domestic', 10)
+
+    response = client.get("/api/v1/gold/export/domestic")
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 10
+    assert lines[0]['close_price'] == 100.0
+    assert lines[0]['open_price'] is None
+    assert [line['date'] for line in lines] == sorted(line['date'] for line in lines)
+
+    csv_response = client.get("/api/v1/gold/export/domestic", params={'format': 'csv', 'gzip': 'true'})
+    assert csv_response.headers['content-encoding'] == 'gzip'
+    rows = csv_response.text.splitlines()
+    assert rows[0] == 'market_type,date,open_price,high_price,low_price,close_price,volume'
+    assert len(rows) == 11
+    assert rows[1].endswith(',,,,100.0,')
+
+    empty = client.get("/api/v1/gold/export/international", params={'format': 'csv'})
+    assert empty.text.splitlines() == [rows[0]]
+    assert client.get("/api/v1/gold/export/domestic", params={'format': 'xml'}).status_code == 400
+
+
+def test_data_endpoint_keyset_pagination(client, session_factory):
+    """按日期 keyset 翻页：各页不重叠、合起来等于完整区间，游标不能跨市场使用"""
+    _seed(session_factory, 'domestic', 25)
+
+    full = client.get("/api/v1/gold/data/domestic").json()
+    dates = []
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 10, "format": "columnar", **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/gold/data/domestic", params=params).json()
+        dates.extend(page['dates'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(dates) == full['total_count'] == 25
+    assert dates == sorted(set(dates))
+
+    first = client.get("/api/v1/gold/data/domestic", params={"limit": 10}).json()
+    assert len(first['data']) == 10
+    assert first['next_cursor']
+    assert client.get("/api/v1/gold/data/international",
+                      params={"cursor": first['next_cursor']}).status_code == 400
+    assert client.get("/api/v1/gold/data/domestic", params={"limit": 10, "interval": "week"}).status_code == 400
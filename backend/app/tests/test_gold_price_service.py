@@ -0,0 +1,118 @@
+"""
+黄金价格服务测试
+"""
+from datetime import date, datetime, timedelta
+
+from app.models.gold_price import GoldPrice
+from app.services.coverage_service import CoverageService
+from app.services.gold_price_service import SOURCE_MOCK, SOURCE_UPSTREAM, GoldPriceService
+from app.utils.ohlcv import records_to_frame
+
+
+def _bars(market_type, start, days, close=100.0):
+    return [
+        {
+            'market_type': market_type,
+            'date': start + timedelta(days=i),
+            'open_price': close,
+            'high_price': close + 1,
+            'low_price': close - 1,
+            'close_price': close,
+            'volume': 1000.0,
+        }
+        for i in range(days)
+    ]
+
+
+def test_bulk_save_counts_inserted_and_skipped(db_session):
+    """重复写入时已存在的记录被跳过"""
+    service = GoldPriceService(db_session)
+    start = datetime(2024, 1, 1)
+
+    first = service.bulk_save_gold_price_data(_bars('domestic', start, 10))
+    assert first == {'inserted': 10, 'updated': 0, 'skipped': 0}
+
+    second = service.bulk_save_gold_price_data(_bars('domestic', start, 15))
+    assert second == {'inserted': 5, 'updated': 0, 'skipped': 10}
+    assert db_session.query(GoldPrice).count() == 15
+
+
+def test_bulk_save_updates_changed_prices(db_session):
+    """update_existing 时只更新 OHLC 有变化的记录"""
+    service = GoldPriceService(db_session)
+    start = datetime(2024, 1, 1)
+    service.bulk_save_gold_price_data(_bars('international', start, 5))
+
+    changed = _bars('international', start, 2, close=120.0) + _bars('international', start + timedelta(days=2), 3)
+    result = service.bulk_save_gold_price_data(changed, update_existing=True)
+
+    assert result == {'inserted': 0, 'updated': 2, 'skipped': 3}
+    closes = [row.close_price for row in service.get_data_from_db('international', start, start + timedelta(days=4))]
+    assert closes == [120.0, 120.0, 100.0, 100.0, 100.0]
+
+
+def test_save_normalizes_timezone_aware_dates(db_session):
+    """带时区的日期与已存储的日期视为同一天"""
+    import pandas as pd
+
+    service = GoldPriceService(db_session)
+    bars = _bars('international', datetime(2024, 1, 2), 1)
+    assert service.save_gold_price_data(bars) == 1
+
+    bars[0]['date'] = pd.Timestamp('2024-01-02', tz='America/New_York')
+    assert service.save_gold_price_data(bars) == 0
+
+
+def test_coverage_index_finds_trading_day_gaps(db_session):
+    """覆盖区间按交易日历计算，周末不算缺口"""
+    service = GoldPriceService(db_session)
+    # 2024-01-01 为周一；写入第一周和第三周的工作日
+    weeks = [d for d in _bars('international', datetime(2024, 1, 1), 21) if d['date'].weekday() < 5]
+    service.bulk_save_gold_price_data(weeks[:5] + weeks[10:])
+
+    coverage = CoverageService(db_session, 'international')
+    assert coverage.get_intervals() == [(date(2024, 1, 1), date(2024, 1, 5)), (date(2024, 1, 15), date(2024, 1, 19))]
+    assert coverage.missing_ranges(datetime(2024, 1, 1), datetime(2024, 1, 21)) == [(date(2024, 1, 8), date(2024, 1, 12))]
+
+
+def test_sync_fetches_only_missing_ranges(db_session, monkeypatch):
+    """同步只请求缺失的子区间，空结果的区间也记为已覆盖"""
+    service = GoldPriceService(db_session)
+    service.bulk_save_gold_price_data(_bars('domestic', datetime(2024, 1, 1), 5))
+
+    requested = []
+
+    def fake_fetch(market_type, start, end):
+        requested.append((start, end))
+        return records_to_frame([]), SOURCE_UPSTREAM
+
+    monkeypatch.setattr(service, 'fetch_gold_frame', fake_fetch)
+
+    result = service.sync_gold_price_data('domestic', datetime(2024, 1, 1), datetime(2024, 1, 12))
+    assert result['synced'] is True
+    assert requested == [(date(2024, 1, 8), date(2024, 1, 12))]
+
+    result = service.sync_gold_price_data('domestic', datetime(2024, 1, 1), datetime(2024, 1, 12))
+    assert result['synced'] is False
+    assert result['data_count'] == 5
+    assert len(requested) == 1
+
+
+def test_sync_does_not_store_fallback_frames(db_session, monkeypatch):
+    """数据源不可用时回退数据不写库、不记为覆盖，下次同步重新请求"""
+    service = GoldPriceService(db_session)
+    sources = [SOURCE_MOCK, SOURCE_UPSTREAM]
+
+    def fake_fetch(market_type, start, end):
+        return records_to_frame(_bars('domestic', datetime(2024, 1, 1), 5)), sources.pop(0)
+
+    monkeypatch.setattr(service, 'fetch_gold_frame', fake_fetch)
+
+    result = service.sync_gold_price_data('domestic', datetime(2024, 1, 1), datetime(2024, 1, 5))
+    assert result['status'] == 'partial'
+    assert result['data_count'] == 0
+    assert result['fallback_ranges'] == [{'start_date': '2024-01-01', 'end_date': '2024-01-05'}]
+
+    result = service.sync_gold_price_data('domestic', datetime(2024, 1, 1), datetime(2024, 1, 5))
+    assert result['status'] == 'success'
+    assert result['data_count'] == 5
@@ -0,0 +1,132 @@
+"""
+定时采集任务测试
+"""
+import asyncio
+
+from app.models.ingestion import IngestionLock, IngestionRun
+from app.services import ingestion_scheduler as scheduler_module
+from app.services.ingestion_scheduler import (
+    JOB_NAME,
+    IngestionScheduler,
+    acquire_lock,
+    release_lock,
+    renew_lock,
+)
+
+
+def test_lock_allows_single_owner(db_session):
+    """锁被持有期间其他 worker 无法获取，释放后可以获取"""
+    assert acquire_lock(db_session, JOB_NAME, 'worker-a', ttl_seconds=60)
+    assert not acquire_lock(db_session, JOB_NAME, 'worker-b', ttl_seconds=60)
+    # 锁不可重入，持有者只能续期
+    assert not acquire_lock(db_session, JOB_NAME, 'worker-a', ttl_seconds=60)
+    assert renew_lock(db_session, JOB_NAME, 'worker-a', ttl_seconds=60)
+    assert not renew_lock(db_session, JOB_NAME, 'worker-b', ttl_seconds=60)
+
+    release_lock(db_session, JOB_NAME, 'worker-a')
+    assert acquire_lock(db_session, JOB_NAME, 'worker-b', ttl_seconds=60)
+
+
+def test_expired_lock_can_be_taken_over(db_session):
+    """持有者异常退出后，过期的锁可以被接管"""
+    assert acquire_lock(db_session, JOB_NAME, 'worker-a', ttl_seconds=-1)
+    assert acquire_lock(db_session, JOB_NAME, 'worker-b', ttl_seconds=60)
+
+
+def test_run_once_records_history(session_factory, monkeypatch):
+    """执行一次采集并记录耗时和新增记录数；锁被占用时跳过"""
+    async def fake_sync_market(market_type, start_date, end_date, session_factory):
+        return {'status': 'success', 'saved_count': 3, 'synced': True}
+
+    monkeypatch.setattr(scheduler_module, 'sync_market', fake_sync_market)
+    scheduler = IngestionScheduler(session_factory=session_factory, worker_id='worker-a')
+
+    run = asyncio.run(scheduler.run_once())
+    assert run['status'] == 'success'
+    assert run['rows_ingested'] == 6
+    assert run['duration_seconds'] >= 0
+
+    db = session_factory()
+    try:
+        assert acquire_lock(db, JOB_NAME, 'worker-b', ttl_seconds=60)
+        assert asyncio.run(scheduler.run_once()) is None
+        assert db.query(IngestionRun).count() == 1
+    finally:
+        db.close()
+
+
+def test_run_once_does_not_overlap_in_process(session_factory, monkeypatch):
+    """同一进程内手动触发与定时采集重叠时只执行一次，先结束的一方不会释放另一方持有的锁"""
+    async def slow_sync_market(market_type, start_date, end_date, session_factory):
+        await asyncio.sleep(0.05)
+        return {'status': 'success', 'saved_count': 1, 'synced': True}
+
+    monkeypatch.setattr(scheduler_module, 'sync_market', slow_sync_market)
+    scheduler = IngestionScheduler(session_factory=session_factory, worker_id='worker-a')
+
+    async def run_both():
+        return await asyncio.gather(scheduler.run_once(), scheduler.run_once())
+
+    first, second = asyncio.run(run_both())
+    assert first['status'] == 'success'
+    assert second is None
+    assert not scheduler.running
+
+    db = session_factory()
+    try:
+        assert db.query(IngestionRun).count() == 1
+        # 执行结束后锁已释放
+        assert acquire_lock(db, JOB_NAME, 'worker-b', ttl_seconds=60)
+    finally:
+        db.close()
+
+
+def test_run_aborts_when_lock_renewal_fails(session_factory, monkeypatch):
+    """锁在两个市场之间被其他 worker 接管时中止采集，不再同步剩余市场"""
+    synced = []
+
+    async def fake_sync_market(market_type, start_date, end_date, session_factory):
+        synced.append(market_type)
+        # 模拟本次同步超过锁的有效期，锁被 worker-b 接管
+        db = session_factory()
+        try:
+            db.query(IngestionLock).update({'owner': 'worker-b'})
+            db.commit()
+        finally:
+            db.close()
+        return {'status': 'success', 'saved_count': 2, 'synced': True}
+
+    monkeypatch.setattr(scheduler_module, 'sync_market', fake_sync_market)
+    scheduler = IngestionScheduler(session_factory=session_factory, worker_id='worker-a')
+
+    run = asyncio.run(scheduler.run_once())
+    assert synced == ['domestic']
+    assert run['status'] == 'partial'
+    assert run['details']['international']['status'] == 'aborted'
+    assert '中止' in run['message']
+
+    db = session_factory()
+    try:
+        # 不会释放其他 worker 持有的锁
+        assert db.query(IngestionLock).one().owner == 'worker-b'
+    finally:
+        db.close()
+
+
+def test_job_status_endpoint(client, session_factory):
+    """状态接口返回最近一次运行信息"""
+    from datetime import datetime
+
+    db = session_factory()
+    db.add(IngestionRun(job_name=JOB_NAME, status='success', started_at=datetime(2024, 1, 1),
+                        finished_at=datetime(2024, 1, 1, 0, 0, 5), duration_seconds=5.0, rows_ingested=12))
+    db.commit()
+    db.close()
+
+    body = client.get("/api/v1/gold/jobs/status").json()
+    assert body['last_run']['rows_ingested'] == 12
+    assert body['last_run']['duration_seconds'] == 5.0
+    assert body['last_success']['status'] == 'success'
+
+    runs = client.get("/api/v1/gold/jobs/runs").json()
+    assert runs['total_count'] == 1
@@ -0,0 +1,74 @@
+"""
+请求计时、Server-Timing 和 /metrics 测试
+"""
+import dataclasses
+from datetime import datetime
+
+from app.core.metrics import render_metrics, reset_metrics
+from app.services.coverage_service import CoverageService
+from app.services.gold_price_service import GoldPriceService
+from app.services.upstream_client import upstream_client
+from app.utils.mock_data import generate_mock_frame
+
+
+def _server_timing(response) -> dict:
+    """解析 Server-Timing 头：{名称: {'dur': 毫秒, 'desc': 描述}}"""
+    metrics = {}
+    for item in response.headers['server-timing'].split(', '):
+        name, *params = item.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        metrics[name] = {'dur': float(values['dur']) if 'dur' in values else None,
+                         'desc': values.get('desc', '').strip('"')}
+    return metrics
+
+
+def test_server_timing_and_metrics_for_data_endpoint(client, db_session):
+    """缓存未命中时报告 SQL 语句数、读取行数和构建/序列化耗时，命中时没有 SQL；请求汇总到 /metrics"""
+    reset_metrics()
+    GoldPriceService(db_session).bulk_save_gold_price_data(
+        generate_mock_frame('domestic', datetime(2024, 1, 1), datetime(2024, 1, 31), seed=1)
+    )
+    # 预先建好覆盖区间，请求中只需一次覆盖查询（判断新鲜度）和一次数据查询
+    CoverageService(db_session, 'domestic').get_intervals()
+    url = "/api/v1/gold/data/domestic?start_date=2024-01-01&end_date=2024-01-31"
+
+    first = _server_timing(client.get(url))
+    assert first['sql']['desc'] == '2 queries'
+    assert first['rows']['desc'] == '23'
+    assert {'total', 'build', 'serialize'} <= set(first)
+    assert first['total']['dur'] >= first['build']['dur']
+
+    second = _server_timing(client.get(url))
+    assert second['sql']['desc'] == '0 queries'
+    assert 'build' not in second
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/api/v1/gold/data/{market_type}",status="200"'
+    assert f'http_request_duration_seconds_count{{{labels}}} 2' in text
+    assert 'http_request_sql_statements_bucket{route="/api/v1/gold/data/{market_type}",le="2"} 2' in text
+    assert 'http_request_rows_sum{route="/api/v1/gold/data/{market_type}"} 23' in text
+
+    # 未匹配的路径不单独产生时间序列
+    client.get("/no/such/path")
+    assert 'route="unmatched",status="404"' in client.get("/metrics").text
+
+
+def test_upstream_time_is_reported_per_source(client, monkeypatch):
+    """同步时上游耗时按数据源写入 Server-Timing，并按调用结果计入直方图"""
+    reset_metrics()
+    for name in ('domestic', 'international'):
+        monkeypatch.setitem(upstream_client.sources, name, dataclasses.replace(
+            upstream_client.sources[name],
+            loader=lambda start, end, name=name: generate_mock_frame(name, start, end, seed=2)
+        ))
+
+    response = client.post("/api/v1/gold/sync", json={"start_date": "2024-01-01", "end_date": "2024-01-31"})
+    assert response.status_code == 200
+    timing = _server_timing(response)
+    assert timing['upstream-domestic']['dur'] >= 0
+    assert timing['upstream-international']['dur'] >= 0
+    assert int(timing['sql']['desc'].split()[0]) > 0
+
+    text = render_metrics()
+    assert 'upstream_fetch_duration_seconds_count{source="domestic",outcome="success"} 1' in text
+    assert 'upstream_fetch_duration_seconds_count{source="international",outcome="success"} 1' in text
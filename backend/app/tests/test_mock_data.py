@@ -0,0 +1,83 @@
+"""
+模拟数据生成与批量写入测试
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.gold_price import GoldPrice, GoldPriceRollup
+from app.services import gold_price_service
+from app.services.coverage_service import CoverageService
+from app.services.gold_price_service import GoldPriceService
+from app.utils.mock_data import MockPriceGenerator, generate_mock_frame
+
+
+def test_mock_frame_is_seeded_and_follows_calendar():
+    """相同种子结果相同、不同市场互不相同；只在交易日生成，OHLC 关系成立"""
+    first = generate_mock_frame('domestic', date(2024, 1, 1), date(2024, 12, 31), seed=7)
+    second = generate_mock_frame('domestic', date(2024, 1, 1), date(2024, 12, 31), seed=7)
+    other = generate_mock_frame('international', date(2024, 1, 1), date(2024, 12, 31), seed=7)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert not np.allclose(first['close_price'], other['close_price'])
+    assert len(first) == 262
+    assert (first['date'].dt.dayofweek < 5).all()
+    assert (first['low_price'] <= first[['open_price', 'close_price']].min(axis=1)).all()
+    assert (first['high_price'] >= first[['open_price', 'close_price']].max(axis=1)).all()
+
+
+def test_long_mock_path_stays_bounded():
+    """数百万根日线的价格路径均值回复，不会漂移到 0 或溢出"""
+    generator = MockPriceGenerator('international', seed=1)
+    closes = np.concatenate([frame['close_price'].to_numpy()
+                             for frame in generator.iter_frames(date(1800, 1, 1), 1_000_000, chunk_size=250_000)])
+    assert len(closes) == 1_000_000
+    assert closes.min() > 1800.0 / 100 and closes.max() < 1800.0 * 100
+
+
+def test_bulk_load_updates_derived_tables_once(db_session, monkeypatch):
+    """分块写入后一次性更新汇总、快照和覆盖区间，写入监听器每个市场只通知一次"""
+    notified = []
+    monkeypatch.setattr(gold_price_service, '_write_listeners', [lambda *args: notified.append(args)])
+
+    generator = MockPriceGenerator('domestic', seed=3)
+    frames = list(generator.iter_frames(date(2020, 1, 1), 1200, chunk_size=500))
+    result = GoldPriceService(db_session).bulk_load(iter(frames), mark_covered=True)
+
+    last = frames[-1].iloc[-1]
+    assert result == {'rows': 1200}
+    assert db_session.execute(select(func.count()).select_from(GoldPrice)).scalar() == 1200
+    assert db_session.execute(
+        select(func.count()).select_from(GoldPriceRollup).where(GoldPriceRollup.period == 'year')
+    ).scalar() == 5
+    assert GoldPriceService(db_session).get_data_from_db('domestic', datetime(2020, 1, 1), datetime(2030, 1, 1))[-1] \
+        .close_price == last['close_price']
+    assert CoverageService(db_session, 'domestic').missing_ranges(
+        datetime(2020, 1, 1), last['date'].to_pydatetime()) == []
+    assert [args[0] for args in notified] == ['domestic']
+
+    # 再次写入相同日期：默认保留已有记录，replace 时覆盖
+    changed = frames[0].assign(close_price=1.0)
+    GoldPriceService(db_session).bulk_load([changed])
+    assert db_session.execute(select(func.min(GoldPrice.close_price))).scalar() > 1.0
+    GoldPriceService(db_session).bulk_load([changed], replace=True)
+    assert db_session.execute(select(func.min(GoldPrice.close_price))).scalar() == 1.0
+
+
+def test_fallback_uses_seeded_mock_data(db_session, monkeypatch):
+    """数据源不可用时返回按交易日历生成的模拟数据，设置种子后结果可复现"""
+    def fail(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(gold_price_service.upstream_client, 'fetch', fail)
+    monkeypatch.setattr(settings, 'MOCK_DATA_SEED', 11)
+
+    service = GoldPriceService(db_session)
+    first = service.get_domestic_gold_frame('20240101', '20240131')
+    second = service.get_domestic_gold_frame('20240101', '20240131')
+    pd.testing.assert_frame_equal(first, second)
+    assert len(first) == 23
+    assert (first['date'].dt.dayofweek < 5).all()
@@ -0,0 +1,51 @@
+"""
+OHLCV 规范化测试
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import (
+    AKSHARE_COLUMN_MAP,
+    CANONICAL_COLUMNS,
+    YFINANCE_COLUMN_MAP,
+    frame_to_records,
+    normalize_ohlcv_frame,
+)
+
+
+def test_normalize_yfinance_frame():
+    """时区日期归一为零点，列名映射为标准列"""
+    index = pd.date_range('2024-01-02', periods=3, tz='America/New_York')
+    raw = pd.DataFrame({
+        'Open': [1.0, np.nan, 3.0],
+        'High': [2.0, 3.0, 4.0],
+        'Low': [0.5, 1.5, 2.5],
+        'Close': [1.5, 2.5, np.nan],
+        'Volume': [10, 20, 30],
+        'Dividends': [0, 0, 0],
+    }, index=index)
+
+    frame = normalize_ohlcv_frame(raw, 'international', YFINANCE_COLUMN_MAP)
+
+    assert list(frame.columns) == CANONICAL_COLUMNS
+    assert frame['date'].dt.tz is None
+    assert list(frame['date'].dt.strftime('%Y-%m-%d')) == ['2024-01-02', '2024-01-03', '2024-01-04']
+    # 收盘价缺失按 0 处理，与原逐行实现一致
+    assert frame['close_price'].tolist() == [1.5, 2.5, 0.0]
+
+
+def test_frame_to_records_masks_nan():
+    """NaN 转为 None，缺失的列补空"""
+    raw = pd.DataFrame({'收盘': [450.0], '开盘': [np.nan]}, index=pd.to_datetime(['2024-01-02']))
+
+    records = frame_to_records(normalize_ohlcv_frame(raw, 'domestic', AKSHARE_COLUMN_MAP))
+
+    assert records == [{
+        'market_type': 'domestic',
+        'date': pd.Timestamp('2024-01-02').to_pydatetime(),
+        'open_price': None,
+        'high_price': None,
+        'low_price': None,
+        'close_price': 450.0,
+        'volume': None,
+    }]
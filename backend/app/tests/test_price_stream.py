@@ -0,0 +1,92 @@
+"""
+实时价格推送测试
+"""
+import asyncio
+from datetime import datetime
+
+from app.services.gold_price_service import GoldPriceService
+from app.services.price_stream_service import PriceStreamHub, format_sse, price_hub
+
+
+def test_slow_subscriber_drops_oldest_messages():
+    """慢客户端的队列满时丢弃最旧的消息，不影响其他订阅者"""
+    async def run():
+        hub = PriceStreamHub(queue_size=2)
+        fast = hub.subscribe(session_factory=None)
+        slow = hub.subscribe(session_factory=None)
+
+        received = []
+        for price in (1.0, 2.0, 3.0):
+            hub.publish({'market_type': 'domestic', 'price': price})
+            received.append((await fast.get())['price'])
+
+        backlog = [(await slow.get())['price'] for _ in range(slow.queue.qsize())]
+        return received, backlog, slow.dropped, hub.stats()
+
+    received, backlog, dropped, stats = asyncio.run(run())
+    assert received == [1.0, 2.0, 3.0]
+    assert backlog == [2.0, 3.0]
+    assert dropped == 1
+    assert stats == {'subscribers': 2, 'published': 3, 'reads': 0, 'dropped': 1}
+
+    event = format_sse({'price': 1.5}, event_id=7).decode('utf-8')
+    assert event == 'event: price\nid: 7\ndata: {"price":1.5}\n\n'
+
+
+def test_write_is_read_once_and_fanned_out(session_factory, async_session_factory):
+    """其他线程写入新数据后，中心只读取一次快照并推送给所有订阅者"""
+    def write(close):
+        db = session_factory()
+        try:
+            GoldPriceService(db).bulk_save_gold_price_data([
+                {'market_type': 'domestic', 'date': datetime(2024, 1, 2), 'close_price': 100.0},
+                {'market_type': 'domestic', 'date': datetime(2024, 1, 3), 'close_price': close, 'volume': 3.0},
+            ], update_existing=True)
+        finally:
+            db.close()
+
+    async def run():
+        subscriptions = [price_hub.subscribe(async_session_factory) for _ in range(5)]
+        assert await price_hub.current() == []
+
+        reads_before = price_hub.reads
+        await asyncio.to_thread(write, 110.0)
+        messages = [await asyncio.wait_for(s.get(), timeout=5) for s in subscriptions]
+        reads = price_hub.reads - reads_before
+        initial = await price_hub.current()
+        return messages, reads, initial
+
+    messages, reads, initial = asyncio.run(run())
+    assert reads == 1
+    assert all(message == messages[0] for message in messages)
+    assert messages[0]['market_type'] == 'domestic'
+    assert messages[0]['date'] == '2024-01-03'
+    assert messages[0]['price'] == 110.0
+    assert messages[0]['change'] == 10.0
+    assert messages[0]['volume'] == 3.0
+    # 新连接的初始状态直接使用已推送的消息
+    assert [message['price'] for message in initial] == [110.0]
+
+
+def test_latest_message_expires_without_local_notify(session_factory, async_session_factory):
+    """其他 worker 写入的数据不会通知本进程的中心，缓存的最新消息过期后重新读取"""
+    def write(close):
+        db = session_factory()
+        try:
+            GoldPriceService(db).bulk_save_gold_price_data([
+                {'market_type': 'international', 'date': datetime(2024, 1, 3), 'close_price': close},
+            ], update_existing=True)
+        finally:
+            db.close()
+
+    async def run(hub):
+        hub.subscribe(async_session_factory)
+        await asyncio.to_thread(write, 100.0)
+        first = await hub.current()
+        # 写入监听器只通知进程内共享的 price_hub，这里的中心相当于另一个 worker
+        await asyncio.to_thread(write, 120.0)
+        return first, await hub.current()
+
+    first, second = asyncio.run(run(PriceStreamHub(latest_ttl=0)))
+    assert [message['price'] for message in first] == [100.0]
+    assert [message['price'] for message in second] == [120.0]
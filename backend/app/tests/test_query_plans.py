@@ -0,0 +1,185 @@
+"""
+查询计划回归测试（SQLite）
+
+执行各服务方法，记录实际发出的 SELECT 语句，再用 EXPLAIN QUERY PLAN 检查：
+不允许出现无索引的全表扫描（SCAN 表）或额外排序（USE TEMP B-TREE）。
+另外检查 Alembic 迁移后的表结构与模型一致。
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import event
+
+from app.db.database import Base, create_db_engine
+from app.services.coverage_service import CoverageService
+from app.services.gold_price_service import AsyncGoldPriceService, GoldPriceService
+from app.services.rollup_service import RollupService
+from app.services.snapshot_service import SnapshotService
+from app.services.user import UserService
+from app.utils.cursor import encode_cursor
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+START = datetime(2020, 1, 1)
+END = datetime(2020, 12, 31)
+
+
+@contextmanager
+def capture_selects(engine):
+    """记录引擎执行的 SELECT 语句及参数"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(engine, statement, parameters):
+    """EXPLAIN QUERY PLAN 的 detail 列"""
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()]
+
+
+def plan_problems(detail):
+    """全表扫描（SCAN 表 且未使用任何索引）或临时排序；只有标量子查询、没有 FROM 的外层查询为 SCAN CONSTANT ROW"""
+    return (detail.startswith('SCAN ') and ' USING ' not in detail and detail != 'SCAN CONSTANT ROW') \
+        or 'USE TEMP B-TREE' in detail
+
+
+def _seed(session_factory, days=1000):
+    db = session_factory()
+    try:
+        GoldPriceService(db).bulk_save_gold_price_data([
+            {'market_type': market, 'date': START - timedelta(days=200) + timedelta(days=i),
+             'open_price': 100.0, 'high_price': 101.0, 'low_price': 99.0, 'close_price': 100.5, 'volume': 10.0}
+            for market in ('domestic', 'international') for i in range(days)
+        ])
+    finally:
+        db.close()
+
+
+def test_service_queries_use_indexes(db_engine, session_factory, async_session_factory):
+    """服务层读取路径的每条查询都走索引、不做额外排序"""
+    _seed(session_factory)
+
+    with capture_selects(db_engine) as statements:
+        db = session_factory()
+        try:
+            service = GoldPriceService(db)
+            service.get_data_from_db('domestic', START, END)
+            service.get_frame_from_db('domestic', START, END)
+            service.count_data_in_db('domestic', START, END)
+            RollupService(db).get_frame('domestic', 'month', START, END)
+            SnapshotService(db).refresh('domestic')
+            CoverageService(db, 'domestic').get_intervals()
+            # 第一页按 rowid 顺序读取前 limit 行（SCAN 但有 LIMIT），这里检查翻页后的查询
+            UserService.get_users(db, limit=10, cursor=encode_cursor({'id': 5}))
+            # 写入前与已有数据比对
+            service.bulk_save_gold_price_data([{'market_type': 'domestic', 'date': START, 'close_price': 1.0}],
+                                              update_existing=True)
+        finally:
+            db.close()
+
+    async def read_async():
+        async with async_session_factory() as session:
+            service = AsyncGoldPriceService(session)
+            await service.get_page('domestic', START, END, 10, after_date=START + timedelta(days=30))
+            await service.get_page('domestic', START, END, 10, columns=True)
+            await service.get_close_series('domestic', START, END)
+
+    with capture_selects(async_session_factory.kw['bind'].sync_engine) as async_statements:
+        asyncio.run(read_async())
+
+    assert len(statements) >= 8 and len(async_statements) == 3
+    problems = {}
+    for statement, parameters in statements + async_statements:
+        details = explain(db_engine, statement, parameters)
+        bad = [detail for detail in details if plan_problems(detail)]
+        if bad:
+            problems[statement] = bad
+    assert not problems, problems
+
+
+def test_close_series_reads_are_index_only(db_engine, session_factory, async_session_factory):
+    """读取 (日期, 收盘价) 序列只扫描收盘价覆盖索引，不回表"""
+    _seed(session_factory, days=50)
+
+    async def read_close():
+        async with async_session_factory() as session:
+            await AsyncGoldPriceService(session).get_close_series('domestic', START, END)
+
+    with capture_selects(async_session_factory.kw['bind'].sync_engine) as statements:
+        asyncio.run(read_close())
+
+    (statement, parameters), = statements
+    details = explain(db_engine, statement, parameters)
+    assert details == [
+        'SEARCH gold_prices USING COVERING INDEX ix_gold_prices_market_date_close (market_type=? AND date>? AND date<?)'
+    ]
+
+
+def test_rollup_completeness_query_uses_indexes(db_engine, session_factory, async_session_factory):
+    """汇总完整性检查的两个子查询分别走汇总表唯一索引和价格表索引，只计数不回表"""
+    _seed(session_factory)
+
+    async def check():
+        async with async_session_factory() as session:
+            return await AsyncGoldPriceService(session).rollup_is_complete('domestic', 'month', START, END)
+
+    with capture_selects(async_session_factory.kw['bind'].sync_engine) as statements:
+        assert asyncio.run(check())
+
+    (statement, parameters), = statements
+    details = explain(db_engine, statement, parameters)
+    assert not [detail for detail in details if plan_problems(detail)], details
+    assert any(detail.startswith('SEARCH gold_price_rollups USING INDEX') for detail in details), details
+    assert any(detail.startswith('SEARCH gold_prices USING COVERING INDEX') for detail in details), details
+
+
+def _alembic_config(url: str) -> Config:
+    """指向 url 的 Alembic 配置"""
+    config = Config(str(BACKEND_DIR / 'alembic.ini'))
+    config.set_main_option('script_location', str(BACKEND_DIR / 'alembic'))
+    config.set_main_option('sqlalchemy.url', url)
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def test_migrations_match_models(tmp_path):
+    """alembic upgrade head 后的表结构与模型一致，且可以完整回滚"""
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    config = _alembic_config(url)
+
+    command.upgrade(config, 'head')
+    engine = create_db_engine(url)
+    try:
+        with engine.connect() as conn:
+            assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+        command.downgrade(config, 'base')
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'gold_prices'"
+            ).all() == []
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_from_create_all_database(db_engine, db_url):
+    """由当前模型 create_all 建出的库（已有覆盖索引、没有单列索引）stamp 0001 后可以升级"""
+    config = _alembic_config(db_url)
+    command.stamp(config, '0001')
+    command.upgrade(config, 'head')
+    with db_engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
@@ -0,0 +1,111 @@
+"""
+读路径 stale-while-revalidate 测试
+"""
+import asyncio
+import dataclasses
+import time
+from datetime import date, datetime
+
+from app.core.config import settings
+from app.services.gold_price_service import GoldPriceService
+from app.services.refresh_service import ReadRefresher
+from app.services.upstream_client import upstream_client
+from app.utils.mock_data import generate_mock_frame
+
+URL = "/api/v1/gold/data/domestic?start_date=2024-01-01&end_date=2024-01-31"
+
+
+def test_incomplete_range_returns_stored_data_without_sync(client, monkeypatch):
+    """区间不完整时直接返回已有数据并标明 stale，请求中不同步上游"""
+    def sync(self, market_type, start_date, end_date, fallback=True):
+        raise AssertionError("读请求不应同步上游")
+
+    monkeypatch.setattr(GoldPriceService, 'sync_gold_price_data', sync)
+
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.headers['x-data-freshness'] == 'stale'
+    body = response.json()
+    assert body['freshness'] == 'stale'
+    assert body['data'] == []
+
+    # 缓存命中时同样带新鲜度头
+    cached = client.get(URL)
+    assert cached.headers['x-cache'] == 'HIT'
+    assert cached.headers['x-data-freshness'] == 'stale'
+
+
+def test_wait_returns_refreshed_data(client, monkeypatch):
+    """wait=true 等待后台补数完成，返回补到的完整数据"""
+    monkeypatch.setattr(settings, 'READ_REFRESH_ENABLED', True)
+    monkeypatch.setitem(upstream_client.sources, 'domestic', dataclasses.replace(
+        upstream_client.sources['domestic'],
+        loader=lambda start, end: generate_mock_frame('domestic', start, end, seed=3)
+    ))
+
+    response = client.get(URL + "&wait=true")
+    assert response.status_code == 200
+    assert response.headers['x-data-freshness'] == 'fresh'
+    body = response.json()
+    assert body['freshness'] == 'fresh'
+    assert body['total_count'] == 23
+
+    # 补数后区间已完整，不再触发刷新
+    assert client.get(URL).json()['freshness'] == 'fresh'
+
+
+def test_concurrent_reads_share_one_refresh(session_factory, monkeypatch):
+    """同一区间的并发读取共享一次刷新，冷却时间内不重复刷新"""
+    calls = []
+
+    def sync(self, market_type, start_date, end_date, fallback=True):
+        calls.append((market_type, start_date.date(), end_date.date()))
+        time.sleep(0.1)
+        return {'status': 'success', 'message': 'ok', 'data_count': 0, 'synced': True}
+
+    monkeypatch.setattr(GoldPriceService, 'sync_gold_price_data', sync)
+    refresher = ReadRefresher(cooldown=60)
+    missing = [(date(2024, 1, 2), date(2024, 1, 12)), (date(2024, 1, 15), date(2024, 1, 31))]
+
+    async def run():
+        first = refresher.ensure('domestic', missing, session_factory)
+        # 进行中刷新覆盖的子区间同样复用
+        second = refresher.ensure('domestic', missing[1:], session_factory)
+        assert first is second
+        results = await asyncio.gather(*[
+            refresher.wait('domestic', missing, session_factory) for _ in range(3)
+        ])
+        assert all(result['status'] == 'success' for result in results)
+        assert refresher.ensure('domestic', missing, session_factory) is None
+
+    asyncio.run(run())
+
+    assert calls == [('domestic', date(2024, 1, 2), date(2024, 1, 31))]
+    stats = refresher.stats()
+    assert (stats['started'], stats['joined'], stats['skipped']) == (1, 4, 1)
+    assert stats['in_flight'] == {'domestic': 0}
+
+
+def test_failed_refresh_is_retried_by_next_read(session_factory, monkeypatch):
+    """上游失败时不写入模拟数据，区间保持 stale，下一次读取不受冷却限制重新刷新"""
+    def fail(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(GoldPriceService, 'fetch_upstream_frame', fail)
+    refresher = ReadRefresher(cooldown=60)
+    missing = [(date(2024, 1, 2), date(2024, 1, 31))]
+
+    async def run():
+        first = await refresher.wait('domestic', missing, session_factory)
+        assert first['status'] == 'error'
+        second = await refresher.wait('domestic', missing, session_factory)
+        assert second['status'] == 'error'
+
+    asyncio.run(run())
+
+    assert (refresher.stats()['started'], refresher.stats()['failed']) == (2, 2)
+    db = session_factory()
+    try:
+        assert GoldPriceService(db).count_data_in_db('domestic', datetime(2024, 1, 1), datetime(2024, 1, 31)) == 0
+    finally:
+        db.close()
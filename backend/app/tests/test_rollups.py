@@ -0,0 +1,72 @@
+"""
+周期汇总测试
+"""
+from datetime import datetime, timedelta
+
+from app.models.gold_price import GoldPriceRollup
+from app.services.gold_price_service import GoldPriceService
+from app.services.rollup_service import RollupService, choose_period
+
+
+def _bars(start, days, close=100.0):
+    return [
+        {'market_type': 'domestic', 'date': start + timedelta(days=i), 'open_price': close,
+         'high_price': close + i, 'low_price': close - i, 'close_price': close + i, 'volume': 1.0}
+        for i in range(days)
+    ]
+
+
+def test_rollups_are_maintained_on_write(db_session):
+    """写入日线后增量更新受影响的周/月/年汇总"""
+    service = GoldPriceService(db_session)
+    service.bulk_save_gold_price_data(_bars(datetime(2024, 1, 1), 60))
+
+    rollups = RollupService(db_session)
+    monthly = rollups.get_frame('domestic', 'month', datetime(2024, 1, 1), datetime(2024, 2, 29))
+    assert monthly['date'].dt.strftime('%Y-%m').tolist() == ['2024-01', '2024-02']
+    assert monthly['close_price'].tolist() == [130.0, 159.0]
+    assert monthly['volume'].tolist() == [31.0, 29.0]
+
+    # 修改二月的一根日线，只影响二月的汇总
+    changed = [dict(_bars(datetime(2024, 2, 29), 1)[0], high_price=500.0)]
+    service.bulk_save_gold_price_data(changed, update_existing=True)
+    monthly = rollups.get_frame('domestic', 'month', datetime(2024, 1, 1), datetime(2024, 2, 29))
+    assert monthly['high_price'].tolist() == [130.0, 500.0]
+
+
+def test_rebuild_matches_incremental(db_session):
+    """重建结果与增量维护一致"""
+    GoldPriceService(db_session).bulk_save_gold_price_data(_bars(datetime(2023, 12, 20), 40))
+    before = db_session.query(GoldPriceRollup).count()
+
+    result = RollupService(db_session).rebuild()
+
+    assert result['domestic'] == {'week': 6, 'month': 2, 'year': 2}
+    assert db_session.query(GoldPriceRollup).count() == before
+
+
+def test_choose_period():
+    """选择点数不超过 max_points 的最细周期"""
+    start = datetime(2014, 1, 1)
+    assert choose_period(start, start + timedelta(days=300), 1000) == 'day'
+    assert choose_period(start, start + timedelta(days=3650), 1000) == 'week'
+    assert choose_period(start, start + timedelta(days=3650), 200) == 'month'
+    assert choose_period(start, start + timedelta(days=3650), 5) == 'year'
+
+
+def test_incomplete_rollups_fall_back_to_daily(client, session_factory):
+    """汇总缺少部分日线（升级前写入的数据）时按日线重采样，不返回截断的序列"""
+    db = session_factory()
+    try:
+        GoldPriceService(db).bulk_save_gold_price_data(_bars(datetime(2024, 1, 1), 60))
+        # 模拟升级前写入的一月日线：没有对应的汇总行
+        db.query(GoldPriceRollup).filter(GoldPriceRollup.period_start < datetime(2024, 2, 1)).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    body = client.get("/api/v1/gold/data/domestic",
+                      params={'start_date': '2024-01-01', 'end_date': '2024-02-29', 'interval': 'month'}).json()
+    assert body['dates'] == ['2024-01-01', '2024-02-01']
+    assert body['close'] == [130.0, 159.0]
+    assert body['source_count'] == 60
@@ -0,0 +1,187 @@
+"""
+上游数据源客户端测试
+"""
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.services.raw_cache import RawFrameCache
+from app.services.upstream_client import TokenBucket, UpstreamClient, UpstreamRateLimitError, UpstreamSource
+from app.utils.ohlcv import records_to_frame
+
+
+def _frame(start, end):
+    """[start, end] 每天一行"""
+    days = (end - start).days + 1
+    return records_to_frame([
+        {'market_type': 'domestic', 'date': pd.Timestamp(start + timedelta(days=i)), 'close_price': 1.0}
+        for i in range(days)
+    ])
+
+
+def _client(loader, max_retries=3, sleeps=None, raw_cache=None):
+    source = UpstreamSource(name='domestic', symbol='TEST', loader=loader, rate=0, burst=1, max_retries=max_retries,
+                            backoff_base=0.5, backoff_max=8.0)
+    sleep = sleeps.append if sleeps is not None else (lambda seconds: None)
+    return UpstreamClient({'domestic': source}, sleep=sleep, seed=1, raw_cache=raw_cache)
+
+
+def test_token_bucket_waits_for_refill():
+    """突发额度用完后按速率等待"""
+    now = [0.0]
+    waits = []
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=waits.append)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.5]
+    assert waits == [0.5]
+    now[0] = 10.0
+    assert bucket.acquire() == 0.0
+
+
+def test_rate_limit_is_retried_with_backoff():
+    """限流错误按指数退避重试，重试耗尽后抛出 UpstreamRateLimitError"""
+    calls = []
+
+    def flaky(start, end):
+        calls.append((start, end))
+        if len(calls) < 3:
+            raise RuntimeError("429 Too Many Requests")
+        return _frame(start, end)
+
+    sleeps = []
+    client = _client(flaky, sleeps=sleeps)
+    frame = client.fetch('domestic', date(2024, 1, 1), date(2024, 1, 3))
+
+    assert len(frame) == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= 8.0 for delay in sleeps)
+    stats = client.stats()['domestic']
+    assert (stats['attempts'], stats['retries'], stats['rate_limited']) == (3, 2, 2)
+
+    def limited(start, end):
+        raise RuntimeError("rate limit exceeded")
+
+    with pytest.raises(UpstreamRateLimitError):
+        _client(limited, max_retries=1).fetch('domestic', date(2024, 1, 1), date(2024, 1, 3))
+
+
+def test_non_transient_errors_are_not_retried():
+    """非限流、非网络错误直接抛出"""
+    calls = []
+
+    def broken(start, end):
+        calls.append(1)
+        raise AttributeError("no such api")
+
+    with pytest.raises(AttributeError):
+        _client(broken).fetch('domestic', date(2024, 1, 1), date(2024, 1, 3))
+    assert len(calls) == 1
+
+
+def test_overlapping_requests_share_one_upstream_call():
+    """并发请求被进行中的区间覆盖时共享结果，部分重叠时只请求未覆盖部分"""
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def slow(start, end):
+        calls.append((start, end))
+        started.set()
+        release.wait(5)
+        return _frame(start, end)
+
+    client = _client(slow)
+    results = {}
+
+    def fetch(name, start, end):
+        results[name] = client.fetch('domestic', start, end)
+
+    first = threading.Thread(target=fetch, args=('first', date(2024, 1, 1), date(2024, 1, 10)))
+    first.start()
+    started.wait(5)
+    others = [
+        threading.Thread(target=fetch, args=('inside', date(2024, 1, 3), date(2024, 1, 5))),
+        threading.Thread(target=fetch, args=('overlap', date(2024, 1, 8), date(2024, 1, 15))),
+    ]
+    for thread in others:
+        thread.start()
+    # 等待两个请求都登记为合并后再放行
+    while sum(client.stats()['domestic'][key] for key in ('coalesced', 'partially_coalesced')) < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert sorted(calls) == [(date(2024, 1, 1), date(2024, 1, 10)), (date(2024, 1, 11), date(2024, 1, 15))]
+    assert len(results['inside']) == 3
+    assert len(results['overlap']) == 8
+    assert results['overlap']['date'].is_monotonic_increasing
+
+
+def test_closed_months_are_served_from_raw_cache(tmp_path):
+    """已结束的月份按整月下载一次后落盘，之后不再请求数据源"""
+    calls = []
+
+    def loader(start, end):
+        calls.append((start, end))
+        return _frame(start, end)
+
+    cache = RawFrameCache(str(tmp_path), today=lambda: date(2024, 6, 1))
+    frame = _client(loader, raw_cache=cache).fetch('domestic', date(2020, 1, 10), date(2020, 3, 5))
+
+    assert calls == [(date(2020, 1, 1), date(2020, 3, 31))]
+    assert len(frame) == 56
+    assert len(list((tmp_path / 'domestic' / 'TEST').iterdir())) == 3
+
+    # 新的客户端（例如另一个进程）直接读取文件，可离线回放
+    replayed = _client(loader, raw_cache=cache).fetch('domestic', date(2020, 2, 1), date(2020, 2, 29))
+    assert len(calls) == 1
+    assert len(replayed) == 29
+
+
+def test_current_month_is_refreshed_after_ttl(tmp_path):
+    """当月文件过期后重新下载，已结束的月份仍读缓存"""
+    calls = []
+    now = [1_000_000.0]
+
+    def loader(start, end):
+        calls.append((start, end))
+        return _frame(start, end)
+
+    cache = RawFrameCache(str(tmp_path), current_ttl=60, today=lambda: date(2024, 3, 15), clock=lambda: now[0])
+    client = _client(loader, raw_cache=cache)
+    client.fetch('domestic', date(2024, 2, 20), date(2024, 3, 15))
+    assert calls == [(date(2024, 2, 1), date(2024, 3, 15))]
+
+    now[0] = cache.path('domestic', 'TEST', date(2024, 3, 1), closed=False).stat().st_mtime + 10
+    client.fetch('domestic', date(2024, 2, 20), date(2024, 3, 15))
+    assert len(calls) == 1
+
+    now[0] += 3600
+    client.fetch('domestic', date(2024, 2, 20), date(2024, 3, 15))
+    assert calls[1:] == [(date(2024, 3, 1), date(2024, 3, 15))]
+    assert client.stats()['domestic']['cache_hits'] == 3
+
+
+def test_month_is_not_closed_within_grace_period(tmp_path):
+    """月末后的宽限期内仍按当月缓存（最后一天可能尚未发布），过了宽限期才永久缓存"""
+    calls = []
+    today = [date(2024, 3, 1)]
+
+    def loader(start, end):
+        calls.append((start, end))
+        return _frame(start, end)
+
+    cache = RawFrameCache(str(tmp_path), current_ttl=0, today=lambda: today[0])
+    client = _client(loader, raw_cache=cache)
+    client.fetch('domestic', date(2024, 2, 1), date(2024, 2, 29))
+    assert not cache.is_closed(date(2024, 2, 29))
+    assert cache.path('domestic', 'TEST', date(2024, 2, 1), closed=False).exists()
+
+    today[0] = date(2024, 3, 2)
+    client.fetch('domestic', date(2024, 2, 1), date(2024, 2, 29))
+    client.fetch('domestic', date(2024, 2, 1), date(2024, 2, 29))
+    assert calls == [(date(2024, 2, 1), date(2024, 2, 29))] * 2
+    assert cache.path('domestic', 'TEST', date(2024, 2, 1), closed=True).exists()
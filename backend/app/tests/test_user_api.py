@@ -0,0 +1,55 @@
+"""
+用户接口测试（异步会话）
+"""
+from app.db.database import to_async_url
+
+USER_BODY = {"username": "alice", "email": "alice@example.com", "password": "secret"}
+
+
+def test_async_url_uses_async_drivers():
+    """同步 URL 推导出对应的异步驱动"""
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert to_async_url("postgresql://u:p@localhost/db") == "postgresql+asyncpg://u:p@localhost/db"
+    assert to_async_url("postgresql+asyncpg://u:p@localhost/db") == "postgresql+asyncpg://u:p@localhost/db"
+
+
+def test_user_crud(client):
+    """创建、读取、更新、删除用户"""
+    created = client.post("/api/v1/users/", json=USER_BODY)
+    assert created.status_code == 200
+    user_id = created.json()['id']
+
+    assert client.post("/api/v1/users/", json=USER_BODY).status_code == 400
+    assert client.get(f"/api/v1/users/{user_id}").json()['username'] == 'alice'
+    assert [user['id'] for user in client.get("/api/v1/users/").json()['users']] == [user_id]
+
+    updated = client.put(f"/api/v1/users/{user_id}", json={"full_name": "Alice"})
+    assert updated.json()['full_name'] == 'Alice'
+
+    assert client.delete(f"/api/v1/users/{user_id}").status_code == 200
+    assert client.get(f"/api/v1/users/{user_id}").status_code == 404
+
+
+def test_users_keyset_pagination(client):
+    """按 ID 翻页，next_cursor 为空表示最后一页"""
+    for i in range(5):
+        client.post("/api/v1/users/", json={**USER_BODY, "username": f"user{i}", "email": f"user{i}@example.com"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/users/", params=params).json()
+        seen.extend(user['username'] for user in page['users'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == [f"user{i}" for i in range(5)]
+
+    assert client.get("/api/v1/users/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    # 旧的 skip 参数仍然有效，之后可以用 next_cursor 继续
+    page = client.get("/api/v1/users/", params={"skip": 3, "limit": 1}).json()
+    assert [user['username'] for user in page['users']] == ["user3"]
+    page = client.get("/api/v1/users/", params={"cursor": page['next_cursor']}).json()
+    assert [user['username'] for user in page['users']] == ["user4"]
@@ -0,0 +1,130 @@
+"""
+价格序列统计指标
+
+对收盘价序列一次性向量化计算：日收益率、对数收益率、移动平均、滚动波动率、回撤和 RSI。
+滚动窗口用累加和相减实现（O(n)，与窗口大小无关），RSI 的 Wilder 平滑用 pandas ewm（C 实现）。
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 年化使用的每年交易日数
+TRADING_DAYS_PER_YEAR = 252
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动均值，前 window - 1 个位置为 NaN"""
+    result = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return result
+    sums = np.cumsum(np.insert(values, 0, 0.0))
+    result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动样本标准差（ddof=1），前 window - 1 个位置为 NaN"""
+    result = np.full(len(values), np.nan)
+    if window < 2 or len(values) < window:
+        return result
+    sums = np.cumsum(np.insert(values, 0, 0.0))
+    squares = np.cumsum(np.insert(values * values, 0, 0.0))
+    window_sum = sums[window:] - sums[:-window]
+    window_squares = squares[window:] - squares[:-window]
+    variance = (window_squares - window_sum * window_sum / window) / (window - 1)
+    # 浮点误差可能产生极小的负数
+    result[window - 1:] = np.sqrt(np.maximum(variance, 0.0))
+    return result
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """相对强弱指数（Wilder 平滑），前 period 个位置为 NaN"""
+    result = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return result
+    delta = np.diff(close)
+    gains = pd.Series(np.maximum(delta, 0.0))
+    losses = pd.Series(np.maximum(-delta, 0.0))
+    alpha = 1.0 / period
+    avg_gain = gains.ewm(alpha=alpha, min_periods=period, adjust=False).mean().to_numpy()
+    avg_loss = losses.ewm(alpha=alpha, min_periods=period, adjust=False).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100.0 - 100.0 / (1.0 + rs)
+    # 区间内没有下跌时 RSI 为 100
+    values = np.where((avg_loss == 0) & (avg_gain > 0), 100.0, values)
+    values = np.where((avg_loss == 0) & (avg_gain == 0), 50.0, values)
+    result[1:] = values
+    return result
+
+
+def drawdown(close: np.ndarray) -> np.ndarray:
+    """相对此前最高收盘价的回撤（<= 0）"""
+    if len(close) == 0:
+        return np.array([], dtype='float64')
+    return close / np.maximum.accumulate(close) - 1.0
+
+
+def compute_analytics(close: np.ndarray, windows: Sequence[int] = (5, 20, 60),
+                      volatility_window: int = 20, rsi_period: int = 14,
+                      offset: int = 0) -> Dict[str, object]:
+    """
+    计算收盘价序列的统计指标
+    :param close: 按日期升序的收盘价（必须为正数）
+    :param windows: 移动平均窗口
+    :param volatility_window: 滚动波动率窗口（对数收益率的年化标准差）
+    :param rsi_period: RSI 周期
+    :param offset: 前 offset 个点只用于预热滚动窗口，不出现在结果中
+    :return: 各指标数组（与 close[offset:] 等长）和汇总值（回撤峰值、谷值为结果区间内的下标）
+    """
+    close = np.asarray(close, dtype='float64')
+    log_close = np.log(close)
+    returns = np.full(len(close), np.nan)
+    log_returns = np.full(len(close), np.nan)
+    if len(close) > 1:
+        returns[1:] = close[1:] / close[:-1] - 1.0
+        log_returns[1:] = np.diff(log_close)
+
+    # 第一个点没有收益率，滚动波动率从第二个点开始计算
+    volatility = np.full(len(close), np.nan)
+    volatility[1:] = rolling_std(log_returns[1:], volatility_window) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    moving_averages = {window: rolling_mean(close, window)[offset:] for window in windows}
+    strength = rsi(close, rsi_period)[offset:]
+
+    # 区间内第一个点的收益率相对预热数据中的前一个收盘价；回撤和汇总值只统计结果区间
+    close = close[offset:]
+    returns = returns[offset:]
+    log_returns = log_returns[offset:]
+    drawdowns = drawdown(close)
+
+    summary: Dict[str, Optional[float]] = {
+        'total_return': None,
+        'annualized_volatility': None,
+        'max_drawdown': None,
+        'max_drawdown_peak': None,
+        'max_drawdown_trough': None,
+        'latest_rsi': None,
+    }
+    if len(close):
+        in_range = np.diff(np.log(close))
+        summary['total_return'] = float(close[-1] / close[0] - 1.0)
+        if len(in_range) > 1:
+            summary['annualized_volatility'] = float(np.std(in_range, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR))
+        trough = int(np.argmin(drawdowns))
+        summary['max_drawdown'] = float(drawdowns[trough])
+        summary['max_drawdown_peak'] = int(np.argmax(close[:trough + 1]))
+        summary['max_drawdown_trough'] = trough
+        if not np.isnan(strength[-1]):
+            summary['latest_rsi'] = float(strength[-1])
+
+    return {
+        'returns': returns,
+        'log_returns': log_returns,
+        'moving_averages': moving_averages,
+        'volatility': volatility[offset:],
+        'drawdown': drawdowns,
+        'rsi': strength,
+        'summary': summary,
+    }
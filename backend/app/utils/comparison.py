@@ -0,0 +1,69 @@
+"""
+国内 / 国际价格对齐与对比指标
+
+两个市场的交易日历不同（国内有春节、国庆等长假，国际按美国日历），
+先以两者日期的并集为索引对齐收盘价，再按填充策略处理某一市场休市的日期：
+- inner：只保留两个市场都有数据的日期
+- ffill：休市日沿用该市场最近一个收盘价（最多连续 max_gap 个日期，超出的日期丢弃）
+- outer：保留所有日期，休市的一侧为空
+对齐后向量化计算价差、比值和对数收益率的滚动相关系数。
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+MARKETS = ('domestic', 'international')
+FILL_POLICIES = ('inner', 'ffill', 'outer')
+
+# ffill 最多沿用的连续日期数（覆盖国内春节 / 国庆长假）
+DEFAULT_MAX_GAP = 10
+
+
+def empty_aligned_frame() -> pd.DataFrame:
+    """空的对齐表：日期索引，domestic / international 两列收盘价"""
+    return pd.DataFrame({market: pd.Series(dtype='float64') for market in MARKETS},
+                        index=pd.DatetimeIndex([], dtype='datetime64[us]'))
+
+
+def align_closes(frame: pd.DataFrame, fill: str = 'ffill', max_gap: int = DEFAULT_MAX_GAP) -> pd.DataFrame:
+    """
+    按填充策略对齐两个市场的收盘价
+    :param frame: 以日期并集为索引、某市场当日无数据为 NaN 的收盘价表
+    :param fill: inner / ffill / outer
+    :param max_gap: ffill 最多沿用的连续日期数
+    :return: 对齐后的收盘价表（inner、ffill 不含空值）
+    """
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"fill 必须是 {', '.join(FILL_POLICIES)} 之一")
+    if fill == 'outer':
+        return frame
+    if fill == 'ffill':
+        frame = frame.ffill(limit=max_gap)
+    return frame.dropna(how='any')
+
+
+def rolling_correlation(left: pd.Series, right: pd.Series, window: int) -> pd.Series:
+    """对数收益率的滚动相关系数，窗口内有空值时为 NaN"""
+    left_returns = np.log(left).diff()
+    right_returns = np.log(right).diff()
+    return left_returns.rolling(window).corr(right_returns)
+
+
+def compute_comparison(aligned: pd.DataFrame, correlation_window: int = 20) -> Dict[str, np.ndarray]:
+    """
+    计算对齐后两个市场的对比指标
+    :param aligned: align_closes 的结果
+    :param correlation_window: 滚动相关系数的窗口
+    :return: spread（国内 - 国际）、ratio（国内 / 国际）、correlation（滚动相关系数）
+    """
+    domestic = aligned['domestic']
+    international = aligned['international']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = (domestic - international).to_numpy(dtype='float64')
+        ratio = (domestic / international).to_numpy(dtype='float64')
+    correlation = rolling_correlation(domestic, international, correlation_window).to_numpy(dtype='float64')
+    # 除以 0、常数序列的相关系数没有定义
+    ratio = np.where(np.isfinite(ratio), ratio, np.nan)
+    correlation = np.where(np.isfinite(correlation), correlation, np.nan)
+    return {'spread': spread, 'ratio': ratio, 'correlation': correlation}
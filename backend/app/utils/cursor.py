@@ -0,0 +1,36 @@
+"""
+分页游标编码
+
+游标是最后一条记录排序键的 URL 安全 base64 编码，客户端只需原样回传，
+服务端据此用 WHERE key > 游标 ORDER BY key LIMIT n 取下一页（keyset 分页），
+翻到第 N 页和第一页一样只需走一次索引范围扫描。
+"""
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解析"""
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """编码游标"""
+    raw = json.dumps(position, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解码游标
+    :raises InvalidCursorError: 游标不是由 encode_cursor 生成的
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError(f"无效的分页游标: {cursor}") from e
+    if not isinstance(position, dict):
+        raise InvalidCursorError(f"无效的分页游标: {cursor}")
+    return position
@@ -0,0 +1,150 @@
+"""
+价格序列降采样
+
+- resample_ohlcv：按周/月/年分桶聚合 OHLCV（开盘取首个、收盘取最后一个、最高/最低取极值、成交量求和）
+- lttb_indices：Largest-Triangle-Three-Buckets 算法，在保留走势形状的前提下抽取收盘价序列中的点
+
+两者都直接在 numpy 数组上计算，不逐行构造 Python 对象。
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import CANONICAL_COLUMNS
+
+# 支持的聚合周期
+INTERVALS = ('day', 'week', 'month', 'year')
+
+
+def bucket_starts(dates: np.ndarray, interval: str) -> np.ndarray:
+    """
+    计算每个日期所在周期的起始日（datetime64[D]）
+    周以周一为起点
+    """
+    days = dates.astype('datetime64[D]')
+    if interval == 'day':
+        return days
+    if interval == 'week':
+        # 1970-01-01 是周四，(天数 + 3) % 7 即周一为 0 的星期序号
+        weekday = (days.astype('int64') + 3) % 7
+        return days - weekday.astype('timedelta64[D]')
+    if interval == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    if interval == 'year':
+        return days.astype('datetime64[Y]').astype('datetime64[D]')
+    raise ValueError(f"不支持的周期: {interval}")
+
+
+def _first_valid(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """每个桶内第一个（reverse 时为最后一个）非 NaN 值"""
+    valid = ~np.isnan(values)
+    positions = np.arange(len(values))
+    if reverse:
+        # 桶内最后一个有效位置：对有效位置取 maximum.reduceat
+        marked = np.where(valid, positions, -1)
+        picked = np.maximum.reduceat(marked, starts)
+        ok = picked >= starts
+    else:
+        marked = np.where(valid, positions, len(values))
+        picked = np.minimum.reduceat(marked, starts)
+        ok = picked < ends
+    result = np.full(len(starts), np.nan)
+    result[ok] = values[picked[ok]]
+    return result
+
+
+def resample_ohlcv(frame: pd.DataFrame, interval: str, with_counts: bool = False) -> pd.DataFrame:
+    """
+    按周期聚合标准 OHLCV 表（输入需按日期升序）
+    :param frame: 标准 OHLCV 表
+    :param interval: day / week / month / year
+    :param with_counts: 是否附加 bar_count 列（每个周期内的日线条数）
+    :return: 每个周期一行的标准 OHLCV 表，日期为周期起始日
+    """
+    if interval == 'day' or frame.empty:
+        return frame
+
+    keys = bucket_starts(frame['date'].to_numpy(), interval)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(keys))
+
+    open_ = frame['open_price'].to_numpy(dtype='float64')
+    high = frame['high_price'].to_numpy(dtype='float64')
+    low = frame['low_price'].to_numpy(dtype='float64')
+    close = frame['close_price'].to_numpy(dtype='float64')
+    volume = frame['volume'].to_numpy(dtype='float64')
+
+    with np.errstate(invalid='ignore'):
+        high_values = np.fmax.reduceat(high, starts)
+        low_values = np.fmin.reduceat(low, starts)
+    volume_counts = np.add.reduceat((~np.isnan(volume)).astype('int64'), starts)
+    volume_values = np.add.reduceat(np.nan_to_num(volume), starts)
+
+    resampled = pd.DataFrame({
+        'market_type': frame['market_type'].iloc[0],
+        'date': keys[starts].astype('datetime64[us]'),
+        'open_price': _first_valid(open_, starts, ends),
+        'high_price': high_values,
+        'low_price': low_values,
+        'close_price': _first_valid(close, starts, ends, reverse=True),
+        'volume': np.where(volume_counts > 0, volume_values, np.nan),
+    }, columns=CANONICAL_COLUMNS)
+    if with_counts:
+        resampled['bar_count'] = ends - starts
+    return resampled
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+    :param x: 横坐标（单调递增）
+    :param y: 纵坐标
+    :param threshold: 目标点数（>= 3）
+    :return: 选中点的下标（升序，包含首尾两点）
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # 中间 n - 2 个点均分为 threshold - 2 个桶
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype('int64')
+
+    selected = np.empty(threshold, dtype='int64')
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 下一个桶的平均点（最后一个桶的下一个为终点）
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(frame: pd.DataFrame, interval: Optional[str] = None,
+               max_points: Optional[int] = None) -> pd.DataFrame:
+    """
+    降采样价格序列：先按周期聚合，仍超过 max_points 时对收盘价做 LTTB 抽点
+    :param frame: 标准 OHLCV 表（按日期升序）
+    :param interval: day / week / month / year，为空时不聚合
+    :param max_points: 返回的最大点数，为空时不限制
+    """
+    if interval:
+        frame = resample_ohlcv(frame, interval)
+    if max_points and len(frame) > max_points:
+        x = frame['date'].to_numpy(dtype='datetime64[D]').astype('float64')
+        y = np.nan_to_num(frame['close_price'].to_numpy(dtype='float64'))
+        frame = frame.iloc[lttb_indices(x, y, max_points)].reset_index(drop=True)
+    return frame
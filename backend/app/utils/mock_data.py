@@ -0,0 +1,109 @@
+"""
+模拟行情数据
+
+数据源不可用时的回退数据，以及压测 / 基准用的大批量数据。
+整段 OHLCV 路径一次向量化生成：
+- 日期取自市场交易日历（周末和配置的休市日不生成数据）
+- 收盘价的对数相对基准价做均值回复的 AR(1) 随机游走（用 ewm 的递推实现，无 Python 循环），
+  短区间内近似随机游走，生成数百万根日线时价格也不会漂移到 0 或溢出
+- 开盘价、最高价、最低价在收盘价基础上加日内波动，保证 low <= open/close <= high
+- 传入 seed 时结果可复现（每个市场使用独立的随机数流）
+"""
+from datetime import date, datetime
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import CANONICAL_COLUMNS, empty_ohlcv_frame
+from app.utils.trading_calendar import get_calendar
+
+# 各市场的基准价格
+MOCK_BASE_PRICES = {'domestic': 450.0, 'international': 1800.0}
+
+# 日收益率和日内波动的标准差
+DAILY_VOLATILITY = 0.02
+INTRADAY_VOLATILITY = 0.01
+# 对数价格偏离基准的自回归系数（越接近 1 回复越慢）
+MEAN_REVERSION = 0.999
+
+# 每个市场独立的随机数流
+_MARKET_STREAMS = {'domestic': 0, 'international': 1}
+
+DateLike = Union[date, datetime, str]
+
+
+class MockPriceGenerator:
+    """
+    按交易日连续生成模拟日线，多次调用 frame() 时价格路径首尾相接
+    """
+
+    def __init__(self, market_type: str, seed: Optional[int] = None, base_price: Optional[float] = None):
+        """
+        :param seed: 随机数种子，为空时每次结果不同
+        :param base_price: 基准价格，默认按市场取 MOCK_BASE_PRICES
+        """
+        self.market_type = market_type
+        self.base_price = base_price or MOCK_BASE_PRICES.get(market_type, 1000.0)
+        entropy = None if seed is None else [seed, _MARKET_STREAMS.get(market_type, 2)]
+        self.rng = np.random.default_rng(entropy)
+        self.calendar = get_calendar(market_type)
+        # 当前对数价格相对基准的偏离
+        self._deviation = 0.0
+
+    def _log_deviation(self, count: int) -> np.ndarray:
+        """
+        x_t = φ·x_{t-1} + ε_t 的向量化递推
+        ewm(adjust=False) 计算 y_t = (1-α)·y_{t-1} + α·u_t，取 α = 1-φ、u_0 = x_0、u_t = ε_t/α 即得 y_t = x_t
+        """
+        alpha = 1.0 - MEAN_REVERSION
+        shocks = self.rng.normal(0.0, DAILY_VOLATILITY, count)
+        inputs = np.concatenate(([self._deviation], shocks / alpha))
+        deviation = pd.Series(inputs).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+        self._deviation = float(deviation[-1])
+        return deviation
+
+    def frame(self, days: np.ndarray) -> pd.DataFrame:
+        """
+        为给定交易日（升序 datetime64[D]）生成标准 OHLCV 表
+        """
+        count = len(days)
+        if count == 0:
+            return empty_ohlcv_frame()
+
+        close = self.base_price * np.exp(self._log_deviation(count))
+        open_ = close * (1 + self.rng.normal(0.0, INTRADAY_VOLATILITY, count))
+        high = np.maximum(open_, close) * (1 + np.abs(self.rng.normal(0.0, INTRADAY_VOLATILITY, count)))
+        low = np.minimum(open_, close) * (1 - np.abs(self.rng.normal(0.0, INTRADAY_VOLATILITY, count)))
+        volume = self.rng.integers(1000, 10000, count).astype('float64')
+
+        return pd.DataFrame({
+            'market_type': self.market_type,
+            'date': days.astype('datetime64[us]'),
+            'open_price': np.round(open_, 2),
+            'high_price': np.round(high, 2),
+            'low_price': np.round(low, 2),
+            'close_price': np.round(close, 2),
+            'volume': volume,
+        }, columns=CANONICAL_COLUMNS)
+
+    def between(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """[start, end] 内每个交易日一根日线"""
+        return self.frame(self.calendar.trading_days(start, end))
+
+    def iter_frames(self, start: DateLike, rows: int, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        从 start 起连续 rows 个交易日，按 chunk_size 分块生成（内存占用与总行数无关）
+        """
+        days = self.calendar.next_trading_days(start, rows)
+        for offset in range(0, rows, chunk_size):
+            yield self.frame(days[offset:offset + chunk_size])
+
+
+def generate_mock_frame(market_type: str, start: DateLike, end: DateLike, seed: Optional[int] = None,
+                        base_price: Optional[float] = None) -> pd.DataFrame:
+    """
+    生成 [start, end] 内的模拟日线（标准 OHLCV 表）
+    :param seed: 随机数种子，相同参数和种子的结果相同
+    """
+    return MockPriceGenerator(market_type, seed=seed, base_price=base_price).between(start, end)
@@ -0,0 +1,126 @@
+"""
+OHLCV 数据规范化工具
+
+把 AKShare / yfinance 返回的原始 DataFrame 一次性（列式、向量化）转换为
+gold_prices 表对应的标准列，避免 iterrows 逐行构造字典。
+"""
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+# 标准列（与 GoldPrice 模型字段一致）
+PRICE_COLUMNS = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+CANONICAL_COLUMNS = ['market_type', 'date'] + PRICE_COLUMNS
+
+# AKShare 中文列名映射
+AKSHARE_COLUMN_MAP = {
+    '开盘': 'open_price',
+    '最高': 'high_price',
+    '最低': 'low_price',
+    '收盘': 'close_price',
+    '成交量': 'volume',
+}
+
+# yfinance 列名映射
+YFINANCE_COLUMN_MAP = {
+    'Open': 'open_price',
+    'High': 'high_price',
+    'Low': 'low_price',
+    'Close': 'close_price',
+    'Volume': 'volume',
+}
+
+
+def empty_ohlcv_frame() -> pd.DataFrame:
+    """空的标准 OHLCV 表"""
+    frame = pd.DataFrame({column: pd.Series(dtype='float64') for column in PRICE_COLUMNS})
+    frame.insert(0, 'date', pd.Series(dtype='datetime64[us]'))
+    frame.insert(0, 'market_type', pd.Series(dtype='object'))
+    return frame
+
+
+def normalize_dates(values: Any) -> pd.Series:
+    """
+    日期列归一：转为 datetime64、去掉时区（保留交易所本地日期）、截断到零点
+    """
+    dates = pd.to_datetime(pd.Series(values), utc=False)
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize().astype('datetime64[us]')
+
+
+def normalize_ohlcv_frame(raw: pd.DataFrame, market_type: str,
+                          column_map: Optional[Mapping[str, str]] = None,
+                          date_column: Optional[str] = None) -> pd.DataFrame:
+    """
+    把原始行情表转换为标准 OHLCV 表
+    :param raw: 数据源返回的原始 DataFrame
+    :param market_type: 市场类型
+    :param column_map: 原始列名 -> 标准列名
+    :param date_column: 日期所在列，为空时使用索引
+    :return: 按日期升序、日期唯一的标准 OHLCV 表；缺失值保持 NaN（收盘价缺失按 0 处理）
+    """
+    if raw is None or raw.empty:
+        return empty_ohlcv_frame()
+
+    renamed = raw.rename(columns=dict(column_map or {}))
+    dates = renamed[date_column] if date_column else renamed.index
+
+    frame = pd.DataFrame(index=pd.RangeIndex(len(renamed)))
+    frame['market_type'] = market_type
+    frame['date'] = normalize_dates(dates).to_numpy()
+    for column in PRICE_COLUMNS:
+        if column in renamed.columns:
+            frame[column] = pd.to_numeric(renamed[column], errors='coerce').to_numpy(dtype='float64')
+        else:
+            frame[column] = np.nan
+    frame['close_price'] = frame['close_price'].fillna(0.0)
+
+    frame = frame[frame['date'].notna()]
+    frame = frame.drop_duplicates(subset=['date'], keep='last').sort_values('date')
+    return frame.reset_index(drop=True)
+
+
+def records_to_frame(data_list: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    字典列表转换为标准 OHLCV 表（非字典元素忽略）
+    """
+    records = [data for data in data_list if isinstance(data, dict)]
+    if not records:
+        return empty_ohlcv_frame()
+
+    raw = pd.DataFrame.from_records(records)
+    frames = [
+        normalize_ohlcv_frame(group, market_type, date_column='date')
+        for market_type, group in raw.groupby('market_type', sort=False)
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    标准 OHLCV 表转换为字典列表，NaN 统一为 None（整列一次性掩码）
+    """
+    if frame.empty:
+        return []
+    columns = [
+        frame['market_type'].tolist(),
+        # datetime64[us] 转 object 得到原生 datetime，数据库驱动无需再识别 Timestamp
+        frame['date'].to_numpy().astype('datetime64[us]').astype(object).tolist(),
+    ]
+    for column in PRICE_COLUMNS:
+        values = frame[column].to_numpy(dtype='float64')
+        columns.append(np.where(np.isnan(values), None, values).tolist())
+    return [dict(zip(CANONICAL_COLUMNS, row)) for row in zip(*columns)]
+
+
+def rows_to_frame(rows: List[Any]) -> pd.DataFrame:
+    """
+    数据库查询结果 (market_type, date, 各价格列) 转换为标准 OHLCV 表
+    """
+    if not rows:
+        return empty_ohlcv_frame()
+    frame = pd.DataFrame(rows, columns=CANONICAL_COLUMNS)
+    frame['date'] = normalize_dates(frame['date']).to_numpy()
+    return frame
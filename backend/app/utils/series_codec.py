@@ -0,0 +1,98 @@
+"""
+价格序列编码
+
+把标准 OHLCV 表编码为列式 JSON（并列数组）或紧凑二进制格式，供图表类前端使用。
+
+二进制格式（packed-f64-v1，小端序）：
+    4 字节魔数 b"GPS1"
+    4 字节 uint32 头部长度 N
+    N 字节 UTF-8 JSON 头部：{"series": [{"market_type": ..., "count": n}, ...], "columns": [...]}
+    依次为每个序列写入：
+        n 个 int32  日期（自 1970-01-01 起的天数）
+        每个数值列 n 个 float64（缺失值为 NaN）
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import PRICE_COLUMNS
+
+BINARY_MAGIC = b"GPS1"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+BINARY_FORMAT_NAME = "packed-f64-v1"
+COLUMNAR_MEDIA_TYPE = "application/vnd.webtools.columnar+json"
+
+# 列式响应中的列名（去掉 _price 后缀）
+COLUMNAR_NAMES = {
+    'open_price': 'open',
+    'high_price': 'high',
+    'low_price': 'low',
+    'close_price': 'close',
+    'volume': 'volume',
+}
+
+
+def nullable_list(values: np.ndarray) -> List[Optional[float]]:
+    """float 数组转列表，NaN 转为 None"""
+    values = np.asarray(values, dtype='float64')
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def frame_to_columnar(frame: pd.DataFrame) -> Dict[str, List[Any]]:
+    """
+    标准 OHLCV 表转换为并列数组
+    :return: {'dates': [...], 'open': [...], 'high': [...], 'low': [...], 'close': [...], 'volume': [...]}
+    """
+    columns: Dict[str, List[Any]] = {
+        'dates': np.datetime_as_string(frame['date'].to_numpy(dtype='datetime64[D]'), unit='D').tolist()
+    }
+    for column, name in COLUMNAR_NAMES.items():
+        columns[name] = nullable_list(frame[column].to_numpy(dtype='float64'))
+    return columns
+
+
+def encode_binary(series: Sequence[Tuple[str, pd.DataFrame]]) -> bytes:
+    """
+    把一个或多个序列编码为 packed-f64-v1 二进制
+    :param series: [(market_type, 标准 OHLCV 表), ...]
+    """
+    header = json.dumps({
+        'format': BINARY_FORMAT_NAME,
+        'columns': ['date'] + [COLUMNAR_NAMES[c] for c in PRICE_COLUMNS],
+        'series': [{'market_type': market_type, 'count': len(frame)} for market_type, frame in series],
+    }, separators=(',', ':')).encode('utf-8')
+
+    parts = [BINARY_MAGIC, struct.pack('<I', len(header)), header]
+    for _, frame in series:
+        days = frame['date'].to_numpy(dtype='datetime64[D]').astype('<i4')
+        parts.append(days.tobytes())
+        for column in PRICE_COLUMNS:
+            parts.append(frame[column].to_numpy(dtype='<f8').tobytes())
+    return b''.join(parts)
+
+
+def decode_binary(payload: bytes) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    解码 packed-f64-v1 二进制（用于测试和 Python 客户端）
+    :return: {market_type: {'dates': datetime64[D] 数组, 'open': ..., ...}}
+    """
+    if payload[:4] != BINARY_MAGIC:
+        raise ValueError("不是有效的价格序列二进制数据")
+    header_size = struct.unpack('<I', payload[4:8])[0]
+    header = json.loads(payload[8:8 + header_size])
+    offset = 8 + header_size
+
+    result = {}
+    for meta in header['series']:
+        count = meta['count']
+        columns = {}
+        columns['dates'] = np.frombuffer(payload, dtype='<i4', count=count, offset=offset).astype('datetime64[D]')
+        offset += 4 * count
+        for name in header['columns'][1:]:
+            columns[name] = np.frombuffer(payload, dtype='<f8', count=count, offset=offset)
+            offset += 8 * count
+        result[meta['market_type']] = columns
+    return result
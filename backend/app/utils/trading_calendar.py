@@ -0,0 +1,85 @@
+"""
+交易日历
+
+基于 numpy 工作日函数（busday）实现：周一至周五为交易日，另可配置各市场休市日。
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core.config import settings
+
+DateLike = Union[date, datetime, np.datetime64, str]
+
+
+def to_day(value: DateLike) -> np.datetime64:
+    """任意日期转换为 datetime64[D]"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, 'D')
+
+
+class TradingCalendar:
+    """单个市场的交易日历"""
+
+    def __init__(self, holidays: Sequence[DateLike] = ()):
+        self.holidays = np.array([to_day(day) for day in holidays], dtype='datetime64[D]')
+        self._calendar = np.busdaycalendar(weekmask='1111100', holidays=self.holidays)
+
+    def is_trading_day(self, value: DateLike) -> bool:
+        """是否交易日"""
+        return bool(np.is_busday(to_day(value), busdaycal=self._calendar))
+
+    def trading_days(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """[start, end] 内的全部交易日（datetime64[D] 数组）"""
+        start, end = to_day(start), to_day(end)
+        if end < start:
+            return np.array([], dtype='datetime64[D]')
+        days = np.arange(start, end + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+        return days[np.is_busday(days, busdaycal=self._calendar)]
+
+    def next_trading_days(self, start: DateLike, count: int) -> np.ndarray:
+        """从 start（非交易日时顺延到下一个交易日）开始的连续 count 个交易日"""
+        first = np.busday_offset(to_day(start), 0, roll='forward', busdaycal=self._calendar)
+        return np.busday_offset(first, np.arange(count), busdaycal=self._calendar)
+
+    def count_between(self, start: DateLike, end: DateLike) -> int:
+        """[start, end] 内的交易日数量"""
+        start, end = to_day(start), to_day(end)
+        if end < start:
+            return 0
+        return int(np.busday_count(start, end + np.timedelta64(1, 'D'), busdaycal=self._calendar))
+
+    def positions(self, days: np.ndarray) -> np.ndarray:
+        """
+        每个日期相对固定原点的交易日序号
+        非交易日（例如周末的模拟数据）归到其后的第一个交易日
+        """
+        origin = np.datetime64('1970-01-01', 'D')
+        return np.busday_count(origin, days.astype('datetime64[D]'), busdaycal=self._calendar)
+
+    def contiguous_runs(self, days: np.ndarray) -> List[Tuple[date, date]]:
+        """
+        把有序日期数组切分为交易日连续的区间（中间只隔休市日的视为连续）
+        :return: [(起始日, 结束日), ...]
+        """
+        if len(days) == 0:
+            return []
+        days = np.unique(days.astype('datetime64[D]'))
+        breaks = np.flatnonzero(np.diff(self.positions(days)) > 1)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(days) - 1]))
+        return [(days[s].item(), days[e].item()) for s, e in zip(starts, ends)]
+
+
+@lru_cache(maxsize=None)
+def get_calendar(market_type: str) -> TradingCalendar:
+    """获取市场交易日历（按配置的休市日）"""
+    return TradingCalendar(settings.market_holidays(market_type))
+
+
+def last_closed_day(today: date = None) -> date:
+    """最近一个已收盘的自然日（即昨天）"""
+    return (today or date.today()) - timedelta(days=1)
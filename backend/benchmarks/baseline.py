@@ -0,0 +1,79 @@
+"""
+基准结果的 JSON 基线：保存、读取与回归判断
+
+基线文件格式：
+    {"meta": {...运行参数...}, "results": {名称: {指标: 数值}}}
+pytest-benchmark 的结果由其自身的 --benchmark-autosave / --benchmark-compare-fail 管理，
+这里用于 load_test 等独立脚本。
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 越大越差的指标；其余（如 rps）越小越差
+LOWER_IS_BETTER = ('p50', 'p95', 'p99', 'mean', 'errors')
+
+# 默认回归阈值：比基线差 20% 以上
+DEFAULT_THRESHOLD = 0.2
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]], meta: Optional[Dict[str, Any]] = None):
+    """
+    写入基线文件（目录不存在时创建）
+    :param results: {名称: {指标: 数值}}
+    :param meta: 运行参数（数据规模、并发数等），比较时原样展示
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {
+        'meta': {**(meta or {}), 'saved_at': datetime.now().isoformat(timespec='seconds')},
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """读取基线文件"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     metrics: Optional[List[str]] = None,
+                     threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    找出比基线差 threshold 以上的指标（只比较两边都有的名称和指标）
+    :param metrics: 参与比较的指标，为空时比较全部
+    :param threshold: 相对变化阈值，0.2 表示 20%
+    :return: [{'name', 'metric', 'baseline', 'current', 'change'}]，change 为相对变化（正数表示变差）
+    """
+    regressions = []
+    for name, values in current.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, value in values.items():
+            if metrics is not None and metric not in metrics:
+                continue
+            base = reference.get(metric)
+            if base is None:
+                continue
+            if metric == 'errors':
+                # 错误数从 0 变为非 0 时同样视为回归
+                worse = value > base * (1 + threshold)
+                change = (value - base) / base if base else float(value > 0)
+            elif base <= 0:
+                continue
+            elif metric in LOWER_IS_BETTER:
+                change = value / base - 1
+                worse = change > threshold
+            else:
+                change = 1 - value / base
+                worse = change > threshold
+            if worse:
+                regressions.append({'name': name, 'metric': metric, 'baseline': base,
+                                    'current': value, 'change': change})
+    return regressions
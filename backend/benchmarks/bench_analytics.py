@@ -0,0 +1,73 @@
+"""
+统计指标基准：1、5、20 年日线
+- compute：只做向量化计算（收益率、移动平均、波动率、回撤、RSI）
+- endpoint：读取收盘价 + 计算 + 构造 PriceAnalytics 并序列化（即缓存未命中时的耗时）
+
+运行：python -m benchmarks.bench_analytics
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.responses import make_cached_body
+from app.db.database import create_async_db_engine, to_async_url
+from app.schemas.gold_price import PriceAnalytics
+from app.services.analytics_service import AnalyticsService
+from app.services.gold_price_service import GoldPriceService
+from app.utils.analytics import compute_analytics
+from benchmarks.common import synthetic_rows, temp_sqlite_session
+
+YEARS = (1, 5, 20)
+REPEAT = 20
+WINDOWS = (5, 20, 60)
+
+
+def best_of(run) -> float:
+    """多次运行取最快一次（毫秒）"""
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+async def build_endpoint(session_factory, start, end):
+    async with session_factory() as session:
+        result = await AnalyticsService(session).get_analytics('domestic', start, end, WINDOWS, 20, 14)
+    return make_cached_body(PriceAnalytics(**result))
+
+
+async def measure_endpoint(session_factory, start, end) -> float:
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await build_endpoint(session_factory, start, end)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+if __name__ == '__main__':
+    end = datetime(2025, 12, 31)
+    with temp_sqlite_session() as db:
+        first = end - timedelta(days=365 * max(YEARS) + 200)
+        GoldPriceService(db).bulk_save_gold_price_data(
+            synthetic_rows((end - first).days + 1, start=first))
+
+        engine = create_async_db_engine(to_async_url(str(db.get_bind().url)), poolclass=NullPool)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        print(f"{'区间':<8}{'点数':>8}{'compute':>12}{'endpoint':>12}")
+        for years in YEARS:
+            start = end - timedelta(days=365 * years)
+            close = np.asarray([row['close_price'] for row in synthetic_rows(365 * years)])
+            compute_ms = best_of(lambda: compute_analytics(close, WINDOWS, 20, 14, offset=60))
+            endpoint_ms = asyncio.run(measure_endpoint(session_factory, start, end))
+            print(f"{years:>3} 年  {len(close):>8}{compute_ms:>10.2f} ms{endpoint_ms:>10.2f} ms")
+        asyncio.run(engine.dispose())
@@ -0,0 +1,60 @@
+"""
+批量 upsert 基准：对比逐行 SELECT + add 与集合式 ON CONFLICT 写入
+
+运行：python -m benchmarks.bench_bulk_upsert [行数 ...]
+"""
+import sys
+
+from app.models.gold_price import GoldPrice
+from app.services.gold_price_service import GoldPriceService
+from benchmarks.common import synthetic_rows, temp_sqlite_session, timer
+
+# 逐行路径太慢，只在不超过此行数时运行
+LEGACY_MAX_ROWS = 10_000
+
+
+def legacy_save(db, data_list):
+    """原实现：每行一次 SELECT ... first()"""
+    saved = 0
+    for data in data_list:
+        existing = db.query(GoldPrice).filter(
+            GoldPrice.market_type == data['market_type'],
+            GoldPrice.date == data['date']
+        ).first()
+        if existing:
+            continue
+        db.add(GoldPrice(**data))
+        saved += 1
+    db.commit()
+    return saved
+
+
+def run(count: int):
+    print(f"\n== {count:,} 条合成数据 (SQLite) ==")
+    rows = synthetic_rows(count)
+    changed = [dict(row, close_price=row['close_price'] + 1) for row in rows]
+
+    if count <= LEGACY_MAX_ROWS:
+        with temp_sqlite_session() as db:
+            with timer("legacy 逐行插入", count):
+                legacy_save(db, rows)
+            with timer("legacy 重复同步（全部跳过）", count):
+                legacy_save(db, rows)
+
+    with temp_sqlite_session() as db:
+        service = GoldPriceService(db)
+        with timer("bulk 插入", count):
+            result = service.bulk_save_gold_price_data(rows)
+        assert result['inserted'] == count, result
+        with timer("bulk 重复同步（全部跳过）", count):
+            result = service.bulk_save_gold_price_data(rows)
+        assert result['skipped'] == count, result
+        with timer("bulk 更新变化的 OHLC", count):
+            result = service.bulk_save_gold_price_data(changed, update_existing=True)
+        assert result['updated'] == count, result
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,135 @@
+"""
+并发读基准：200 个并发 /data 请求在同步会话（旧实现）和异步会话下的延迟分布
+同时在负载期间每 10ms 请求一次 /health，用相邻两次探测的最大间隔衡量事件循环被阻塞的时长
+
+运行：python -m benchmarks.bench_concurrency [--requests 200] [--years 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.dependencies.deps import get_async_db, get_db, get_session_factory
+from app.core.cache import response_cache
+from app.db.database import Base, create_async_db_engine, create_db_engine, to_async_url
+from app.main import app
+from app.services.gold_price_service import GoldPriceService
+from app.utils.series_codec import frame_to_columnar
+from benchmarks.common import synthetic_rows
+
+START = datetime(2000, 1, 1)
+
+# 旧实现：async def 路由中直接使用同步会话，查询期间阻塞事件循环
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/api/v1/gold/data/{market_type}")
+async def legacy_data(market_type: str, start_date: str, end_date: str, db: Session = Depends(get_db)):
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    frame = GoldPriceService(db).get_frame_from_db(market_type, start, end)
+    return {'market_type': market_type, 'total_count': len(frame), **frame_to_columnar(frame)}
+
+
+@legacy_app.get("/health")
+async def legacy_health():
+    return {"status": "ok"}
+
+
+async def timed_get(client: httpx.AsyncClient, url: str) -> float:
+    """请求一次并返回耗时（毫秒）"""
+    started = time.perf_counter()
+    response = await client.get(url)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_load(target: FastAPI, requests: int, end: datetime):
+    """
+    并发发出 requests 个 /data 请求，负载期间每 10ms 探测一次 /health
+    :return: (各请求耗时数组, 探测时刻数组, 总耗时)
+    """
+    transport = httpx.ASGITransport(app=target)
+    url = f"/api/v1/gold/data/domestic?start_date={START:%Y-%m-%d}&end_date={end:%Y-%m-%d}&format=columnar"
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await timed_get(client, url)  # 预热
+
+        load = asyncio.gather(*[timed_get(client, url) for _ in range(requests)])
+        probes = []
+        started = time.perf_counter()
+        load_task = asyncio.ensure_future(load)
+        while not load_task.done():
+            await timed_get(client, "/health")
+            probes.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+        latencies = await load_task
+        elapsed = time.perf_counter() - started
+    return np.array(latencies), np.array(probes), elapsed
+
+
+def report(label: str, latencies: np.ndarray, probes: np.ndarray, elapsed: float):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    stall = (np.diff(probes).max() * 1000 - 10) if len(probes) > 1 else elapsed * 1000
+    print(f"{label:<8}{p50:>10.1f}{p99:>10.1f}{elapsed * 1000:>12.1f}{len(probes):>10d}{stall:>14.1f}")
+
+
+async def main(requests: int, years: int):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    # 连接池足够容纳所有并发请求，对比的只是会话是否阻塞事件循环
+    # （同步实现在池耗尽时会在事件循环里等待连接，而归还连接的线程池回调又需要事件循环调度，会卡到超时）
+    engine = create_db_engine(url, pool_size=requests + 1)
+    async_engine = create_async_db_engine(to_async_url(url), pool_size=requests + 1)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = session_factory()
+        GoldPriceService(db).bulk_save_gold_price_data(synthetic_rows(years * 365, start=START))
+        db.close()
+        end = START + timedelta(days=years * 365 - 1)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def override_get_async_db():
+            async with async_session_factory() as db:
+                yield db
+
+        for target in (app, legacy_app):
+            target.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        # 关闭响应缓存，每个请求都查询数据库
+        response_cache.maxsize = 0
+
+        print(f"{requests} 个并发请求，{years} 年日线（{years * 365} 行）")
+        print(f"{'实现':<8}{'p50(ms)':>10}{'p99(ms)':>10}{'总耗时(ms)':>12}{'探测次数':>10}{'最长阻塞(ms)':>14}")
+        report('sync', *await run_load(legacy_app, requests, end))
+        report('async', *await run_load(app, requests, end))
+    finally:
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.years))
@@ -0,0 +1,112 @@
+"""
+流式导出内存基准：导出 N 条（默认 100 万）合成日线
+- stream：服务端游标分批编码为 NDJSON / CSV（可选 gzip），边读边丢弃
+- legacy：/data 原有方式，一次性加载 ORM 对象并构造 GoldPriceResponse 再序列化
+
+分别记录首字节时间、总耗时和 tracemalloc 统计的 Python 堆内存峰值。
+
+运行：python -m benchmarks.bench_export [--rows 1000000] [--skip-legacy]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.responses import make_cached_body
+from app.db.database import create_async_db_engine, to_async_url
+from app.models.gold_price import GoldPrice
+from app.schemas.gold_price import GoldPriceResponse
+from app.services.export_service import EXPORT_MAX_DATE, EXPORT_MIN_DATE, export_prices, gzip_stream
+from app.services.gold_price_service import GoldPriceService
+from benchmarks.common import synthetic_rows, temp_sqlite_session
+
+SEED_BATCH = 50000
+
+
+def seed(db, count: int):
+    """直接批量插入合成数据（跳过去重和汇总，只为准备数据）"""
+    start = datetime(1800, 1, 1)
+    for offset in range(0, count, SEED_BATCH):
+        size = min(SEED_BATCH, count - offset)
+        db.execute(insert(GoldPrice), synthetic_rows(size, start=start + timedelta(days=offset), seed=offset))
+        db.commit()
+
+
+async def run_stream(session_factory, export_format: str, compress: bool):
+    """返回 (字节数, 首字节秒数)"""
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    body = export_prices(session_factory, 'domestic', EXPORT_MIN_DATE, EXPORT_MAX_DATE, export_format)
+    if compress:
+        body = gzip_stream(body)
+    async for chunk in body:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    return size, first_byte
+
+
+def run_legacy(db):
+    """返回 (字节数, 首字节秒数)：整个响应体生成后才能发送第一个字节"""
+    started = time.perf_counter()
+    data = GoldPriceService(db).get_data_from_db('domestic', EXPORT_MIN_DATE, EXPORT_MAX_DATE)
+    response = GoldPriceResponse(market_type='domestic', data=data, start_date=EXPORT_MIN_DATE,
+                                 end_date=EXPORT_MAX_DATE, total_count=len(data))
+    size = len(make_cached_body(response).body)
+    elapsed = time.perf_counter() - started
+    # 清空标识映射，下一次运行重新构造 ORM 对象
+    db.expunge_all()
+    return size, elapsed
+
+
+def measure(label: str, run):
+    """
+    先不开 tracemalloc 计时（首字节、总耗时），再开 tracemalloc 统计内存峰值
+    （tracemalloc 会让分配密集的代码慢数倍，两者分开测量）
+    """
+    started = time.perf_counter()
+    size, first_byte = run()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16}{size / 1024 / 1024:>10.1f} MB{peak / 1024 / 1024:>12.1f} MB"
+          f"{first_byte * 1000:>12.1f} ms{elapsed:>10.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式导出内存基准")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="合成数据条数")
+    parser.add_argument("--skip-legacy", action="store_true", help="跳过一次性加载的对照组")
+    args = parser.parse_args()
+
+    with temp_sqlite_session() as db:
+        started = time.perf_counter()
+        seed(db, args.rows)
+        print(f"写入 {args.rows:,} 条合成数据: {time.perf_counter() - started:.1f} s\n")
+
+        # 每次 asyncio.run 都是新的事件循环，连接不能跨循环复用
+        async_engine = create_async_db_engine(to_async_url(str(db.get_bind().url)), poolclass=NullPool)
+        session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        print(f"{'方式':<16}{'输出':>13}{'内存峰值':>11}{'首字节':>13}{'总耗时':>9}")
+        for export_format in ('ndjson', 'csv'):
+            for compress in (False, True):
+                label = f"stream {export_format}{'+gz' if compress else ''}"
+                measure(label, lambda: asyncio.run(run_stream(session_factory, export_format, compress)))
+        asyncio.run(async_engine.dispose())
+
+        if not args.skip_legacy:
+            measure("legacy json", lambda: run_legacy(db))
+
+
+if __name__ == '__main__':
+    main()
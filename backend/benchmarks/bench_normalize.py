@@ -0,0 +1,81 @@
+"""
+行情表规范化基准：iterrows 逐行构造字典 vs 列式向量化转换（20 年日线）
+
+运行：python -m benchmarks.bench_normalize
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import (
+    AKSHARE_COLUMN_MAP,
+    YFINANCE_COLUMN_MAP,
+    frame_to_records,
+    normalize_ohlcv_frame,
+)
+from benchmarks.common import timer
+
+YEARS = 20
+REPEAT = 5
+
+
+def raw_frame(columns, tz=None, seed=7):
+    """模拟数据源返回的原始表（日期为索引，含少量缺失值）"""
+    index = pd.bdate_range('2005-01-03', periods=YEARS * 252, tz=tz)
+    rng = np.random.default_rng(seed)
+    close = 450.0 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    values = np.column_stack([close * 0.999, close * 1.005, close * 0.995, close,
+                              rng.integers(1000, 10000, len(index)).astype(float)])
+    values[rng.random(values.shape) < 0.01] = np.nan
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def legacy_domestic(df):
+    """原实现：iterrows + pd.notna/float 逐格转换"""
+    data_list = []
+    for index, row in df.iterrows():
+        data_list.append({
+            'market_type': 'domestic',
+            'date': pd.to_datetime(index),
+            'open_price': float(row.get('开盘', 0)) if pd.notna(row.get('开盘')) else None,
+            'high_price': float(row.get('最高', 0)) if pd.notna(row.get('最高')) else None,
+            'low_price': float(row.get('最低', 0)) if pd.notna(row.get('最低')) else None,
+            'close_price': float(row.get('收盘', 0)) if pd.notna(row.get('收盘')) else 0,
+            'volume': float(row.get('成交量', 0)) if pd.notna(row.get('成交量')) else None,
+        })
+    return data_list
+
+
+def legacy_international(hist):
+    """原实现：iterrows + 下标访问"""
+    data_list = []
+    for index, row in hist.iterrows():
+        data_list.append({
+            'market_type': 'international',
+            'date': pd.to_datetime(index),
+            'open_price': float(row['Open']) if pd.notna(row['Open']) else None,
+            'high_price': float(row['High']) if pd.notna(row['High']) else None,
+            'low_price': float(row['Low']) if pd.notna(row['Low']) else None,
+            'close_price': float(row['Close']) if pd.notna(row['Close']) else 0,
+            'volume': float(row['Volume']) if pd.notna(row['Volume']) else None,
+        })
+    return data_list
+
+
+def run(label, raw, legacy, market_type, column_map):
+    rows = len(raw)
+    print(f"\n== {label}: {YEARS} 年日线 {rows:,} 行，重复 {REPEAT} 次 ==")
+    with timer("iterrows 逐行字典", rows * REPEAT):
+        for _ in range(REPEAT):
+            legacy(raw)
+    with timer("向量化规范化（DataFrame，供批量写入）", rows * REPEAT):
+        for _ in range(REPEAT):
+            normalize_ohlcv_frame(raw, market_type, column_map)
+    with timer("向量化规范化 + 转字典列表", rows * REPEAT):
+        for _ in range(REPEAT):
+            frame_to_records(normalize_ohlcv_frame(raw, market_type, column_map))
+
+
+if __name__ == '__main__':
+    run('AKShare', raw_frame(list(AKSHARE_COLUMN_MAP)), legacy_domestic, 'domestic', AKSHARE_COLUMN_MAP)
+    run('yfinance', raw_frame(list(YFINANCE_COLUMN_MAP), tz='America/New_York'),
+        legacy_international, 'international', YFINANCE_COLUMN_MAP)
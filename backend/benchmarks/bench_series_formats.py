@@ -0,0 +1,59 @@
+"""
+价格序列响应格式基准：ORM + Pydantic JSON / 列式 JSON / packed-f64 二进制
+分别统计 1、5、20 年日线的负载大小和序列化耗时（含数据库查询）
+
+运行：python -m benchmarks.bench_series_formats
+"""
+import time
+from datetime import datetime, timedelta
+
+from app.api.responses import make_cached_body
+from app.schemas.gold_price import GoldPriceColumnar, GoldPriceResponse
+from app.services.gold_price_service import GoldPriceService
+from app.utils.series_codec import encode_binary, frame_to_columnar
+from benchmarks.common import synthetic_rows, temp_sqlite_session
+
+YEARS = (1, 5, 20)
+REPEAT = 5
+
+
+def build_json(service, market_type, start, end):
+    data = service.get_data_from_db(market_type, start, end)
+    return GoldPriceResponse(market_type=market_type, data=data, start_date=start,
+                             end_date=end, total_count=len(data))
+
+
+def build_columnar(service, market_type, start, end):
+    frame = service.get_frame_from_db(market_type, start, end)
+    return GoldPriceColumnar(market_type=market_type, start_date=start, end_date=end,
+                             total_count=len(frame), **frame_to_columnar(frame))
+
+
+def build_binary(service, market_type, start, end):
+    return encode_binary([(market_type, service.get_frame_from_db(market_type, start, end))])
+
+
+def measure(build, service, start, end):
+    """返回 (负载字节数, 平均耗时毫秒)"""
+    best = None
+    size = 0
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        size = len(make_cached_body(build(service, 'domestic', start, end)).body)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return size, best * 1000
+
+
+if __name__ == '__main__':
+    start = datetime(2000, 1, 1)
+    with temp_sqlite_session() as db:
+        service = GoldPriceService(db)
+        service.bulk_save_gold_price_data(synthetic_rows(max(YEARS) * 365, start=start))
+
+        print(f"{'区间':<8}{'格式':<10}{'负载':>14}{'耗时(最佳)':>14}")
+        for years in YEARS:
+            end = start + timedelta(days=years * 365 - 1)
+            for name, build in (('json', build_json), ('columnar', build_columnar), ('binary', build_binary)):
+                size, elapsed = measure(build, service, start, end)
+                print(f"{years:>2} 年    {name:<10}{size / 1024:>11.1f} KB{elapsed:>11.1f} ms")
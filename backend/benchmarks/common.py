@@ -0,0 +1,227 @@
+"""
+基准脚本公共工具
+"""
+import asyncio
+import dataclasses
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.database import Base, create_async_db_engine, create_db_engine, to_async_url
+from app.models import gold_price  # noqa
+from app.models import user  # noqa
+from app.models import ingestion  # noqa
+
+
+@contextmanager
+def empty_database() -> Iterator[sessionmaker]:
+    """在临时文件 SQLite 上创建表并返回会话工厂（结束后删除）"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+@contextmanager
+def temp_sqlite_session():
+    """在临时文件 SQLite 上创建表并返回会话（基准结束后删除）"""
+    with empty_database() as session_factory:
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+
+def synthetic_rows(count: int, market_type: str = 'domestic',
+                   start: datetime = datetime(1800, 1, 1), seed: int = 42) -> List[Dict[str, Any]]:
+    """生成 count 条连续日期的合成行情数据"""
+    rng = np.random.default_rng(seed)
+    close = 450.0 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = close * (1 + rng.normal(0, 0.005, count))
+    high = np.maximum(open_, close) * 1.005
+    low = np.minimum(open_, close) * 0.995
+    volume = rng.integers(1000, 10000, count).astype(float)
+    return [
+        {
+            'market_type': market_type,
+            'date': start + timedelta(days=i),
+            'open_price': float(open_[i]),
+            'high_price': float(high[i]),
+            'low_price': float(low[i]),
+            'close_price': float(close[i]),
+            'volume': float(volume[i]),
+        }
+        for i in range(count)
+    ]
+
+
+@contextmanager
+def timer(label: str, rows: int = 0):
+    """打印耗时和吞吐量"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    rate = f", {rows / elapsed:,.0f} rows/s" if rows else ""
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms{rate}")
+
+
+# 接口名 -> URL 模板（{start}、{end} 为数据集的首尾日期）
+ENDPOINTS = {
+    'data_json': "/api/v1/gold/data/domestic?start_date={start}&end_date={end}",
+    'data_columnar': "/api/v1/gold/data/domestic?start_date={start}&end_date={end}&format=columnar",
+    'data_binary': "/api/v1/gold/data/domestic?start_date={start}&end_date={end}&format=binary",
+    'data_max_points': "/api/v1/gold/data/domestic?start_date={start}&end_date={end}&max_points=1000",
+    'data_page': "/api/v1/gold/data/domestic?start_date={start}&end_date={end}&limit=1000",
+    'export_ndjson': "/api/v1/gold/export/domestic?format=ndjson",
+    'summary': "/api/v1/gold/summary/domestic",
+    'latest': "/api/v1/gold/latest",
+    'comparison': "/api/v1/gold/comparison?start_date={start}&end_date={end}&format=columnar",
+    'comparison_aligned': "/api/v1/gold/comparison/aligned?start_date={start}&end_date={end}",
+    'analytics': "/api/v1/gold/analytics/domestic?start_date={start}&end_date={end}",
+}
+
+
+def endpoint_url(name: str, start: datetime, end: datetime) -> str:
+    """按数据区间填充 ENDPOINTS 中的 URL"""
+    return ENDPOINTS[name].format(start=start.date(), end=end.date())
+
+
+# 压测数据的第一个交易日
+FIXTURE_START = date(2000, 1, 3)
+
+
+@dataclasses.dataclass
+class FixtureDatabase:
+    """写入了模拟数据的临时库"""
+    url: str
+    rows: int
+    session_factory: sessionmaker
+    async_session_factory: async_sessionmaker
+    start: datetime
+    end: datetime
+
+
+@contextmanager
+def fixture_database(rows: int, seed: int = 42, markets=('domestic', 'international')) -> Iterator[FixtureDatabase]:
+    """
+    临时 SQLite 文件库，每个市场写入从 FIXTURE_START 起连续 rows 个交易日的模拟日线
+    （与 python -m app.cli fixtures 相同的写入路径：汇总、快照、覆盖区间都已就绪）
+    """
+    from app.services.gold_price_service import GoldPriceService
+    from app.utils.mock_data import MockPriceGenerator
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # 每次 asyncio.run 都是新的事件循环，连接不能跨循环复用
+    async_engine = create_async_db_engine(to_async_url(url), poolclass=NullPool)
+    try:
+        end = None
+        with session_factory() as db:
+            for market_type in markets:
+                generator = MockPriceGenerator(market_type, seed=seed)
+                frames = list(generator.iter_frames(FIXTURE_START, rows))
+                # 压测库的读请求应直接命中数据，不触发后台补数
+                GoldPriceService(db).bulk_load(frames, mark_covered=True)
+                last = frames[-1]['date'].max().to_pydatetime()
+                end = last if end is None else max(end, last)
+        yield FixtureDatabase(
+            url=url,
+            rows=rows,
+            session_factory=session_factory,
+            async_session_factory=async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+            start=datetime.combine(FIXTURE_START, datetime.min.time()),
+            end=end,
+        )
+    finally:
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+        os.remove(path)
+
+
+@contextmanager
+def override_dependencies(database: FixtureDatabase):
+    """把应用的数据库依赖替换为 database（不启动应用生命周期）"""
+    from app.api.dependencies.deps import get_async_db, get_async_session_factory, get_db, get_session_factory
+    from app.main import app
+
+    def override_get_db():
+        db = database.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with database.async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: database.session_factory
+    app.dependency_overrides[get_async_session_factory] = lambda: database.async_session_factory
+    try:
+        yield app
+    finally:
+        app.dependency_overrides.clear()
+
+
+@contextmanager
+def app_client(database: FixtureDatabase):
+    """指向 database 的进程内 API 客户端"""
+    from fastapi.testclient import TestClient
+
+    with override_dependencies(database) as app, TestClient(app) as client:
+        yield client
+
+
+def clear_caches():
+    """清空进程内缓存，测量缓存未命中时的耗时"""
+    from app.core.cache import response_cache
+    from app.services.comparison_service import aligned_cache
+    from app.services.snapshot_service import snapshot_cache
+
+    response_cache.clear()
+    snapshot_cache.clear()
+    aligned_cache.clear()
+
+
+@contextmanager
+def stubbed_upstream(seed: int = 42):
+    """
+    用返回模拟数据的上游客户端替换 AKShare / yfinance（不限速、不写本地缓存），
+    同步流程的其余部分（上游客户端的合并请求、覆盖区间、写入）照常执行
+    """
+    from app.services import gold_price_service
+    from app.services.upstream_client import UpstreamClient
+    from app.utils.mock_data import generate_mock_frame
+
+    original = gold_price_service.upstream_client
+    gold_price_service.upstream_client = UpstreamClient({
+        name: dataclasses.replace(
+            source, rate=1e9, burst=1_000_000,
+            loader=lambda start, end, name=name: generate_mock_frame(name, start, end, seed=seed)
+        )
+        for name, source in original.sources.items()
+    }, raw_cache=None)
+    try:
+        yield
+    finally:
+        gold_price_service.upstream_client = original
@@ -0,0 +1,31 @@
+"""
+基准测试套件公共配置（pytest-benchmark）
+
+运行（在 backend 目录）：
+    python -m pytest benchmarks --benchmark-autosave --benchmark-storage=benchmarks/baselines
+与最近一次保存的结果比较，均值变慢超过 20% 时失败：
+    python -m pytest benchmarks --benchmark-storage=benchmarks/baselines \
+        --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.common import app_client, fixture_database  # noqa: E402
+
+# 每个市场的交易日数（约 4 年、40 年、200 年日线）
+SIZES = (1_000, 10_000, 50_000)
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda rows: f"{rows}rows")
+def dataset(request):
+    """写入了两个市场模拟日线的临时库（同一模块内各测试共用）"""
+    with fixture_database(request.param) as database:
+        yield database
+
+
+@pytest.fixture(scope="module")
+def api(dataset):
+    """指向 dataset 的 API 客户端"""
+    with app_client(dataset) as client:
+        yield client
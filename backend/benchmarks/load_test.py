@@ -0,0 +1,141 @@
+"""
+/gold 接口 HTTP 压测：每个接口并发发出一批请求，统计 p50 / p95 / p99 延迟、吞吐量和错误数
+默认在进程内运行（写入 --rows 个交易日的模拟数据，httpx 通过 ASGI 直接调用应用）；
+指定 --base-url 时压测已部署的服务（--start / --end 为请求的日期区间）
+
+运行：python -m benchmarks.load_test [--rows 10000] [--requests 200] [--concurrency 20] [--cold]
+保存基线：python -m benchmarks.load_test --save benchmarks/baselines/load.json
+与基线比较（任一接口的 p95 / p99 变慢或吞吐量下降超过阈值时退出码为 1）：
+    python -m benchmarks.load_test --compare benchmarks/baselines/load.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.baseline import DEFAULT_THRESHOLD, find_regressions, load_baseline, save_baseline
+from benchmarks.common import (ENDPOINTS, FixtureDatabase, clear_caches, endpoint_url, fixture_database,
+                               override_dependencies)
+
+# 与基线比较的指标（p50 受个别快请求影响大，不参与比较）
+COMPARED_METRICS = ['p95', 'p99', 'rps', 'errors']
+
+
+async def load_endpoint(client: httpx.AsyncClient, url: str, requests: int, concurrency: int,
+                        cold: bool = False) -> Dict[str, float]:
+    """
+    以 concurrency 个并发发出 requests 个请求
+    :param cold: 每个请求前清空进程内缓存（仅进程内压测有效）
+    :return: {'p50', 'p95', 'p99', 'mean'（毫秒）, 'rps', 'errors'}
+    """
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            if cold:
+                clear_caches()
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    await client.get(url)  # 预热
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'mean': float(np.mean(latencies)),
+            'rps': requests / elapsed, 'errors': errors}
+
+
+async def run_all(client: httpx.AsyncClient, start: datetime, end: datetime, requests: int,
+                  concurrency: int, cold: bool) -> Dict[str, Dict[str, float]]:
+    """依次压测 ENDPOINTS 中的每个接口并打印结果"""
+    print(f"{'接口':<22}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'rps':>10}{'错误':>8}")
+    results = {}
+    for name in ENDPOINTS:
+        stats = await load_endpoint(client, endpoint_url(name, start, end), requests, concurrency, cold)
+        results[name] = stats
+        print(f"{name:<22}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+              f"{stats['rps']:>10.1f}{stats['errors']:>8d}")
+    return results
+
+
+async def run_in_process(app, database: FixtureDatabase, requests: int, concurrency: int,
+                         cold: bool) -> Dict[str, Dict[str, float]]:
+    """通过 ASGI 在进程内压测应用"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        clear_caches()
+        return await run_all(client, database.start, database.end, requests, concurrency, cold)
+
+
+async def run_remote(base_url: str, start: datetime, end: datetime, requests: int,
+                     concurrency: int) -> Dict[str, Dict[str, float]]:
+    """压测已部署的服务"""
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await run_all(client, start, end, requests, concurrency, cold=False)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--base-url', help="已部署服务的地址，例如 http://localhost:8000")
+    parser.add_argument('--start', help="--base-url 时请求的开始日期 (YYYY-MM-DD)，默认一年前")
+    parser.add_argument('--end', help="--base-url 时请求的结束日期 (YYYY-MM-DD)，默认今天")
+    parser.add_argument('--rows', type=int, default=10_000, help="进程内压测时每个市场写入的交易日数")
+    parser.add_argument('--requests', type=int, default=200, help="每个接口的请求数")
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--cold', action='store_true', help="每个请求前清空进程内缓存")
+    parser.add_argument('--save', help="把结果写入基线文件")
+    parser.add_argument('--compare', help="与基线文件比较")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回归阈值（0.2 即 20%%）")
+    args = parser.parse_args(argv)
+
+    meta = {'requests': args.requests, 'concurrency': args.concurrency, 'cold': args.cold}
+    if args.base_url:
+        end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now()
+        start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else end - timedelta(days=365)
+        meta.update(base_url=args.base_url, start=f"{start:%Y-%m-%d}", end=f"{end:%Y-%m-%d}")
+        print(f"{args.base_url}：每个接口 {args.requests} 个请求，并发 {args.concurrency}")
+        results = asyncio.run(run_remote(args.base_url, start, end, args.requests, args.concurrency))
+    else:
+        meta.update(rows=args.rows)
+        print(f"进程内：每个市场 {args.rows} 个交易日，每个接口 {args.requests} 个请求，并发 {args.concurrency}"
+              f"{'，无缓存' if args.cold else ''}")
+        with fixture_database(args.rows) as database, override_dependencies(database) as app:
+            results = asyncio.run(run_in_process(app, database, args.requests, args.concurrency, args.cold))
+
+    if args.save:
+        save_baseline(args.save, results, meta)
+        print(f"已保存基线：{args.save}")
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline['meta'] != {**meta, 'saved_at': baseline['meta'].get('saved_at')}:
+            print(f"注意：运行参数与基线不同（基线：{baseline['meta']}）")
+        regressions = find_regressions(results, baseline['results'], COMPARED_METRICS, args.threshold)
+        for item in regressions:
+            print(f"回归：{item['name']} {item['metric']} {item['baseline']:.1f} -> {item['current']:.1f}"
+                  f"（变差 {item['change']:.0%}）")
+        if regressions:
+            return 1
+        print(f"未发现超过 {args.threshold:.0%} 的回归")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+服务层与 /gold 接口基准（pytest-benchmark）
+
+每个数据规模（conftest.SIZES）写入一个临时库，依次测量：
+- 服务层：save_gold_price_data（写入空库）、get_data_from_db / get_frame_from_db、
+  sync_gold_price_data（AKShare / yfinance 替换为模拟数据）
+- 接口：每个 /gold 读接口在缓存未命中时的耗时，以及几个主要接口命中缓存时的耗时
+"""
+import asyncio
+from contextlib import ExitStack
+
+import pytest
+
+from app.services.data_sync_service import sync_markets
+from app.services.gold_price_service import GoldPriceService
+from app.utils.mock_data import MockPriceGenerator
+from app.utils.ohlcv import frame_to_records
+from benchmarks.common import (ENDPOINTS, FIXTURE_START, clear_caches, empty_database, endpoint_url,
+                               stubbed_upstream)
+
+ROUNDS = 5
+# 额外测量命中缓存时耗时的接口
+CACHED_ENDPOINTS = ('data_json', 'data_columnar', 'analytics')
+
+
+def _fetch(api, url):
+    response = api.get(url)
+    assert response.status_code == 200, response.text[:200]
+    return len(response.content)
+
+
+def test_save_gold_price_data(benchmark, dataset):
+    """整批写入空库（去重比对、批量插入、汇总和快照）"""
+    frame = next(MockPriceGenerator('domestic', seed=1).iter_frames(FIXTURE_START, dataset.rows,
+                                                                    chunk_size=dataset.rows))
+    rows = frame_to_records(frame)
+
+    with ExitStack() as stack:
+        def setup():
+            session = stack.enter_context(empty_database())()
+            stack.callback(session.close)
+            return (GoldPriceService(session),), {}
+
+        inserted = benchmark.pedantic(lambda service: service.save_gold_price_data(rows),
+                                      setup=setup, rounds=ROUNDS)
+    assert inserted == dataset.rows
+
+
+@pytest.mark.parametrize("method", ["get_data_from_db", "get_frame_from_db"])
+def test_read_from_db(benchmark, dataset, method):
+    """读取整个区间：ORM 对象 / 按列读取"""
+    def read():
+        with dataset.session_factory() as db:
+            return len(getattr(GoldPriceService(db), method)('domestic', dataset.start, dataset.end))
+
+    assert benchmark.pedantic(read, rounds=ROUNDS) == dataset.rows
+
+
+def test_sync_gold_price_data(benchmark, dataset):
+    """
+    两个市场并发同步整个区间到空库（上游返回模拟数据）
+    同步区间截止到当天，数据集超出当天的部分不计入
+    """
+    with ExitStack() as stack:
+        stack.enter_context(stubbed_upstream())
+
+        def setup():
+            return (stack.enter_context(empty_database()),), {}
+
+        results = benchmark.pedantic(
+            lambda session_factory: asyncio.run(sync_markets(dataset.start, dataset.end,
+                                                             session_factory=session_factory)),
+            setup=setup, rounds=ROUNDS
+        )
+    assert all(result['status'] == 'success' for result in results.values())
+
+
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+def test_endpoint(benchmark, api, dataset, name):
+    """接口耗时（每轮前清空缓存）"""
+    url = endpoint_url(name, dataset.start, dataset.end)
+    benchmark.extra_info['bytes'] = benchmark.pedantic(_fetch, args=(api, url), setup=clear_caches,
+                                                       rounds=ROUNDS, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("name", CACHED_ENDPOINTS)
+def test_endpoint_cached(benchmark, api, dataset, name):
+    """接口命中响应缓存时的耗时"""
+    url = endpoint_url(name, dataset.start, dataset.end)
+    clear_caches()
+    _fetch(api, url)
+    benchmark(_fetch, api, url)
@@ -41,13 +41,20 @@ export default {
    * @param {string} marketType - 市场类型 (domestic/international)
    * @param {string} startDate - 开始日期 (YYYY-MM-DD)
    * @param {string} endDate - 结束日期 (YYYY-MM-DD)
+   * @param {string} [format] - 响应格式：json（默认）/ columnar（并列数组，适合图表）
+   * @param {Object} [options]
+   * @param {boolean} [options.wait] - 数据不完整时等待服务端补数完成后再返回（响应 freshness 为 stale 时使用）
    */
-  getGoldPriceData(marketType, startDate, endDate) {
+  getGoldPriceData(marketType, startDate, endDate, format, { wait = false } = {}) {
     return api.get(`/gold/data/${marketType}`, {
       params: {
         start_date: startDate,
-        end_date: endDate
-      }
+        end_date: endDate,
+        format,
+        wait: wait || undefined
+      },
+      // 等待补数要访问上游数据源，超时时间放宽
+      timeout: wait ? 60000 : undefined
     });
   },
 
@@ -92,6 +99,18 @@ export default {
     return api.get('/gold/latest');
   },
 
+  /**
+   * 订阅实时价格推送（Server-Sent Events）
+   * 连接后先收到各市场的最新价格，之后每次有新数据写入时收到一条消息；断线后浏览器自动重连
+   * @param {function} onPrice - 收到价格消息时调用，参数为 {market_type, date, price, change, ...}
+   * @returns {EventSource} 调用 close() 取消订阅
+   */
+  subscribePrices(onPrice) {
+    const source = new EventSource(`${api.defaults.baseURL}/gold/stream`);
+    source.addEventListener('price', event => onPrice(JSON.parse(event.data)));
+    return source;
+  },
+
   /**
    * 获取元数据
    */